@@ -0,0 +1,125 @@
+"""
+Throughput benchmark for BatchTranslator chunking.
+
+Builds a multi-megabyte synthetic document (see synthetic_corpus.py) and
+times the sentence-boundary chunker against the previous rfind-based one,
+reporting MB/s and chunk statistics per variant.
+
+Usage:
+
+    python benchmarks/bench_chunking.py --megabytes 10
+    python benchmarks/bench_chunking.py --megabytes 10 --output chunking.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from synthetic_corpus import generate_pairs
+
+from kasa.text_chunker import BatchTranslator
+
+
+def make_document(megabytes: float, seed: int = 0) -> str:
+    """English side of the synthetic corpus, in paragraphs of ten sentences, cut to ``megabytes``."""
+    size = int(megabytes * 2**20)
+    parts = []
+    length = 0
+    for i, (_, english) in enumerate(generate_pairs(10**9, seed)):
+        parts.append(english + ("\n" if i % 10 == 9 else " "))
+        length += len(parts[-1])
+        if length >= size:
+            break
+    return "".join(parts)[:size]
+
+
+def legacy_create_chunks(text: str, max_chunk_size: int) -> List[str]:
+    """The rfind-based chunker BatchTranslator used before sentence-aware chunking."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chunk_size, len(text))
+        if end < len(text):
+            chunk_text = text[start:end]
+            for separator in [". ", "! ", "? ", " "]:
+                position = chunk_text.rfind(separator)
+                if position > 0:
+                    end = start + position + len(separator)
+                    break
+        if chunk_text := text[start:end].strip():
+            chunks.append(chunk_text)
+        start = end
+    return chunks
+
+
+def measure(name: str, func: Callable[[], List], megabytes: float, repeat: int) -> Dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = func()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+    sizes = [len(getattr(chunk, "content", chunk)) for chunk in chunks]
+    return {
+        "name": name,
+        "seconds": seconds,
+        "megabytes_per_sec": megabytes / seconds if seconds else float("inf"),
+        "chunks": len(chunks),
+        "mean_chunk_chars": sum(sizes) / len(sizes) if sizes else 0,
+    }
+
+
+def run_benchmarks(megabytes: float, seed: int, repeat: int, max_chunk_size: int, max_chunk_tokens: int) -> List[Dict]:
+    text = make_document(megabytes, seed)
+    by_chars = BatchTranslator(None, max_chunk_size=max_chunk_size)
+    by_tokens = BatchTranslator(None, max_chunk_size=max_chunk_size, max_chunk_tokens=max_chunk_tokens)
+
+    variants = {
+        "legacy_rfind": lambda: legacy_create_chunks(text, max_chunk_size),
+        "sentence_ends": lambda: by_chars._create_chunks(text),
+        "sentence_ends_tokens": lambda: by_tokens._create_chunks(text),
+    }
+    results = []
+    for name, func in variants.items():
+        result = measure(name, func, megabytes, repeat)
+        print(
+            f"{name:<24} {result['megabytes_per_sec']:>8.1f} MB/s "
+            f"{result['chunks']:>8} chunks {result['mean_chunk_chars']:>8.0f} chars/chunk",
+            file=sys.stderr,
+        )
+        results.append(result)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, default=10, help="Size of the synthetic document")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic document")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per variant, the fastest is kept")
+    parser.add_argument("--max-chunk-size", type=int, default=1000, help="Chunk size limit in characters")
+    parser.add_argument("--max-chunk-tokens", type=int, default=150, help="Token budget of the token variant")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.megabytes, args.seed, args.repeat, args.max_chunk_size, args.max_chunk_tokens)
+    if args.output:
+        report = {
+            "benchmark": "chunking",
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "megabytes": args.megabytes,
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
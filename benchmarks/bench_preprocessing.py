@@ -0,0 +1,136 @@
+"""
+Throughput and peak-memory benchmarks for kasa.Preprocessing.
+
+Runs every stage on a synthetic Twi/English corpus (see synthetic_corpus.py),
+records lines/sec and peak traced memory per stage and writes the results as
+JSON. Passing an earlier results file with --compare reports stages whose
+throughput dropped by more than --tolerance and exits non-zero.
+
+Usage:
+
+    python benchmarks/bench_preprocessing.py --lines 200000 --output bench.json
+    python benchmarks/bench_preprocessing.py --lines 200000 --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from synthetic_corpus import write_corpus
+
+from kasa.Preprocessing import Preprocessing
+
+
+def measure(name: str, func: Callable[[], object], lines: int, repeat: int) -> Dict:
+    """Best-of-``repeat`` wall time for ``func``, plus its peak memory in a separate traced run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+
+    # tracing slows Python code down, so memory is measured on its own run
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "lines": lines,
+        "seconds": seconds,
+        "lines_per_sec": lines / seconds if seconds else float("inf"),
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmarks(lines: int, seed: int, repeat: int, workdir: str) -> List[Dict]:
+    twi_path, english_path = write_corpus(workdir, lines, seed)
+    preprocessor = Preprocessing()
+    twi_data, english_data = preprocessor.read_parallel_dataset(twi_path, english_path)
+    normalized_twi = preprocessor.normalize_batch(twi_data, "twi")
+
+    stages = {
+        "read_parallel_dataset": lambda: preprocessor.read_parallel_dataset(twi_path, english_path),
+        "iter_parallel_dataset": lambda: deque(preprocessor.iter_parallel_dataset(twi_path, english_path), maxlen=0),
+        "unicode_to_ascii": lambda: [preprocessor.unicode_to_ascii(s) for s in twi_data],
+        "normalize_twi": lambda: [preprocessor.normalize_twi(s) for s in twi_data],
+        "normalize_eng": lambda: [preprocessor.normalize_eng(s) for s in english_data],
+        "normalize_batch_twi": lambda: preprocessor.normalize_batch(twi_data, "twi"),
+        "normalize_batch_eng": lambda: preprocessor.normalize_batch(english_data, "eng"),
+        "tokenize": lambda: [s.split() for s in normalized_twi],
+    }
+    results = []
+    for name, func in stages.items():
+        result = measure(name, func, lines, repeat)
+        print(
+            f"{name:<24} {result['lines_per_sec']:>14,.0f} lines/s "
+            f"{result['peak_memory_bytes'] / 2**20:>10.1f} MiB peak",
+            file=sys.stderr,
+        )
+        results.append(result)
+    return results
+
+
+def find_regressions(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Describe every stage whose throughput fell more than ``tolerance`` below the baseline."""
+    baseline_by_name = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline_by_name.get(result["name"])
+        if previous and result["lines_per_sec"] < previous["lines_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{result['name']}: {result['lines_per_sec']:,.0f} lines/s "
+                f"vs {previous['lines_per_sec']:,.0f} lines/s in baseline"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=100000, help="Number of synthetic sentence pairs")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage, the fastest is kept")
+    parser.add_argument("--workdir", help="Directory for the synthetic corpus (default: a temporary directory)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative throughput drop")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = run_benchmarks(args.lines, args.seed, args.repeat, args.workdir or tmpdir)
+
+    report = {
+        "benchmark": "preprocessing",
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "lines": args.lines,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = find_regressions(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,8 +16,8 @@ raw_data_twi, raw_data_en = TwiPreprocessor.read_parallel_dataset(
 )
 
 # Normalize the raw data
-raw_data_en = [TwiPreprocessor.normalize_eng(data) for data in raw_data_en]
-raw_data_twi = [TwiPreprocessor.normalize_twi(data) for data in raw_data_twi]
+raw_data_en = TwiPreprocessor.normalize_batch(raw_data_en, lang="eng")
+raw_data_twi = TwiPreprocessor.normalize_batch(raw_data_twi, lang="twi")
 
 # Tokenize into words - which just means split each sentence into word units/tokens
 data = []
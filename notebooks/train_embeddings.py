@@ -24,6 +24,7 @@ from gensim.test.utils import datapath
 import pandas as pd
 from scipy.stats import spearmanr
 import argparse
+from kasa.Preprocessing import open_corpus
 
 
 parser = argparse.ArgumentParser()
@@ -87,7 +88,7 @@ def normalize_line(s, language="eng"):
 
 def read_dataset(file_path, number=None, normalize=False, language="eng"):
     """
-    Read NUMBER_OF_DATASET lines of data in supplied file_path
+    Read NUMBER_OF_DATASET lines of data in supplied file_path (plain or gzip/bz2/xz compressed)
     Perform normalization (if normalize=True) based on input language(default:"eng", option:"twi")
 
     Returns
@@ -95,7 +96,7 @@ def read_dataset(file_path, number=None, normalize=False, language="eng"):
     List[list] of processed word tokens for sentences in file_path
     """
 
-    with open(file_path) as file:
+    with open_corpus(file_path) as file:
         data = file.read()
     data = data.split("\n")
     if number:
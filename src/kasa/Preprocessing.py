@@ -1,12 +1,530 @@
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
 import re
+import shutil
+import string
+import tempfile
 import unicodedata
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from itertools import accumulate, islice, repeat
+
+# characters kept by the normalizers, everything else becomes a space
+_TWI_CHARACTERS = frozenset(string.ascii_letters + '.ƆɔɛƐ!?’')
+_ENG_CHARACTERS = frozenset(string.ascii_letters + '.!?')
+
+# patterns shared by the normalizers, compiled once at import time
+_NON_TWI = re.compile(r'[^a-zA-Z.ƆɔɛƐ!?’]+')
+_NON_ENG = re.compile(r'[^a-zA-Z.!?]+')
+_SPACES = re.compile(r' {2,}')
+
+_NORMALIZE_BATCH_SIZE = 10000
+
+# bump whenever the normalizers change their output, so that corpora
+# cached by Preprocessing.preprocess_cached are rebuilt
+_NORMALIZATION_VERSION = 1
+_CACHE_MANIFEST = 'manifest.json'
+_HASH_READ_SIZE = 1 << 20
+
+# compressed corpora are recognised by their leading magic bytes
+_COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+}
+_DECOMPRESSORS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+_READ_BUFFER_SIZE = 1 << 20
+# block size for counting lines, small enough to search one line by line
+_COUNT_BLOCK_SIZE = 1 << 16
+
+# line ends as reading a corpus in text mode sees them: \n, \r\n or a lone \r
+_LINE_END = re.compile(rb'\r\n?|\n')
+
+
+# name of the compression used by filepath ('gzip', 'bz2' or 'xz'), or
+# None for plain text
+def detect_compression(filepath):
+    with open(filepath, 'rb') as file:
+        head = file.read(6)
+    for name, magic in _COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def _open_binary(filepath):
+    compression = detect_compression(filepath)
+    if compression is None:
+        return open(filepath, 'rb', buffering=_READ_BUFFER_SIZE)
+    return io.BufferedReader(_DECOMPRESSORS[compression](filepath, 'rb'), buffer_size=_READ_BUFFER_SIZE)
+
+
+# open a corpus file for reading as utf-8 text; gzip, bz2 and xz files are
+# decompressed on the fly with large buffered reads
+def open_corpus(filepath):
+    return io.TextIOWrapper(_open_binary(filepath), encoding='utf-8')
+
+
+@lru_cache(maxsize=None)
+def _is_combining_mark(c):
+    return unicodedata.category(c) == 'Mn'
+
+
+# drop combining marks by looking up each distinct character once instead
+# of calling unicodedata.category on every character of the text
+def _unicode_to_ascii(s):
+    # NFD leaves ASCII untouched and ASCII holds no combining marks
+    if s.isascii():
+        return s
+    s = unicodedata.normalize('NFD', s)
+    for c in set(s):
+        if _is_combining_mark(c):
+            s = s.replace(c, '')
+    return s
+
+
+def _space_punctuation(s):
+    return s.replace('.', ' .').replace('!', ' !').replace('?', ' ?')
+
+
+# the original pipeline also collapsed r'\s+' to a single space, but the
+# non-letter substitution already turns every whitespace run into one space
+def _normalize(s, non_letters):
+    return non_letters.sub(' ', _space_punctuation(_unicode_to_ascii(s)))
+
+
+# normalize a block of lines as one newline-joined string: every distinct
+# disallowed character is replaced by a space, then runs of spaces are
+# collapsed, which gives the same result as the per-line substitution
+def _normalize_block(lines, characters, non_letters):
+    text = _space_punctuation(_unicode_to_ascii('\n'.join(lines)))
+    for c in set(text) - characters - {'\n', ' '}:
+        text = text.replace(c, ' ')
+    normalized = _SPACES.sub(' ', text).split('\n')
+    # a line carrying its own newline shifts the split, redo that block per line
+    if len(normalized) != len(lines):
+        return [_normalize(line, non_letters) for line in lines]
+    return normalized
+
+
+# byte offsets just past every line end in a binary file, where a line ends
+# with \n, \r\n or a lone \r like in read_parallel_dataset, so that line
+# numbers agree between the text and the byte-level readers
+def iter_line_ends(file):
+    position = 0
+    for chunk in _iter_chunks(file):
+        if b'\r' in chunk:
+            for match in _LINE_END.finditer(chunk):
+                yield position + match.end()
+        else:
+            newline = chunk.find(b'\n')
+            while newline != -1:
+                yield position + newline + 1
+                newline = chunk.find(b'\n', newline + 1)
+        position += len(chunk)
+
+
+# the rest of a binary file in large chunks, keeping \r\n pairs within one chunk
+def _iter_chunks(file, size=None):
+    while chunk := file.read(size or _READ_BUFFER_SIZE):
+        while chunk.endswith(b'\r') and (extra := file.read(1)):
+            chunk += extra
+        yield chunk
+
+
+# number of line ends in a chunk that does not split a \r\n pair
+def _count_line_ends(chunk):
+    if b'\r' not in chunk:
+        return chunk.count(b'\n')
+    return chunk.count(b'\n') + chunk.count(b'\r') - chunk.count(b'\r\n')
+
+
+# the lines in a piece of text read from a binary file by \n, splitting off
+# lone \r line ends too; surrounding whitespace is left to the caller
+def _universal_lines(text):
+    if '\r' not in text:
+        return [text]
+    if text.endswith('\n'):
+        text = text[:-1]
+    if text.endswith('\r'):
+        text = text[:-1]
+    return text.split('\r')
+
+
+# newline-aligned offsets that split a file into at most `count` byte ranges
+# of about equal size, including 0 and the file size
+def _line_boundaries(filepath, count):
+    size = os.path.getsize(filepath)
+    boundaries = [0]
+    with open(filepath, 'rb') as file:
+        for k in range(1, count):
+            target = size * k // count
+            if target <= boundaries[-1]:
+                continue
+            # finish the line containing byte target - 1
+            file.seek(target - 1)
+            file.readline()
+            position = file.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    boundaries.append(size)
+    return boundaries
+
+
+# split a parallel corpus into at most `count` pairs of byte ranges that hold
+# the same lines of both files: the twi file is cut into ranges of about
+# equal size, the english file at the same line numbers. Lines are counted
+# and searched for by `executor`, so the parent does not read the files
+def _aligned_line_ranges(filepath_twi, filepath_english, count, executor=None):
+    # compressed files cannot be entered mid-stream, they form one range
+    if detect_compression(filepath_twi) or detect_compression(filepath_english):
+        return [(0, None)], [(0, None)]
+    run = executor.map if executor else map
+
+    twi_boundaries = _line_boundaries(filepath_twi, count)
+    english_boundaries = _line_boundaries(filepath_english, count)
+    twi_counts = list(run(_count_range_line_ends, repeat(filepath_twi),
+                          twi_boundaries[:-1], twi_boundaries[1:]))
+    english_counts = list(run(_count_range_line_ends, repeat(filepath_english),
+                              english_boundaries[:-1], english_boundaries[1:]))
+
+    # for the line ending at each inner twi boundary, the english range that
+    # holds its end and the number of lines before it in that range
+    line_numbers = list(accumulate(twi_counts[:-1]))
+    english_totals = list(accumulate(english_counts))
+    starts, skips = [], []
+    for line_number in line_numbers:
+        index = bisect_left(english_totals, line_number)
+        if index == len(english_totals):
+            # the english file is shorter, the trailing ranges come out
+            # empty and the line counts tell the difference
+            break
+        starts.append(english_boundaries[index])
+        skips.append(line_number - (english_totals[index - 1] if index else 0))
+    english_ends = list(run(_find_line_end, repeat(filepath_english), starts, skips))
+    english_size = os.path.getsize(filepath_english)
+    english_ends += [english_size] * (len(line_numbers) - len(english_ends))
+
+    english_ends = [0] + english_ends + [english_size]
+    return (list(zip(twi_boundaries[:-1], twi_boundaries[1:])),
+            list(zip(english_ends[:-1], english_ends[1:])))
+
+
+# number of line ends in bytes [start, end) of filepath, both line ends
+def _count_range_line_ends(filepath, start, end):
+    lines = 0
+    with open(filepath, 'rb') as file:
+        file.seek(start)
+        remaining = end - start
+        for chunk in _iter_chunks(file, _COUNT_BLOCK_SIZE):
+            chunk = chunk[:remaining]
+            lines += _count_line_ends(chunk)
+            remaining -= len(chunk)
+            if remaining <= 0:
+                break
+    return lines
+
+
+# byte offset just past line end number `line_number` (counted from 1)
+# after offset start of filepath, or the file size if there are fewer;
+# blocks are counted and only the one holding it is searched line by line
+def _find_line_end(filepath, start, line_number):
+    position = start
+    with open(filepath, 'rb') as file:
+        file.seek(start)
+        for chunk in _iter_chunks(file, _COUNT_BLOCK_SIZE):
+            chunk_lines = _count_line_ends(chunk)
+            if line_number <= chunk_lines:
+                match = next(islice(_LINE_END.finditer(chunk), line_number - 1, None))
+                return position + match.end()
+            line_number -= chunk_lines
+            position += len(chunk)
+    return position
+
+
+# worker for Preprocessing.preprocess_corpus: normalize (and tokenize) the
+# lines in bytes [start, end) of filepath, or up to the end of the file when
+# end is None, and write them to output_path
+def _preprocess_range(filepath, start, end, lang, tokenize, output_path, mode='w'):
+    characters, non_letters = (_TWI_CHARACTERS, _NON_TWI) if lang == 'twi' else (_ENG_CHARACTERS, _NON_ENG)
+
+    def write_block(block):
+        normalized = _normalize_block(block, characters, non_letters)
+        if tokenize:
+            normalized = [' '.join(sentence.split()) for sentence in normalized]
+        output.writelines(sentence + '\n' for sentence in normalized)
+
+    line_count = 0
+    with _open_binary(filepath) as source, open(output_path, mode, encoding='utf-8') as output:
+        if start:
+            source.seek(start)
+        position = start
+        block = []
+        for line in source:
+            if end is not None and position >= end:
+                break
+            # a range may end after a lone \r in the middle of this \n line
+            if end is not None and position + len(line) > end:
+                line = line[:end - position]
+            position += len(line)
+            block.extend(sentence.strip() for sentence in _universal_lines(line.decode('utf-8')))
+            if len(block) >= _NORMALIZE_BATCH_SIZE:
+                write_block(block)
+                line_count += len(block)
+                block = []
+        if block:
+            write_block(block)
+            line_count += len(block)
+    return line_count
+
+
+# fingerprint of everything besides the input bytes that shapes the output
+# of Preprocessing.preprocess_cached
+def _config_fingerprint(tokenize):
+    config = {'version': _NORMALIZATION_VERSION, 'twi': _NON_TWI.pattern,
+              'eng': _NON_ENG.pattern, 'tokenize': tokenize}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+# sha256 of a whole file, plus the sha256 of its first n bytes for every n
+# in prefix_sizes, computed in the same single read
+def _hash_file(filepath, prefix_sizes=()):
+    hasher = hashlib.sha256()
+    pending = sorted(set(prefix_sizes))
+    prefix_digests = {}
+    position = 0
+    with open(filepath, 'rb') as file:
+        while True:
+            while pending and pending[0] == position:
+                prefix_digests[pending.pop(0)] = hasher.hexdigest()
+            read_size = min(_HASH_READ_SIZE, pending[0] - position) if pending else _HASH_READ_SIZE
+            chunk = file.read(read_size)
+            if not chunk:
+                return hasher.hexdigest(), prefix_digests
+            hasher.update(chunk)
+            position += len(chunk)
+
+
+# true if filepath, or its first `size` bytes, end on a line boundary (an
+# empty file does); appending to a file that does not needs a newline first
+def ends_with_newline(filepath, size=None):
+    if size is None:
+        size = os.path.getsize(filepath)
+    if size == 0:
+        return True
+    with open(filepath, 'rb') as file:
+        file.seek(size - 1)
+        return file.read(1) == b'\n'
+
+
+def _read_cache_manifests(cache_dir):
+    manifests = []
+    for name in os.listdir(cache_dir):
+        # skip entries that are still being staged
+        if name.startswith('.'):
+            continue
+        try:
+            with open(os.path.join(cache_dir, name, _CACHE_MANIFEST), encoding='utf-8') as file:
+                manifests.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return manifests
+
+
+# sha256 of both inputs of Preprocessing.preprocess_cached, and the manifest
+# of the largest cached entry with the same config whose inputs are line-aligned
+# prefixes of ours (or None); appending to compressed inputs is not tracked
+def _find_cache_base(cache_dir, config, inputs, sizes):
+    candidates = []
+    if not any(detect_compression(path) for path in inputs.values()):
+        candidates = [manifest for manifest in _read_cache_manifests(cache_dir)
+                      if manifest['config'] == config
+                      and all(manifest[lang]['size'] <= sizes[lang] for lang in inputs)]
+
+    digests, prefix_digests = {}, {}
+    for lang, path in inputs.items():
+        digests[lang], prefix_digests[lang] = _hash_file(path, [manifest[lang]['size'] for manifest in candidates])
+
+    for manifest in sorted(candidates, key=lambda m: m['twi']['size'] + m['eng']['size'], reverse=True):
+        if all(prefix_digests[lang][manifest[lang]['size']] == manifest[lang]['sha256']
+               and ends_with_newline(path, manifest[lang]['size'])
+               for lang, path in inputs.items()):
+            return digests, manifest
+    return digests, None
+
+
+# write the normalized inputs to staging, starting from the output of the
+# base entry if there is one, and return their line count
+def _stage_cache_entry(staging, cache_dir, base, inputs, tokenize):
+    line_counts = {}
+    for lang, path in inputs.items():
+        output = os.path.join(staging, f'{lang}.txt')
+        start, line_counts[lang] = 0, 0
+        if base is not None:
+            shutil.copyfile(os.path.join(cache_dir, base['key'], f'{lang}.txt'), output)
+            start, line_counts[lang] = base[lang]['size'], base['lines']
+        line_counts[lang] += _preprocess_range(path, start, None, lang, tokenize, output, mode='a')
+
+    if line_counts['twi'] != line_counts['eng']:
+        raise ValueError(
+            f"Parallel files are not aligned: {inputs['twi']} has {line_counts['twi']} lines "
+            f"but {inputs['eng']} has {line_counts['eng']}"
+        )
+    return line_counts['twi']
+
+
+# publish a staged cache entry under its final name in one rename
+def _commit_cache_entry(staging, entry, manifest):
+    with open(os.path.join(staging, _CACHE_MANIFEST), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file)
+    try:
+        os.rename(staging, entry)
+    except OSError:
+        # another run filled in the same entry first
+        if not os.path.exists(os.path.join(entry, _CACHE_MANIFEST)):
+            raise
+
+
+# drop a superseded cache entry; it is renamed out of sight first, so that
+# other runs stop picking it as a base before its files disappear
+def _remove_cache_entry(cache_dir, key):
+    doomed = os.path.join(cache_dir, f'.old-{key}-{os.getpid()}')
+    try:
+        os.rename(os.path.join(cache_dir, key), doomed)
+    except OSError:
+        # already removed by another run
+        return
+    shutil.rmtree(doomed, ignore_errors=True)
+
+
+# 8-byte digest used to recognise repeated sentences and pairs without
+# keeping the text itself in memory
+def _digest(*texts):
+    return hashlib.blake2b('\0'.join(texts).encode('utf-8'), digest_size=8).digest()
+
+
+@dataclass
+class DuplicateReport:
+    """Counts from an exact-dedup pass over a parallel corpus."""
+    total_pairs: int = 0
+    duplicate_pairs: int = 0
+    duplicate_twi: int = 0
+    duplicate_english: int = 0
+
+    @property
+    def unique_pairs(self):
+        return self.total_pairs - self.duplicate_pairs
+
+    @property
+    def duplicate_rate(self):
+        return self.duplicate_pairs / self.total_pairs if self.total_pairs else 0.0
+
+
+# filters for Preprocessing.filter_pairs: each one is called with a
+# (twi, english) pair and returns True to keep it. the name is the key its
+# drops are counted under in the FilterReport
+class PairFilter(ABC):
+    name = 'filter'
+
+    @abstractmethod
+    def __call__(self, twi, english):
+        ...
+
+
+# drop pairs where either side is empty
+class NonEmptyFilter(PairFilter):
+    name = 'empty'
+
+    def __call__(self, twi, english):
+        return bool(twi) and bool(english)
+
+
+# drop pairs where either side has more than max_tokens whitespace tokens
+class MaxLengthFilter(PairFilter):
+    name = 'too_long'
+
+    def __init__(self, max_tokens=200):
+        self.max_tokens = max_tokens
+
+    def __call__(self, twi, english):
+        return len(twi.split()) <= self.max_tokens and len(english.split()) <= self.max_tokens
+
+
+# drop pairs whose token counts differ by more than a factor of max_ratio
+class LengthRatioFilter(PairFilter):
+    name = 'length_ratio'
+
+    def __init__(self, max_ratio=3.0):
+        self.max_ratio = max_ratio
+
+    def __call__(self, twi, english):
+        twi_length, english_length = len(twi.split()), len(english.split())
+        return max(twi_length, english_length) <= self.max_ratio * max(min(twi_length, english_length), 1)
+
+
+# drop exact repeats of an earlier pair; remembers an 8-byte digest per
+# distinct pair until reset() is called
+class DuplicatePairFilter(PairFilter):
+    name = 'duplicate'
+
+    def __init__(self):
+        self._seen = set()
+
+    def __call__(self, twi, english):
+        digest = _digest(twi, english)
+        if digest in self._seen:
+            return False
+        self._seen.add(digest)
+        return True
+
+    def reset(self):
+        self._seen.clear()
+
+
+@dataclass
+class FilterReport:
+    """Pairs seen and kept by Preprocessing.filter_pairs, and drops per filter."""
+    total_pairs: int = 0
+    kept_pairs: int = 0
+    dropped: dict = field(default_factory=dict)
+
+
+def _default_filters():
+    return [NonEmptyFilter(), MaxLengthFilter(), LengthRatioFilter(), DuplicatePairFilter()]
+
 
 # A subclass of kasa for preprocessing data
 class Preprocessing:
-    # dummy initialization method
-    def __init__(self):
-        # initialize with some default parameters here later
-        pass
+    # cache_size > 0 memoizes normalize_twi/normalize_eng/normalize_batch in
+    # per-language LRU caches of that many sentences
+    def __init__(self, cache_size=0):
+        self.cache_size = cache_size
+        self._cached_normalizers = {}
+        # keys of the preprocess_cached entries whose paths were returned
+        self._returned_cache_keys = set()
+        if cache_size:
+            self._cached_normalizers = {
+                'twi': lru_cache(maxsize=cache_size)(partial(_normalize, non_letters=_NON_TWI)),
+                'eng': lru_cache(maxsize=cache_size)(partial(_normalize, non_letters=_NON_ENG)),
+            }
+
+    # hits, misses, maxsize and currsize of the normalization caches per language
+    def cache_info(self):
+        return {lang: normalizer.cache_info() for lang, normalizer in self._cached_normalizers.items()}
+
+    def cache_clear(self):
+        for normalizer in self._cached_normalizers.values():
+            normalizer.cache_clear()
     
     # read in parallel twi - english dataset
     def read_parallel_dataset(self,filepath_twi='../data/jw300.en-tw.tw',
@@ -14,7 +532,7 @@ class Preprocessing:
         
         # read english data
         english_data = []
-        with open(filepath_english, encoding='utf-8') as file:
+        with open_corpus(filepath_english) as file:
             line = file.readline()
             cnt = 1
             while line:
@@ -24,7 +542,7 @@ class Preprocessing:
 
         # read twi data
         twi_data = []
-        with open(filepath_twi, encoding='utf-8') as file:
+        with open_corpus(filepath_twi) as file:
     
             # twi=file.read()
             line = file.readline()
@@ -35,25 +553,221 @@ class Preprocessing:
                 cnt += 1
                 
         return twi_data,english_data
+
+    # stream aligned (twi, english) pairs from both files in lock-step,
+    # holding only the current line of each file in memory
+    def iter_parallel_dataset(self,filepath_twi='../data/jw300.en-tw.tw',
+                              filepath_english='../data/jw300.en-tw.en',
+                              start=0,limit=None):
+        if start < 0:
+            raise ValueError(f"start must be non-negative, got {start}")
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+
+        with open_corpus(filepath_twi) as twi_file, \
+                open_corpus(filepath_english) as english_file:
+            line_number = 0
+            yielded = 0
+            while limit is None or yielded < limit:
+                twi_line = twi_file.readline()
+                english_line = english_file.readline()
+                if not twi_line and not english_line:
+                    return
+                line_number += 1
+                if not twi_line or not english_line:
+                    shorter, longer = ((filepath_twi, filepath_english) if not twi_line
+                                       else (filepath_english, filepath_twi))
+                    raise ValueError(
+                        f"Parallel files are not aligned: {shorter} has {line_number - 1} lines "
+                        f"but {longer} has more"
+                    )
+                if line_number <= start:
+                    continue
+                yield twi_line.strip(), english_line.strip()
+                yielded += 1
     
     # convert input sentence from unicode to ascii format
     def unicode_to_ascii(self,s):
-        return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+        return _unicode_to_ascii(s)
 
     # normalize input twi sentence
     def normalize_twi(self,s):
-        s = self.unicode_to_ascii(s)
-        s = re.sub(r'([!.?])', r' \1', s)
-        s = re.sub(r'[^a-zA-Z.ƆɔɛƐ!?’]+', r' ', s)
-        s = re.sub(r'\s+', r' ', s)
-        return s
+        if self._cached_normalizers:
+            return self._cached_normalizers['twi'](s)
+        return _normalize(s, _NON_TWI)
     
     # normalize input english sentence
     def normalize_eng(self,s):
-        s = self.unicode_to_ascii(s)
-        s = re.sub(r'([!.?])', r' \1', s)
-        s = re.sub(r'[^a-zA-Z.!?]+', r' ', s)
-        s = re.sub(r'\s+', r' ', s)
-        return s
-      
+        if self._cached_normalizers:
+            return self._cached_normalizers['eng'](s)
+        return _normalize(s, _NON_ENG)
+
+    # normalize many sentences at once, lang is 'twi' or 'eng'; output is
+    # identical to calling normalize_twi/normalize_eng on every line
+    def normalize_batch(self,lines,lang='twi'):
+        if lang == 'twi':
+            characters, non_letters = _TWI_CHARACTERS, _NON_TWI
+        elif lang == 'eng':
+            characters, non_letters = _ENG_CHARACTERS, _NON_ENG
+        else:
+            raise ValueError(f"lang must be 'twi' or 'eng', got {lang!r}")
+
+        if self._cached_normalizers:
+            return list(map(self._cached_normalizers[lang], lines))
+
+        normalized = []
+        lines = iter(lines)
+        while block := list(islice(lines, _NORMALIZE_BATCH_SIZE)):
+            normalized.extend(_normalize_block(block, characters, non_letters))
+        return normalized
+
+    # normalize (and optionally tokenize) a parallel corpus in a process pool;
+    # both files are cut into byte ranges holding the same line numbers,
+    # which are processed independently and written to numbered shards in
+    # output_dir. shard k of the twi file is aligned with shard k of the
+    # english file, and concatenating the shards of a file in order restores
+    # its line order. returns the twi and english shard paths in that order
+    def preprocess_corpus(self,filepath_twi='../data/jw300.en-tw.tw',
+                          filepath_english='../data/jw300.en-tw.en',
+                          output_dir='../data/preprocessed',
+                          num_workers=None,tokenize=True,shards_per_worker=4):
+        num_workers = num_workers or os.cpu_count() or 1
+        os.makedirs(output_dir, exist_ok=True)
+
+        jobs = {}
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            ranges = _aligned_line_ranges(filepath_twi, filepath_english, num_workers * shards_per_worker, executor)
+            for filepath, lang, lang_ranges in ((filepath_twi, 'twi', ranges[0]),
+                                                (filepath_english, 'eng', ranges[1])):
+                name = os.path.basename(filepath)
+                jobs[lang] = [(filepath, start, end, lang, tokenize, os.path.join(output_dir, f"{name}.{index:05d}"))
+                              for index, (start, end) in enumerate(lang_ranges)]
+
+            futures = {lang: [executor.submit(_preprocess_range, *job) for job in lang_jobs]
+                       for lang, lang_jobs in jobs.items()}
+            line_counts = {lang: sum(future.result() for future in lang_futures)
+                           for lang, lang_futures in futures.items()}
+
+        if line_counts['twi'] != line_counts['eng']:
+            raise ValueError(
+                f"Parallel files are not aligned: {filepath_twi} has {line_counts['twi']} lines "
+                f"but {filepath_english} has {line_counts['eng']}"
+            )
+
+        return [job[-1] for job in jobs['twi']], [job[-1] for job in jobs['eng']]
+
+    # exact-dedup pass over a parallel corpus: writes every distinct
+    # (twi, english) pair once, in first-seen order, and returns a
+    # DuplicateReport with the pair and per-language duplicate counts
+    def deduplicate_parallel_dataset(self,filepath_twi,filepath_english,
+                                     output_twi,output_english):
+        report = DuplicateReport()
+        seen_pairs, seen_twi, seen_english = set(), set(), set()
+        with open(output_twi, 'w', encoding='utf-8') as twi_out, \
+                open(output_english, 'w', encoding='utf-8') as english_out:
+            for twi, english in self.iter_parallel_dataset(filepath_twi, filepath_english):
+                report.total_pairs += 1
+                digest = _digest(twi)
+                if digest in seen_twi:
+                    report.duplicate_twi += 1
+                seen_twi.add(digest)
+
+                digest = _digest(english)
+                if digest in seen_english:
+                    report.duplicate_english += 1
+                seen_english.add(digest)
+
+                digest = _digest(twi, english)
+                if digest in seen_pairs:
+                    report.duplicate_pairs += 1
+                    continue
+                seen_pairs.add(digest)
+                twi_out.write(twi + '\n')
+                english_out.write(english + '\n')
+        return report
+
+    # normalize (and optionally tokenize) a parallel corpus through an
+    # on-disk cache in cache_dir, keyed by the sha256 of both inputs and a
+    # fingerprint of the normalization config. when the inputs only grew by
+    # appended lines, the cached output of the old contents is copied and
+    # just the new tail is processed. the entry of the old contents is then
+    # removed if it was built from the same input paths and not returned by
+    # this instance, so a corpus appended to daily keeps a single entry while
+    # e.g. a train subset next to the full corpus keeps its own. returns
+    # the paths of the cached twi and english outputs, one normalized
+    # sentence per line
+    def preprocess_cached(self,filepath_twi='../data/jw300.en-tw.tw',
+                          filepath_english='../data/jw300.en-tw.en',
+                          cache_dir='../data/.kasa_cache',tokenize=False):
+        os.makedirs(cache_dir, exist_ok=True)
+        config = _config_fingerprint(tokenize)
+        inputs = {'twi': filepath_twi, 'eng': filepath_english}
+        sizes = {lang: os.path.getsize(path) for lang, path in inputs.items()}
+        digests, base = _find_cache_base(cache_dir, config, inputs, sizes)
+
+        key = hashlib.sha256(f"{config}:{digests['twi']}:{digests['eng']}".encode('utf-8')).hexdigest()
+        entry = os.path.join(cache_dir, key)
+        outputs = {lang: os.path.join(entry, f'{lang}.txt') for lang in inputs}
+        self._returned_cache_keys.add(key)
+        if os.path.exists(os.path.join(entry, _CACHE_MANIFEST)):
+            return outputs['twi'], outputs['eng']
+
+        staging = tempfile.mkdtemp(prefix='.tmp-', dir=cache_dir)
+        try:
+            lines = _stage_cache_entry(staging, cache_dir, base, inputs, tokenize)
+            manifest = {'key': key, 'config': config, 'lines': lines,
+                        'inputs': {lang: os.path.abspath(path) for lang, path in inputs.items()}}
+            for lang in inputs:
+                manifest[lang] = {'size': sizes[lang], 'sha256': digests[lang]}
+            _commit_cache_entry(staging, entry, manifest)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        if (base is not None and base.get('inputs') == manifest['inputs']
+                and base['key'] not in self._returned_cache_keys):
+            _remove_cache_entry(cache_dir, base['key'])
+        return outputs['twi'], outputs['eng']
+
+    # drop unwanted pairs in one streaming pass: yields the (twi, english)
+    # pairs that pass every filter, in order. a pair is counted against the
+    # first filter that rejects it in report, if one is given
+    def filter_pairs(self,pairs,filters=None,report=None):
+        filters = _default_filters() if filters is None else filters
+        if report is not None:
+            for pair_filter in filters:
+                report.dropped.setdefault(pair_filter.name, 0)
+
+        for twi, english in pairs:
+            if report is not None:
+                report.total_pairs += 1
+            rejected_by = next((pair_filter for pair_filter in filters if not pair_filter(twi, english)), None)
+            if rejected_by is not None:
+                if report is not None:
+                    report.dropped[rejected_by.name] += 1
+                continue
+            if report is not None:
+                report.kept_pairs += 1
+            yield twi, english
+
+    # normalize a stream of (twi, english) pairs block by block, e.g. the
+    # output of iter_parallel_dataset or filter_pairs
+    def normalize_pairs(self,pairs):
+        pairs = iter(pairs)
+        while block := list(islice(pairs, _NORMALIZE_BATCH_SIZE)):
+            twi_lines, english_lines = zip(*block)
+            yield from zip(self.normalize_batch(twi_lines, 'twi'), self.normalize_batch(english_lines, 'eng'))
 
+    # filter a parallel corpus file to file, keeping the surviving pairs in
+    # order, and return the FilterReport. filters default to dropping empty
+    # pairs, pairs over 200 tokens, pairs with a token length ratio over 3
+    # and exact duplicate pairs
+    def filter_parallel_dataset(self,filepath_twi,filepath_english,
+                                output_twi,output_english,filters=None):
+        report = FilterReport()
+        pairs = self.iter_parallel_dataset(filepath_twi, filepath_english)
+        with open(output_twi, 'w', encoding='utf-8') as twi_out, \
+                open(output_english, 'w', encoding='utf-8') as english_out:
+            for twi, english in self.filter_pairs(pairs, filters, report):
+                twi_out.write(twi + '\n')
+                english_out.write(english + '\n')
+        return report
@@ -0,0 +1,245 @@
+"""
+Command line entry point for kasa.
+
+Usage:
+
+    kasa translate book.txt -o book.tw.txt --lang en-tw
+    kasa translate records.jsonl.gz -o records.tw.jsonl --field text --max-in-flight 64
+    cat book.txt | kasa translate - > book.tw.txt
+    kasa transcribe recordings/ -o transcripts.jsonl --lang tw --workers 16
+    kasa transcribe manifest.txt -o transcripts.jsonl
+
+The API key is read from --api-key or the KHAYA_API_KEY environment variable.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO
+
+from kasa.Preprocessing import ends_with_newline, open_corpus
+from kasa.concurrency import ordered_map
+from kasa.text_chunker import BatchTranslator
+from kasa.transcription import (BatchTranscriber, TranscriptionResult, compact_output, completed_paths,
+                                find_audio_files, read_manifest)
+
+
+class Progress:
+    """Periodic progress and throughput report for a bulk job."""
+
+    def __init__(self, stream: TextIO = sys.stderr, interval: float = 5.0):
+        self.stream = stream
+        self.interval = interval
+        self.records = 0
+        self.characters = 0
+        self.failures = 0
+        self._start = self._last_report = time.monotonic()
+
+    def update(self, characters: int, failed: bool = False):
+        self.records += 1
+        self.characters += characters
+        self.failures += failed
+        now = time.monotonic()
+        if self.interval and now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def report(self, final: bool = False):
+        elapsed = max(time.monotonic() - self._start, 1e-9)
+        print(
+            f"{'done' if final else 'progress'}: {self.records:,} records, {self.failures:,} failed, "
+            f"{self.records / elapsed:,.1f} records/s, {self.characters / elapsed:,.0f} chars/s, {elapsed:,.1f}s",
+            file=self.stream,
+            flush=True,
+        )
+
+
+def translate_stream(lines: Iterable[str], output: TextIO, translate: Callable[[str], str], jsonl: bool = False,
+                     field: str = "text", output_field: str = "translation", max_in_flight: int = 16,
+                     progress: Optional[Progress] = None) -> Progress:
+    """Translate text lines or JSONL records, writing the results in input order as they complete.
+
+    Text lines are written back translated, one per line, with line breaks
+    inside a translation turned into spaces; a failed line is written empty
+    and reported on stderr. JSONL records get ``output_field`` added, or an
+    ``error`` field when their translation failed. A line that is not a JSON
+    object fails and is written as ``{"line": n, "error": ...}``.
+
+    Returns:
+        The progress counters of the job.
+    """
+    progress = progress or Progress(interval=0)
+
+    def translate_record(line: str) -> str:
+        if not jsonl:
+            return translate(line) if line.strip() else ""
+        record = _parse_record(line)
+        if record is None:
+            raise ValueError("record is not a JSON object")
+        text = record.get(field)
+        if not isinstance(text, str):
+            raise ValueError(f"record has no {field!r} text field")
+        return translate(text) if text.strip() else ""
+
+    records = (line.rstrip("\r\n") for line in lines)
+    if jsonl:
+        records = (line for line in records if line.strip())
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for number, (line, future) in enumerate(ordered_map(translate_record, records, executor, max_in_flight), 1):
+            error = future.exception()
+            if jsonl:
+                record = _parse_record(line) or {"line": number}
+                record[output_field if error is None else "error"] = str(error) if error else future.result()
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                output.write(("" if error else " ".join(future.result().splitlines())) + "\n")
+            if error is not None:
+                print(f"record {number}: {error}", file=sys.stderr)
+            output.flush()
+            progress.update(len(line), failed=error is not None)
+    return progress
+
+
+def _parse_record(line: str) -> Optional[dict]:
+    """The JSON object on a JSONL line, or None if the line holds anything else."""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def transcribe_stream(results: Iterator[TranscriptionResult], output: TextIO,
+                      progress: Optional[Progress] = None) -> Progress:
+    """Write transcription results as JSONL records as they come, reporting failures on stderr.
+
+    Returns:
+        The progress counters of the job.
+    """
+    progress = progress or Progress(interval=0)
+    for result in results:
+        output.write(result.to_json() + "\n")
+        output.flush()
+        if not result.ok:
+            print(f"{result.path}: {result.error}", file=sys.stderr)
+        progress.update(len(result.transcript or ""), failed=not result.ok)
+    return progress
+
+
+def _make_client(api_key: str):
+    # imported on first use, so that `kasa --help` and the code importing this
+    # module do not pay for loading httpx, pydantic and the khaya settings
+    from src.khaya.khaya_client import KhayaClient
+
+    return KhayaClient(api_key)
+
+
+def _translate_command(args: argparse.Namespace) -> int:
+    api_key = args.api_key or os.environ.get("KHAYA_API_KEY")
+    if not api_key:
+        print("kasa translate: an API key is required, pass --api-key or set KHAYA_API_KEY", file=sys.stderr)
+        return 2
+
+    jsonl = args.format == "jsonl" or (args.format == "auto" and ".jsonl" in os.path.basename(args.input))
+    source = sys.stdin if args.input == "-" else open_corpus(args.input)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    progress = Progress(interval=args.progress_interval)
+    try:
+        with BatchTranslator(_make_client(api_key), max_chunk_size=args.max_chunk_size, max_workers=args.workers,
+                             target_language=args.lang) as batch_translator:
+            translate_stream(source, output, batch_translator.chunk_translate, jsonl=jsonl, field=args.field,
+                             output_field=args.output_field, max_in_flight=args.max_in_flight, progress=progress)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    progress.report(final=True)
+    return 1 if progress.failures else 0
+
+
+def _transcribe_command(args: argparse.Namespace) -> int:
+    api_key = args.api_key or os.environ.get("KHAYA_API_KEY")
+    if not api_key:
+        print("kasa transcribe: an API key is required, pass --api-key or set KHAYA_API_KEY", file=sys.stderr)
+        return 2
+
+    paths = find_audio_files(args.input) if os.path.isdir(args.input) else read_manifest(args.input, args.field)
+    resume = args.output != "-" and not args.restart
+    done = completed_paths(args.output) if resume else set()
+    if done:
+        print(f"kasa transcribe: skipping {len(done):,} files already in {args.output}", file=sys.stderr)
+    output = sys.stdout if args.output == "-" else open(args.output, "a" if resume else "w", encoding="utf-8")
+    resumed = output is not sys.stdout and output.tell() > 0
+    # end a line torn by an interrupted run, so the next record does not run into it
+    if resumed and not ends_with_newline(args.output):
+        output.write("\n")
+    progress = Progress(interval=args.progress_interval)
+    try:
+        with BatchTranscriber(_make_client(api_key), language=args.lang, max_workers=args.workers) as transcriber:
+            results = transcriber.iter_transcribe(paths, skip=done, max_in_flight=args.max_in_flight)
+            transcribe_stream(results, output, progress=progress)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if resumed:
+        # files that failed before were retried at the end, drop their old records
+        compact_output(args.output)
+    progress.report(final=True)
+    return 1 if progress.failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="kasa", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    translate = commands.add_parser("translate", help="Translate a text or JSONL file record by record")
+    translate.add_argument("input", help="Input file, optionally compressed, or - for stdin")
+    translate.add_argument("-o", "--output", default="-", help="Output file, or - for stdout (default)")
+    translate.add_argument("--lang", default="en-tw", help="Language pair (default: en-tw)")
+    translate.add_argument("--format", choices=["auto", "text", "jsonl"], default="auto",
+                           help="Input format; auto picks jsonl for .jsonl files (default: auto)")
+    translate.add_argument("--field", default="text", help="JSONL field to translate (default: text)")
+    translate.add_argument("--output-field", default="translation",
+                           help="JSONL field the translation is written to (default: translation)")
+    translate.add_argument("--max-in-flight", type=int, default=16,
+                           help="Records read ahead of the next one written (default: 16)")
+    translate.add_argument("--workers", type=int, default=5, help="Concurrent API requests (default: 5)")
+    translate.add_argument("--max-chunk-size", type=int, default=1000,
+                           help="Records longer than this are translated in chunks (default: 1000)")
+    translate.add_argument("--progress-interval", type=float, default=5.0,
+                           help="Seconds between progress reports on stderr, 0 to disable (default: 5)")
+    translate.add_argument("--api-key", help="Khaya API key (default: $KHAYA_API_KEY)")
+    translate.set_defaults(func=_translate_command)
+
+    transcribe = commands.add_parser("transcribe", help="Transcribe a directory or manifest of audio files")
+    transcribe.add_argument("input", help="Directory searched for audio files, or a manifest listing one file per line")
+    transcribe.add_argument("-o", "--output", default="-",
+                            help="JSONL output, one record per file; files transcribed in it before are skipped (default: stdout)")
+    transcribe.add_argument("--lang", default="tw", help="Language spoken in the recordings (default: tw)")
+    transcribe.add_argument("--field", default="path",
+                            help="Field holding the file path in a JSONL manifest (default: path)")
+    transcribe.add_argument("--workers", type=int, default=8, help="Concurrent uploads (default: 8)")
+    transcribe.add_argument("--max-in-flight", type=int, default=None,
+                            help="Files started ahead of the next one written (default: twice --workers)")
+    transcribe.add_argument("--restart", action="store_true",
+                            help="Overwrite the output instead of skipping the files already in it")
+    transcribe.add_argument("--progress-interval", type=float, default=5.0,
+                            help="Seconds between progress reports on stderr, 0 to disable (default: 5)")
+    transcribe.add_argument("--api-key", help="Khaya API key (default: $KHAYA_API_KEY)")
+    transcribe.set_defaults(func=_transcribe_command)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
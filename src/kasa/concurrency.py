@@ -0,0 +1,216 @@
+import math
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class LatencyTracker:
+    """Thread-safe window of recent request latencies."""
+
+    def __init__(self, window: int = 50, min_samples: int = 10):
+        """Initialize the tracker.
+
+        Args:
+            window: Number of recent latencies kept
+            min_samples: Percentiles are None until this many latencies are recorded
+        """
+        self.min_samples = min_samples
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The ``q`` quantile (0 < q <= 1) of the recent latencies, if there are enough of them."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[math.ceil(q * len(ordered)) - 1]
+
+    def clear(self):
+        with self._lock:
+            self._latencies.clear()
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on the number of requests in flight.
+
+    The limit grows additively (by about one per ``limit`` successful requests)
+    while the latency of the last ``window`` requests stays flat, and is cut multiplicatively when the upstream
+    rate limits a request (HTTP 429) or when the p95 latency of recent requests
+    rises above ``latency_tolerance`` times the best p95 seen so far. After a
+    cut, further cuts wait until the requests started under the old limit
+    have drained, so one burst of slow responses only backs off once.
+
+    Example:
+
+    ```python
+    from kasa.concurrency import AdaptiveConcurrencyLimiter
+    from kasa.text_chunker import BatchTranslator
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=64)
+    translator = BatchTranslator(khaya, concurrency_limiter=limiter)
+    translator.chunk_translate(document)
+    print(limiter.limit, limiter.metrics())
+    ```
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 1.5,
+        window: int = 50,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            initial_limit: Requests allowed in flight at the start
+            min_limit: The limit never drops below this
+            max_limit: The limit never grows above this
+            backoff_factor: Multiplier applied to the limit on rate limiting or rising latency
+            latency_tolerance: How far the recent p95 latency may rise above the best p95 before backing off
+            window: Number of recent latencies the p95 is computed over
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._latencies = LatencyTracker(window)
+        self._best_p95: Optional[float] = None
+        self._cooldown = 0
+        self._successes = 0
+        self._rate_limited = 0
+        self._backoffs = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self):
+        """Block until a request may start."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency: Optional[float] = None, rate_limited: bool = False):
+        """Record the outcome of a request started with `acquire`.
+
+        Args:
+            latency: Seconds the request took; None for failures that say nothing about upstream load
+            rate_limited: True if the upstream answered HTTP 429
+        """
+        with self._condition:
+            self._in_flight -= 1
+            self._cooldown = max(self._cooldown - 1, 0)
+            if rate_limited:
+                self._rate_limited += 1
+                self._back_off()
+            elif latency is not None:
+                self._successes += 1
+                self._latencies.record(latency)
+                rising = self._latency_rising()
+                if rising:
+                    self._back_off()
+                elif rising is False:
+                    self._limit = min(self._limit + 1 / self._limit, float(self.max_limit))
+            self._condition.notify_all()
+
+    def record_retry(self, status_code: Optional[int] = None):
+        """Record a failed attempt that the HTTP client retries while the request stays in flight.
+
+        Can be added to the ``retry_listeners`` of a khaya client so that rate
+        limiting is seen even when the client retries it away.
+
+        Args:
+            status_code: HTTP status of the failed attempt; only 429 affects the limit
+        """
+        if status_code != 429:
+            return
+        with self._condition:
+            self._rate_limited += 1
+            self._back_off()
+
+    def p95_latency(self) -> Optional[float]:
+        """The 95th percentile of the recent latencies, if there are enough of them."""
+        return self._latencies.percentile(0.95)
+
+    def metrics(self) -> Dict[str, Optional[float]]:
+        """Snapshot of the limiter state for logging or monitoring."""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "p95_latency": self.p95_latency(),
+                "best_p95_latency": self._best_p95,
+                "successes": self._successes,
+                "rate_limited": self._rate_limited,
+                "backoffs": self._backoffs,
+            }
+
+    def _latency_rising(self) -> Optional[bool]:
+        """Compare the recent p95 to the best one; None until there are enough samples."""
+        p95 = self.p95_latency()
+        if p95 is None:
+            return None
+        if self._best_p95 is None or p95 < self._best_p95:
+            self._best_p95 = p95
+        if p95 > self._best_p95 * self.latency_tolerance and self._limit <= self.min_limit:
+            # latency stays high even at the lowest limit, so it is the new baseline
+            self._best_p95 = p95
+        return p95 > self._best_p95 * self.latency_tolerance
+
+    def _back_off(self):
+        if self._cooldown:
+            return
+        self._limit = max(self._limit * self.backoff_factor, float(self.min_limit))
+        self._backoffs += 1
+        # let the requests started under the old limit drain before cutting again
+        self._cooldown = self._in_flight + 1
+        self._latencies.clear()
+
+
+def ordered_map(func: Callable[[T], R], items: Iterable[T], executor: ThreadPoolExecutor,
+                max_in_flight: int) -> Iterator[Tuple[T, Future[R]]]:
+    """Apply ``func`` to ``items`` on ``executor``, yielding ``(item, done future)`` in input order.
+
+    At most ``max_in_flight`` items are submitted ahead of the next one to
+    yield, so the input is read lazily and memory stays bounded.
+    """
+    items = iter(items)
+    pending: List[Tuple[T, Future[R]]] = [(item, executor.submit(func, item)) for item in islice(items, max_in_flight)]
+    try:
+        while pending:
+            item, future = pending.pop(0)
+            future.exception()
+            for next_item in islice(items, 1):
+                pending.append((next_item, executor.submit(func, next_item)))
+            yield item, future
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -0,0 +1,151 @@
+import mmap
+import os
+import random
+import struct
+from array import array
+from typing import List, Optional, Tuple, Union
+
+from kasa.Preprocessing import detect_compression, iter_line_ends
+
+# on-disk index layout: magic, source size, source mtime (ns), line count,
+# followed by line count + 1 native-endian uint64 byte offsets. version 2
+# also ends lines at a lone \r
+INDEX_MAGIC = b"KASAIDX2"
+INDEX_HEADER = struct.Struct("=8sQQQ")
+INDEX_SUFFIX = ".idx"
+
+
+class LineIndex:
+    """Memory-mapped text file with a persistent line-offset index.
+
+    The index is built once by scanning the file and saved next to it (or in
+    ``index_dir``). Later opens validate it against the file size and mtime and
+    mmap both files, so opening is independent of the corpus size.
+    """
+
+    def __init__(self, filepath: str, index_dir: Optional[str] = None):
+        compression = detect_compression(filepath)
+        if compression:
+            raise ValueError(f"{filepath} is {compression}-compressed; decompress it to use random access")
+        self.filepath = filepath
+        self.index_path = self._index_path(filepath, index_dir)
+
+        stat = os.stat(filepath)
+        if not self._index_is_fresh(stat):
+            self._build_index(stat)
+
+        self._data_file = open(filepath, "rb")
+        self._data = (
+            mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if stat.st_size else b""
+        )
+        self._index_file = open(self.index_path, "rb")
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, _, self._count = INDEX_HEADER.unpack_from(self._index)
+        self._offsets = memoryview(self._index)[INDEX_HEADER.size:].cast("Q")
+
+    @staticmethod
+    def _index_path(filepath: str, index_dir: Optional[str]) -> str:
+        if index_dir is None:
+            return filepath + INDEX_SUFFIX
+        os.makedirs(index_dir, exist_ok=True)
+        return os.path.join(index_dir, os.path.basename(filepath) + INDEX_SUFFIX)
+
+    def _index_is_fresh(self, stat: os.stat_result) -> bool:
+        try:
+            with open(self.index_path, "rb") as file:
+                header = file.read(INDEX_HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) != INDEX_HEADER.size:
+            return False
+        magic, size, mtime_ns, _ = INDEX_HEADER.unpack(header)
+        return magic == INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+    def _build_index(self, stat: os.stat_result):
+        offsets = array("Q", [0])
+        with open(self.filepath, "rb") as file:
+            # lines end like in Preprocessing.read_parallel_dataset: \n, \r\n or a lone \r
+            offsets.extend(iter_line_ends(file))
+            size = file.tell()
+        # a final line without a trailing newline still counts as a line
+        if offsets[-1] != size:
+            offsets.append(size)
+
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets) - 1))
+            offsets.tofile(file)
+        os.replace(tmp_path, self.index_path)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def line(self, i: int) -> str:
+        """Return line ``i`` stripped of surrounding whitespace."""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(f"line index {i} out of range for {self._count} lines")
+        return self._data[self._offsets[i]:self._offsets[i + 1]].decode("utf-8").strip()
+
+    def close(self):
+        self._offsets.release()
+        self._index.close()
+        self._index_file.close()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data_file.close()
+
+
+class ParallelCorpus:
+    """Random-access view over an aligned Twi/English corpus.
+
+    Example:
+
+    ```python
+    from kasa.corpus_store import ParallelCorpus
+
+    with ParallelCorpus("jw300.en-tw.tw", "jw300.en-tw.en") as corpus:
+        twi, english = corpus.pair(1234)
+        batch = corpus[1000:1032]
+        sample = corpus.sample(16, seed=0)
+    ```
+    """
+
+    def __init__(self, filepath_twi: str, filepath_english: str, index_dir: Optional[str] = None):
+        self.twi = LineIndex(filepath_twi, index_dir)
+        self.english = LineIndex(filepath_english, index_dir)
+        if len(self.twi) != len(self.english):
+            self.close()
+            raise ValueError(
+                f"Parallel files are not aligned: {filepath_twi} has {len(self.twi)} lines "
+                f"but {filepath_english} has {len(self.english)}"
+            )
+
+    def __len__(self) -> int:
+        return len(self.twi)
+
+    def pair(self, i: int) -> Tuple[str, str]:
+        """Return the ``(twi, english)`` pair at line ``i``."""
+        return self.twi.line(i), self.english.line(i)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Tuple[str, str], List[Tuple[str, str]]]:
+        if isinstance(key, slice):
+            return [self.pair(i) for i in range(*key.indices(len(self)))]
+        return self.pair(key)
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[Tuple[str, str]]:
+        """Return ``k`` distinct pairs drawn uniformly at random."""
+        rng = random.Random(seed)
+        return [self.pair(i) for i in rng.sample(range(len(self)), k)]
+
+    def close(self):
+        self.twi.close()
+        self.english.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
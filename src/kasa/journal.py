@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict
+
+from kasa.Preprocessing import ends_with_newline
+
+
+class TranslationJournal:
+    """Append-only log of translated chunks for resuming interrupted translations.
+
+    Every completed chunk is appended as one JSON line holding the document
+    fingerprint, the chunk index and the translation, and flushed right away,
+    so a crashed job loses at most the chunks that were in flight. A partially
+    written last line is ignored when the journal is read back.
+
+    Example:
+
+    ```python
+    from kasa.journal import TranslationJournal
+    from kasa.text_chunker import BatchTranslator
+
+    with TranslationJournal("book.journal.jsonl") as journal:
+        translator = BatchTranslator(khaya, journal=journal)
+        # after a crash, running this again only sends the missing chunks
+        translation = translator.chunk_translate(book)
+    ```
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        """Open (or create) the journal.
+
+        Args:
+            path: Journal file, created if it does not exist
+            fsync: Also fsync after every record, so that entries survive a power loss and not just a crash
+        """
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        # end a line torn by a crash, so the next record does not run into it
+        if self._file.tell() and not ends_with_newline(path):
+            self._file.write("\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def completed(self, fingerprint: str) -> Dict[int, str]:
+        """Translations recorded for a document, by chunk index."""
+        translations = {}
+        with self._lock:
+            self._file.flush()
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("doc") == fingerprint:
+                        translations[entry["chunk"]] = entry["text"]
+        return translations
+
+    def record(self, fingerprint: str, index: int, translation: str):
+        """Append the translation of one chunk."""
+        line = json.dumps({"doc": fingerprint, "chunk": index, "text": translation}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def document_fingerprint(text: str, *settings) -> str:
+    """Identify a document together with the settings that decide its chunks and translations."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(settings).encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
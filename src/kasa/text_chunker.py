@@ -1,6 +1,24 @@
+import asyncio
+import inspect
+import re
+import time
 from dataclasses import dataclass
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Any, Awaitable, Callable, Iterator, List, Dict, Optional, Protocol, runtime_checkable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+
+from kasa.concurrency import AdaptiveConcurrencyLimiter, LatencyTracker
+from kasa.journal import TranslationJournal, document_fingerprint
+
+# abbreviations whose trailing period does not end a sentence
+_ABBREVIATIONS = frozenset({"Dr", "Mr", "Mrs", "Ms", "Prof", "St", "Jr", "Sr", "Rev", "Hon", "Gen", "Fig", "No", "vs",
+                            "etc", "e.g", "i.e", "cf", "al"})
+# a sentence ends with terminal punctuation, optionally followed by closing quotes or brackets, before
+# whitespace; a line break also ends one
+_TERMINATORS = ".!?"
+_CLOSERS = "\"'”’)]"
+_OPENERS = "\"'“‘(["
+_NON_SPACE = re.compile(r"\S")
 
 @dataclass
 class TextChunk:
@@ -8,22 +26,132 @@ class TextChunk:
     content: str
     index: int
 
+@dataclass
+class BatchTranslationResult:
+    """Translations returned by `BatchTranslator.translate_many`."""
+    translations: List[str]
+    total_chunks: int
+    unique_chunks: int
+
+    @property
+    def api_calls_saved(self) -> int:
+        """Chunk requests avoided by translating identical chunks only once."""
+        return self.total_chunks - self.unique_chunks
+
+@dataclass
+class ChunkStatus:
+    """Outcome of translating one chunk."""
+    index: int
+    source: str
+    translated_text: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+@dataclass
+class PartialTranslationResult:
+    """Per-chunk results of `BatchTranslator.chunk_translate_partial`, failed chunks included."""
+    chunks: List[ChunkStatus]
+    # journal key of the document, set when the translator has a journal
+    fingerprint: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """Translations of the successful chunks, in document order."""
+        return " ".join(c.translated_text for c in self.chunks if c.ok and c.translated_text is not None)
+
+    @property
+    def failed_indices(self) -> List[int]:
+        return [c.index for c in self.chunks if not c.ok]
+
+    @property
+    def complete(self) -> bool:
+        """True when every chunk was translated; `text` then equals `BatchTranslator.chunk_translate`."""
+        return all(c.ok for c in self.chunks)
+
+@runtime_checkable
+class AsyncTranslator(Protocol):
+    """Translator usable by `BatchTranslator.achunk_translate`, e.g. `KhayaClient`."""
+
+    async def atranslate(self, text: str, target_language: str) -> Any:
+        ...
+
+
 class BatchTranslator:
     """Simple chunking and translating for large texts."""
     
-    def __init__(self, translator, max_chunk_size: int = 1000, max_workers: int = 5, target_language: str = "en-tw"):
+    def __init__(self, translator, max_chunk_size: int = 1000, max_workers: int = 5, target_language: str = "en-tw",
+                 max_concurrency: int = 100, concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 max_chunk_tokens: Optional[int] = None, hedge_requests: bool = False,
+                 journal: Optional[TranslationJournal] = None):
         """Initialize the BatchTranslator.
         
         Args:
-            translator: The translator object with a translate method
+            translator: The translator object with a translate method (and optionally an async atranslate method)
             max_chunk_size: Maximum size of each chunk in characters
             max_workers: Maximum number of parallel translation workers
             target_language: Target language code for translation
+            max_concurrency: Maximum number of chunk requests in flight in achunk_translate
+            concurrency_limiter: Adapts the number of chunk requests in flight to the API's latency
+                and rate limiting. The worker pool then has ``concurrency_limiter.max_limit`` threads
+                and ``max_workers`` only sets the read-ahead of `iter_chunk_translate`. Until `close`,
+                rate limited attempts that a ``KhayaClient`` retries by itself are reported to it as well.
+            max_chunk_tokens: Optional maximum number of whitespace-separated tokens per chunk
+            hedge_requests: Send a second request for a chunk that is still running after the observed
+                p95 chunk latency and use whichever answers first. Applies to the thread pool methods.
+            journal: Records every translated chunk so that translating the same document again only
+                sends the chunks that are missing. Used by the single-document thread pool methods.
         """
         self.translator = translator
         self.max_workers = max_workers
         self.max_chunk_size = max_chunk_size
+        self.max_chunk_tokens = max_chunk_tokens
         self.target_language = target_language
+        self.max_concurrency = max_concurrency
+        self.concurrency_limiter = concurrency_limiter
+        self.hedge_requests = hedge_requests
+        self.journal = journal
+        self._latencies = LatencyTracker()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        # retry listeners of the translator's HTTP client that the limiter was added to
+        self._retry_listeners: Optional[List[Callable[[Optional[int]], None]]] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shut down the worker pools; a later call starts new ones."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._retry_listeners is not None:
+            assert self.concurrency_limiter is not None
+            self._retry_listeners.remove(self.concurrency_limiter.record_retry)
+            self._retry_listeners = None
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=True)
+            self._hedge_executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Worker pool shared by every call on this translator, created on first use."""
+        if self._executor is None:
+            workers = self.max_workers if self.concurrency_limiter is None else self.concurrency_limiter.max_limit
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+            if self.concurrency_limiter is not None:
+                self._retry_listeners = _report_retries(self.translator, self.concurrency_limiter)
+        return self._executor
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """Pool running the requests of hedged chunks, with room for two per worker."""
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=2 * self._get_executor()._max_workers)
+        return self._hedge_executor
     
     def chunk_translate(self, text: str) -> str:
         """Translate large text by chunking, translating in parallel, and reassembling."""
@@ -34,98 +162,366 @@ class BatchTranslator:
         chunks = self._create_chunks(text)
         
         # translate chunks in parallel
-        results = self._multichunk_translate(chunks)
+        results = self._multichunk_translate(chunks, self._fingerprint(text))
+        
+        return self._assemble(results)
+
+    def chunk_translate_partial(self, text: str) -> PartialTranslationResult:
+        """Translate large text like `chunk_translate`, but keep going when chunks fail.
+
+        Returns the status of every chunk instead of raising, so the successful
+        translations are kept and `retry_failed` can re-send only the failures.
+        """
+        chunks = self._create_chunks(text) if text else []
+        fingerprint = self._fingerprint(text)
+        results = self._multichunk_translate(chunks, fingerprint)
+        return PartialTranslationResult(chunks=[_chunk_status(c, r) for c, r in zip(chunks, results)],
+                                        fingerprint=fingerprint)
+
+    def retry_failed(self, result: PartialTranslationResult) -> PartialTranslationResult:
+        """Re-send the failed chunks of ``result`` and merge them back into a new result."""
+        failed = [TextChunk(content=c.source, index=c.index) for c in result.chunks if not c.ok]
+        results = self._multichunk_translate(failed, result.fingerprint)
+        retried = {c.index: c for c in map(_chunk_status, failed, results)}
+        return PartialTranslationResult(chunks=[retried.get(c.index, c) for c in result.chunks],
+                                        fingerprint=result.fingerprint)
+
+    def iter_chunk_translate(self, text: str) -> Iterator[str]:
+        """Translate large text chunk by chunk, yielding translations in document order.
+
+        Each chunk is yielded as soon as it and every chunk before it are done.
+        At most ``2 * max_workers`` chunks are submitted ahead of the next one to
+        yield, which bounds how many out-of-order results are held back. Joining
+        the yielded chunks with spaces gives the result of `chunk_translate`.
+
+        Raises:
+            ValueError: When a chunk fails, after yielding every chunk before it.
+        """
+        if not text:
+            return
+
+        chunks = iter(self._create_chunks(text))
+        executor = self._get_executor()
+        fingerprint = self._fingerprint(text)
+        done: Dict[int, str] = {}
+        if fingerprint:
+            assert self.journal is not None
+            done = self.journal.completed(fingerprint)
+
+        def submit(chunk: TextChunk) -> Future:
+            if chunk.index not in done:
+                return executor.submit(self._translate_chunk, chunk)
+            future: Future = Future()
+            future.set_result({'index': chunk.index, 'translated_text': done[chunk.index]})
+            return future
+
+        # futures of submitted chunks in document order, the reorder buffer
+        pending = [submit(chunk) for chunk in islice(chunks, 2 * self.max_workers)]
+        try:
+            while pending:
+                result = pending.pop(0).result()
+                for chunk in islice(chunks, 1):
+                    pending.append(submit(chunk))
+                if 'error' in result:
+                    raise ValueError(f"Translation failed for chunk {result['index']}: {result['error']}")
+                if fingerprint and result['index'] not in done:
+                    assert self.journal is not None
+                    self.journal.record(fingerprint, result['index'], result['translated_text'])
+                yield result['translated_text']
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def translate_many(self, documents: List[str]) -> BatchTranslationResult:
+        """Translate many documents with one pool, sending each distinct chunk only once.
+
+        All documents are chunked up front, identical chunks across (and within)
+        documents are translated a single time on the shared worker pool, and
+        the translations are reassembled per document.
+
+        Raises:
+            ValueError: If any distinct chunk fails to translate.
+        """
+        unique: Dict[str, TextChunk] = {}
+        document_chunks = []
+        for document in documents:
+            chunks = self._create_chunks(document) if document else []
+            for chunk in chunks:
+                unique.setdefault(chunk.content, TextChunk(content=chunk.content, index=len(unique)))
+            document_chunks.append(chunks)
+
+        results = self._multichunk_translate(list(unique.values()))
+        self._check_errors(results)
+        translated = [r['translated_text'] for r in results]
+
+        return BatchTranslationResult(
+            translations=[" ".join(translated[unique[chunk.content].index] for chunk in chunks)
+                          for chunks in document_chunks],
+            total_chunks=sum(len(chunks) for chunks in document_chunks),
+            unique_chunks=len(unique),
+        )
+
+    async def achunk_translate(self, text: str) -> str:
+        """Translate large text like `chunk_translate`, with chunks fanned out as asyncio tasks.
+
+        Up to ``max_concurrency`` chunk requests are in flight at once, all sharing
+        the translator's async connection pool instead of one thread per request.
+        """
+        if not text:
+            return ""
+
+        chunks = self._create_chunks(text)
+        results = await self._amultichunk_translate(chunks)
+
+        return self._assemble(results)
+
+    def _assemble(self, results: List[Dict]) -> str:
+        """Join translated chunks in order, raising ValueError if any chunk failed."""
+        self._check_errors(results)
         
+        # assemble translated text
+        translated_text = " ".join(r['translated_text'] for r in results)
+        
+        return translated_text
+    
+    def _check_errors(self, results: List[Dict]):
+        """Raise ValueError listing every failed chunk, if any."""
         # check if there are errors in chunk translation. 
         errors = [r for r in results if 'error' in r]
         if errors:
             error_msg = f"Translation failed for {len(errors)} of {len(results)} chunks: "
             error_details = [f"Chunk {r['index']}: {r['error']}" for r in errors]
             raise ValueError(error_msg + "; ".join(error_details))
-        
-        # assemble translated text
-        translated_text = " ".join(r['translated_text'] for r in results)
-        
-        return translated_text
     
     def _create_chunks(self, text: str) -> List[TextChunk]:
-        """Split text into chunks with maximum character limit."""
-        chunks = []
-        start = 0
-        chunk_index = 0
-        
-        while start < len(text):
-            # end position 
-            end = min(start + self.max_chunk_size, len(text))
-            
-            # search for chunk boundary
-            if end < len(text):
-                chunk_text = text[start:end]
-                
-                # break at sentence boundaries or spaces
-                separators = ['. ', '! ', '? ', ' ']
-                for separator in separators:
-                    position = chunk_text.rfind(separator)
-                    if position > 0:
-                        end = start + position + len(separator)
-                        break
-            
-            # create chunk and add to list
-            if (chunk_text := text[start:end].strip()):
-                chunks.append(TextChunk(content=chunk_text, index=chunk_index))
-                chunk_index += 1
-            
-            # next position
-            start = end
-        
+        """Split text into chunks of whole sentences, packed greedily up to the size limits.
+
+        Each chunk ends at the last sentence end that keeps it within the limits,
+        found by searching back from the limit, so the work per chunk does not
+        depend on the number of sentences in it. Without a sentence end in
+        reach the chunk ends between words, and a word over ``max_chunk_size``
+        is cut.
+        """
+        chunks: List[TextChunk] = []
+        length = len(text)
+        position = 0
+        while first := _NON_SPACE.search(text, position):
+            start = first.start()
+            limit = min(start + self.max_chunk_size, length)
+            if self.max_chunk_tokens is not None:
+                limit = _token_limit(text, start, limit, self.max_chunk_tokens)
+            if limit == length:
+                end = length
+            else:
+                end = _last_sentence_end(text, start, limit) or _last_word_end(text, start, limit)
+            chunks.append(TextChunk(content=text[start:end].rstrip(), index=len(chunks)))
+            position = end
+
         return chunks
-    
-    def _multichunk_translate(self, chunks: List[TextChunk]) -> List[Dict]:
-        """Translate chunks in parallel."""
-        results = []
+
+    def _fingerprint(self, text: str) -> Optional[str]:
+        """Journal key of a document, or None without a journal."""
+        if self.journal is None:
+            return None
+        return document_fingerprint(text, self.target_language, self.max_chunk_size, self.max_chunk_tokens)
+
+    def _multichunk_translate(self, chunks: List[TextChunk], fingerprint: Optional[str] = None) -> List[Dict]:
+        """Translate chunks in parallel.
+
+        With a document ``fingerprint``, chunks found in the journal are not sent
+        again and every newly translated chunk is recorded as soon as it is done.
+        """
+        done: Dict[int, str] = {}
+        if fingerprint:
+            assert self.journal is not None
+            done = self.journal.completed(fingerprint)
+        results: List[Dict] = [{'index': chunk.index, 'translated_text': done[chunk.index]}
+                               for chunk in chunks if chunk.index in done]
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {executor.submit(self._translate_chunk, chunk): chunk for chunk in chunks}
-            
-            for future in as_completed(futures):
-                try:
-                    results.append(future.result())
-                except Exception as e:
-                    chunk = futures[future]
-                    results.append({
-                        'index': chunk.index, 
-                        'error': str(e)
-                    })
+        executor = self._get_executor()
+        futures = {executor.submit(self._translate_chunk, chunk): chunk for chunk in chunks if chunk.index not in done}
+        
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                chunk = futures[future]
+                results.append({
+                    'index': chunk.index, 
+                    'error': str(e)
+                })
+            if fingerprint and 'error' not in results[-1]:
+                assert self.journal is not None
+                self.journal.record(fingerprint, results[-1]['index'], results[-1]['translated_text'])
         
         # sort results by index before returning
         return sorted(results, key=lambda x: x['index'])
     
     def _translate_chunk(self, chunk: TextChunk) -> Dict:
-        """Translate a single chunk."""
+        """Translate a single chunk, hedging the request if enabled."""
+        hedge_after = self._latencies.percentile(0.95) if self.hedge_requests else None
+        if hedge_after is None:
+            return self._request_chunk(chunk)
+
+        executor = self._get_hedge_executor()
+        attempts = [executor.submit(self._request_chunk, chunk)]
+        done, _ = wait(attempts, timeout=hedge_after)
+        if not done:
+            attempts.append(executor.submit(self._request_chunk, chunk))
+
+        # take the first successful attempt, or the last failure; a losing request is left to finish
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            results = [future.result() for future in done]
+            result = next((r for r in results if 'error' not in r), results[0])
+            if 'error' not in result:
+                break
+        return result
+
+    def _request_chunk(self, chunk: TextChunk) -> Dict:
+        """Send one translation request for a chunk."""
+        limiter = self.concurrency_limiter
+        if limiter is not None:
+            limiter.acquire()
+        start = time.monotonic()
+        # only successes tell the limiter about upstream latency
+        latency = None
+        rate_limited = False
         try:
             # call the translate method
             response = self.translator.translate(chunk.content, self.target_language)
-            
-            if isinstance(response, dict) and 'type' in response:
-                return {
-                    'index': chunk.index, 
-                    'error': response.get('message', 'Unknown API error')
-                }
-            
-            if hasattr(response, 'text'):
-                return {
-                    'index': chunk.index,
-                    'translated_text': response.text
-                }
-            
+            rate_limited = _is_rate_limited(response)
+            result = self._parse_response(chunk, response)
+            if 'error' not in result:
+                latency = time.monotonic() - start
+                self._latencies.record(latency)
+            return result
+        except Exception as e:
+            rate_limited = _is_rate_limited(e)
+            return {'index': chunk.index, 'error': str(e)}
+        finally:
+            if limiter is not None:
+                limiter.release(latency, rate_limited)
+
+    async def _amultichunk_translate(self, chunks: List[TextChunk]) -> List[Dict]:
+        """Translate chunks concurrently on the event loop."""
+        translate = self._async_translate_method()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def translate_chunk(chunk: TextChunk) -> Dict:
+            async with semaphore:
+                return await self._atranslate_chunk(translate, chunk)
+
+        # gather keeps the results in chunk order
+        return list(await asyncio.gather(*(translate_chunk(chunk) for chunk in chunks)))
+
+    async def _atranslate_chunk(self, translate: Callable[[str, str], Awaitable[Any]], chunk: TextChunk) -> Dict:
+        """Translate a single chunk with an async translate method."""
+        try:
+            response = await translate(chunk.content, self.target_language)
+            return self._parse_response(chunk, response)
+        except Exception as e:
+            return {'index': chunk.index, 'error': str(e)}
+
+    def _async_translate_method(self) -> Callable[[str, str], Awaitable[Any]]:
+        """Pick the translator's ``atranslate``, or ``translate`` if that is itself a coroutine function."""
+        if isinstance(self.translator, AsyncTranslator):
+            return self.translator.atranslate
+        if inspect.iscoroutinefunction(getattr(self.translator, 'translate', None)):
+            return self.translator.translate
+        raise TypeError(f"{type(self.translator).__name__} has no async translate method")
+
+    def _parse_response(self, chunk: TextChunk, response: Any) -> Dict:
+        """Turn a translator response into a chunk result."""
+        if isinstance(response, dict) and 'type' in response:
+            return {
+                'index': chunk.index, 
+                'error': response.get('message', 'Unknown API error')
+            }
+        
+        if hasattr(response, 'text'):
             return {
                 'index': chunk.index,
-                'error': f"Unexpected response type: {type(response)}"
+                'translated_text': response.text
             }
-                
-        except Exception as e:
-            return {'index': chunk.index, 'error': str(e)}
         
-    
-                        
-                        
+        return {
+            'index': chunk.index,
+            'error': f"Unexpected response type: {type(response)}"
+        }
+
+
+def _chunk_status(chunk: TextChunk, result: Dict) -> ChunkStatus:
+    """Combine a chunk with its translation result."""
+    return ChunkStatus(index=chunk.index, source=chunk.content, translated_text=result.get('translated_text'),
+                       error=result.get('error'))
+
+
+def _report_retries(translator: Any,
+                    limiter: AdaptiveConcurrencyLimiter) -> Optional[List[Callable[[Optional[int]], None]]]:
+    """Add the limiter to the retry listeners of the translator's HTTP client, returning the list it was added to."""
+    listeners = getattr(getattr(translator, 'http_client', None), 'retry_listeners', None)
+    if listeners is None or limiter.record_retry in listeners:
+        return None
+    listeners.append(limiter.record_retry)
+    return listeners
+
+
+def _is_rate_limited(outcome: Any) -> bool:
+    """Whether a translator response or exception signals HTTP 429."""
+    if isinstance(outcome, dict):
+        return outcome.get('status_code') == 429
+    return getattr(outcome, 'status_code', None) == 429
+
+
+def _token_limit(text: str, start: int, limit: int, max_tokens: int) -> int:
+    """Start of the token after the first ``max_tokens`` in ``text[start:limit]``, or ``limit`` if there is none."""
+    # one split of the window runs in C, unlike a loop or a regex over its tokens
+    words = text[start:limit].split(None, max_tokens)
+    return limit - len(words[max_tokens]) if len(words) > max_tokens else limit
+
+
+def _last_sentence_end(text: str, start: int, limit: int) -> Optional[int]:
+    """End of the last sentence in ``text[start:limit]``, or None if no sentence ends there."""
+    newline = text.rfind("\n", start, limit)
+    position = limit
+    while True:
+        candidate = max(text.rfind(terminator, start, position) for terminator in _TERMINATORS)
+        if candidate <= newline:
+            return newline + 1 if newline >= 0 else None
+        end = _sentence_end_at(text, start, candidate, limit)
+        if end is not None:
+            return end
+        position = candidate
+
+
+def _sentence_end_at(text: str, start: int, terminator: int, limit: int) -> Optional[int]:
+    """End of the sentence closed by the punctuation at ``terminator``, or None if it does not end one."""
+    end = terminator + 1
+    while end < limit and text[end] in _TERMINATORS:
+        end += 1
+    while end < limit and text[end] in _CLOSERS:
+        end += 1
+    # the character at limit still tells whether the sentence ends there
+    if not text[end].isspace():
+        return None
+    if text[terminator] == ".":
+        word_start = terminator
+        while word_start > start and not text[word_start - 1].isspace():
+            word_start -= 1
+        word = text[word_start:terminator].lstrip(_OPENERS)
+        # an abbreviation, or an initial like the J. in "J. Doe"
+        if word in _ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+            return None
+    return end
+
+
+def _last_word_end(text: str, start: int, limit: int) -> int:
+    """End of the last word in ``text[start:limit]``, or ``limit`` to cut a word longer than that."""
+    if text[limit].isspace():
+        return limit
+    end = limit
+    while end > start and not text[end - 1].isspace():
+        end -= 1
+    return end if end > start else limit
@@ -0,0 +1,210 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Set
+
+from kasa.Preprocessing import open_corpus
+from kasa.concurrency import ordered_map
+
+# file extensions picked up when transcribing a directory
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".opus", ".m4a", ".webm")
+
+
+@dataclass
+class TranscriptionResult:
+    """The transcript of one audio file, or why there is none."""
+
+    path: str
+    language: str
+    transcript: Optional[str] = None
+    error: Optional[str] = None
+    # seconds from starting the upload until the transcript came back
+    latency: float = 0.0
+    bytes: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+
+class Transcriber(Protocol):
+    """Anything with a ``transcribe(path, language)`` method, e.g. ``KhayaClient``."""
+
+    def transcribe(self, audio_file_path: str, language: str) -> Any:
+        ...
+
+
+class BatchTranscriber:
+    """Transcribe many audio files concurrently, yielding the results in input order.
+
+    Files are uploaded by the client as they are read, so memory use depends on
+    ``max_workers`` and not on the size of the recordings.
+
+    Example:
+
+    ```python
+    from kasa.transcription import BatchTranscriber, find_audio_files
+
+    with BatchTranscriber(khaya, language="tw", max_workers=8) as transcriber:
+        for result in transcriber.iter_transcribe(find_audio_files("recordings/")):
+            print(result.path, result.transcript or result.error)
+    ```
+    """
+
+    def __init__(self, transcriber: Transcriber, language: str = "tw", max_workers: int = 8):
+        """Initialize the batch transcriber.
+
+        Args:
+            transcriber: Client with a ``transcribe(path, language)`` method
+            language: Language spoken in the recordings
+            max_workers: Number of files uploaded at the same time
+        """
+        self.transcriber = transcriber
+        self.language = language
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def transcribe_file(self, path: str) -> TranscriptionResult:
+        """Transcribe one file; failures are returned in the result rather than raised."""
+        result = TranscriptionResult(path=path, language=self.language)
+        start = time.monotonic()
+        try:
+            result.bytes = os.path.getsize(path)
+            result.transcript = _parse_transcript(self.transcriber.transcribe(path, self.language))
+        except Exception as e:
+            result.error = str(e)
+        result.latency = time.monotonic() - start
+        return result
+
+    def iter_transcribe(self, paths: Iterable[str], skip: Iterable[str] = (),
+                        max_in_flight: Optional[int] = None) -> Iterator[TranscriptionResult]:
+        """Transcribe files concurrently, yielding each result in the order of ``paths``.
+
+        Args:
+            paths: Audio files to transcribe, read lazily
+            skip: Files to leave out, e.g. those already transcribed by an earlier run
+            max_in_flight: Files started ahead of the next result to yield (default: 2 * max_workers)
+
+        Returns:
+            Iterator over the results
+        """
+        skip = set(skip)
+        pending = (path for path in paths if path not in skip)
+        for _, future in ordered_map(self.transcribe_file, pending, self.executor,
+                                     max_in_flight or 2 * self.max_workers):
+            yield future.result()
+
+
+def find_audio_files(directory: str, extensions: Iterable[str] = AUDIO_EXTENSIONS) -> List[str]:
+    """Audio files under ``directory``, recursively, in a stable (sorted) order."""
+    extensions = tuple(extension.lower() for extension in extensions)
+    found: List[str] = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        found.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(extensions))
+    return found
+
+
+def read_manifest(filepath: str, field: str = "path") -> Iterator[str]:
+    """Audio file paths listed in a manifest, relative ones resolved against the manifest's directory.
+
+    The manifest holds one path per line, or one JSON record per line with the
+    path in ``field``. It may be compressed like any corpus file.
+    """
+    base = os.path.dirname(filepath)
+    with open_corpus(filepath) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line:
+                continue
+            path = json.loads(line)[field] if line.startswith("{") else line
+            yield os.path.join(base, path)
+
+
+def completed_paths(output_path: str) -> Set[str]:
+    """Files transcribed without error in an existing JSONL output, so a rerun can skip them."""
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as output:
+        for line in output:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # a line torn by an interrupted run
+                continue
+            if record.get("error") is None and "path" in record:
+                completed.add(record["path"])
+    return completed
+
+
+def compact_output(output_path: str) -> int:
+    """Rewrite a JSONL output resumed by later runs so it holds one record per file.
+
+    A file retried after a failure gets a second record at the end of the
+    output. The last record of each file is kept, in the place of its first,
+    so the output stays in input order; lines torn by an interrupted run are
+    dropped.
+
+    Returns:
+        The number of lines dropped
+    """
+    # byte offset of the last record of each file, in the order the files first appear
+    offsets: Dict[Any, int] = {}
+    lines = 0
+    with open(output_path, "rb") as output:
+        offset = 0
+        for line in output:
+            lines += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            if isinstance(record, dict) and "path" in record:
+                offsets[record["path"]] = offset
+            elif record is not None:
+                offsets[offset] = offset
+            offset += len(line)
+        if len(offsets) == lines:
+            return 0
+
+        directory, name = os.path.split(os.path.abspath(output_path))
+        fd, partial = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as compacted:
+                for offset in offsets.values():
+                    output.seek(offset)
+                    compacted.write(output.readline().rstrip(b"\r\n") + b"\n")
+        except BaseException:
+            os.remove(partial)
+            raise
+    os.replace(partial, output_path)
+    return lines - len(offsets)
+
+
+def _parse_transcript(response: Any) -> str:
+    """Get the transcript out of a client response, raising on API errors."""
+    if isinstance(response, dict) and 'type' in response:
+        raise RuntimeError(response.get('message', 'Unknown API error'))
+    if not hasattr(response, 'text'):
+        raise TypeError(f"Unexpected response type: {type(response)}")
+    try:
+        transcript = response.json()
+    except ValueError:
+        return response.text
+    return transcript if isinstance(transcript, str) else response.text
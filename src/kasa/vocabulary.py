@@ -0,0 +1,145 @@
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Literal, Optional
+
+import numpy as np
+
+UNK_TOKEN = "<unk>"
+
+
+class Vocabulary:
+    """Mapping between whitespace tokens and integer ids.
+
+    Id 0 is reserved for ``<unk>``, which every token missing from the
+    vocabulary encodes to.
+    """
+
+    def __init__(self, tokens: Iterable[str] = ()):
+        self._id_to_token: List[str] = [UNK_TOKEN]
+        self._token_to_id: Dict[str, int] = {UNK_TOKEN: 0}
+        for token in tokens:
+            self.add(token)
+
+    @classmethod
+    def build(
+        cls, sentences: Iterable[str], min_count: int = 1, max_size: Optional[int] = None
+    ) -> "Vocabulary":
+        """Build a vocabulary from normalized sentences, most frequent tokens first.
+
+        Args:
+            sentences: Normalized sentences, tokens separated by whitespace.
+            min_count: Drop tokens seen fewer times than this.
+            max_size: Keep at most this many tokens (not counting ``<unk>``).
+        """
+        counts: Counter = Counter()
+        for sentence in sentences:
+            counts.update(sentence.split())
+        ranked = sorted((item for item in counts.items() if item[1] >= min_count), key=lambda item: (-item[1], item[0]))
+        return cls(token for token, _ in ranked[:max_size])
+
+    def add(self, token: str) -> int:
+        """Add a token if it is new and return its id."""
+        if token not in self._token_to_id:
+            self._token_to_id[token] = len(self._id_to_token)
+            self._id_to_token.append(token)
+        return self._token_to_id[token]
+
+    def __len__(self) -> int:
+        return len(self._id_to_token)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._token_to_id
+
+    def token_to_id(self, token: str) -> int:
+        return self._token_to_id.get(token, 0)
+
+    def id_to_token(self, token_id: int) -> str:
+        return self._id_to_token[token_id]
+
+    def encode(self, sentence: str) -> List[int]:
+        """Encode a normalized sentence into token ids."""
+        lookup = self._token_to_id.get
+        return [lookup(token, 0) for token in sentence.split()]
+
+    def decode(self, token_ids: Iterable[int]) -> str:
+        """Turn token ids back into a space separated sentence."""
+        return " ".join(self._id_to_token[token_id] for token_id in token_ids)
+
+    def save(self, path: str):
+        """Write the vocabulary as one token per line, in id order."""
+        with open(path, "w", encoding="utf-8") as file:
+            file.writelines(token + "\n" for token in self._id_to_token[1:])
+
+    @classmethod
+    def load(cls, path: str) -> "Vocabulary":
+        with open(path, encoding="utf-8") as file:
+            return cls(line.rstrip("\n") for line in file)
+
+
+class EncodedCorpus:
+    """Tokenized corpus stored as one flat int32 token array plus offsets.
+
+    Sentence ``i`` is ``tokens[offsets[i]:offsets[i + 1]]``, a view into the
+    flat array rather than a copy. Both arrays are saved as ``.npy`` files and
+    can be memory-mapped on load.
+
+    Example:
+
+    ```python
+    from kasa.vocabulary import EncodedCorpus, Vocabulary
+
+    vocab = Vocabulary.build(sentences, min_count=2)
+    corpus = EncodedCorpus.encode(sentences, vocab)
+    corpus.save("jw300.tw")
+
+    corpus = EncodedCorpus.load("jw300.tw", mmap=True)
+    first_sentence = vocab.decode(corpus[0])
+    ```
+    """
+
+    TOKENS_SUFFIX = ".tokens.npy"
+    OFFSETS_SUFFIX = ".offsets.npy"
+
+    def __init__(self, tokens: np.ndarray, offsets: np.ndarray):
+        if offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(tokens):
+            raise ValueError("offsets must start at 0 and end at the number of tokens")
+        self.tokens = tokens
+        self.offsets = offsets
+
+    @classmethod
+    def encode(cls, sentences: Iterable[str], vocab: Vocabulary) -> "EncodedCorpus":
+        """Encode normalized sentences without building per-sentence lists of strings."""
+        tokens = array("i")
+        offsets = array("q", [0])
+        for sentence in sentences:
+            tokens.extend(vocab.encode(sentence))
+            offsets.append(len(tokens))
+        return cls(np.frombuffer(tokens, dtype=np.int32), np.frombuffer(offsets, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"sentence index {i} out of range for {len(self)} sentences")
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def save(self, prefix: str):
+        """Write ``<prefix>.tokens.npy`` and ``<prefix>.offsets.npy``."""
+        np.save(prefix + self.TOKENS_SUFFIX, self.tokens)
+        np.save(prefix + self.OFFSETS_SUFFIX, self.offsets)
+
+    @classmethod
+    def load(cls, prefix: str, mmap: bool = True) -> "EncodedCorpus":
+        """Load a saved corpus, memory-mapped read-only unless ``mmap`` is False."""
+        mmap_mode: Optional[Literal["r"]] = "r" if mmap else None
+        return cls(
+            np.load(prefix + cls.TOKENS_SUFFIX, mmap_mode=mmap_mode),
+            np.load(prefix + cls.OFFSETS_SUFFIX, mmap_mode=mmap_mode),
+        )
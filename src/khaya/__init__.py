@@ -1,3 +1,4 @@
-from .khaya_client import KhayaClient
+from .khaya_client import AsyncKhayaClient, KhayaClient
+from .services.base_api import ConnectionPool
 
-__all__ = ["KhayaClient"]
+__all__ = ["AsyncKhayaClient", "ConnectionPool", "KhayaClient"]
@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from src.khaya.services.translation import TranslationService
+from src.khaya.utils import check_authentication
+
+# access times of disk entries buffered before they are written in one batch
+ACCESS_FLUSH_SIZE = 1000
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters of a `TranslationCache`."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    status_code: int
+    content: bytes
+    content_type: str
+    created: float
+
+
+class TranslationCache:
+    """
+    Two-tier cache of translation responses: a bounded in-memory LRU in front
+    of an optional SQLite database that persists across processes.
+
+    Entries are keyed by the whitespace-normalized text, the language pair and
+    a model/version string, so bumping `model_version` invalidates old
+    translations. Only successful responses are stored.
+
+    Args:
+        path: SQLite database file. If None, only the in-memory tier is used.
+        max_memory_entries: Number of entries kept in the in-memory LRU.
+        max_disk_bytes: Size limit for cached response bodies on disk; the least
+            recently used entries are evicted beyond it. None means unbounded.
+        ttl: Seconds after which an entry expires. None means never.
+        model_version: Identifies the translation model; part of every key.
+
+    Example:
+
+    ```python
+    from khaya.cache import TranslationCache
+    from khaya.khaya_client import KhayaClient
+
+    cache = TranslationCache("translations.sqlite3", ttl=7 * 24 * 3600)
+    khaya = KhayaClient(api_key, cache=cache)
+
+    khaya.translate("Hello, how are you?", "en-tw")  # calls the API
+    khaya.translate("Hello,  how are you?", "en-tw")  # served from the cache
+    print(cache.stats.hit_rate)
+    ```
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_entries: int = 10000,
+        max_disk_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        model_version: str = "v1",
+    ):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.model_version = model_version
+        self.stats = CacheStats()
+
+        self._memory: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        # access times of hits not yet written to disk, by key
+        self._accessed: Dict[str, float] = {}
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, status_code INTEGER, content BLOB, content_type TEXT, "
+                "created REAL, accessed REAL, size INTEGER)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)")
+            self._db.commit()
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+
+    def key(self, text: str, language_pair: str, namespace: str = "") -> str:
+        """Cache key for a translation request."""
+        normalized = " ".join(text.split())
+        raw = json.dumps([self.model_version, namespace, language_pair, normalized], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[httpx.Response]:
+        """Return the cached response for `key`, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry, now):
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                self._touch(key, now)
+                return self._to_response(entry)
+            if entry is not None:
+                del self._memory[key]
+
+            entry = self._disk_get(key, now)
+            if entry is not None:
+                self._memory_put(key, entry)
+                self.stats.disk_hits += 1
+                self._touch(key, now)
+                return self._to_response(entry)
+
+            self.stats.misses += 1
+            return None
+
+    def set(self, key: str, response: httpx.Response):
+        """Store a successful response under `key`."""
+        entry = _Entry(
+            status_code=response.status_code,
+            content=response.content,
+            content_type=response.headers.get("content-type", "application/json"),
+            created=time.time(),
+        )
+        with self._lock:
+            self._memory_put(key, entry)
+            self._disk_put(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+                self._disk_bytes = 0
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._flush_accessed()
+                self._db.commit()
+                self._db.close()
+                self._db = None
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self.ttl is not None and now - entry.created > self.ttl
+
+    @staticmethod
+    def _to_response(entry: _Entry) -> httpx.Response:
+        return httpx.Response(
+            entry.status_code, content=entry.content, headers={"content-type": entry.content_type}
+        )
+
+    def _memory_put(self, key: str, entry: _Entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[_Entry]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT status_code, content, content_type, created, size FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = _Entry(*row[:4])
+        if self._expired(entry, now):
+            self._db.execute("DELETE FROM translations WHERE key = ?", (key,))
+            self._db.commit()
+            self._disk_bytes -= row[4]
+            return None
+        return entry
+
+    def _touch(self, key: str, now: float):
+        """Note a hit for the size eviction, writing the access times once enough have piled up."""
+        if self._db is None:
+            return
+        self._accessed[key] = now
+        if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+            self._flush_accessed()
+            self._db.commit()
+
+    def _flush_accessed(self):
+        """Write the buffered access times, leaving the commit to the caller."""
+        if self._db is None or not self._accessed:
+            return
+        self._db.executemany(
+            "UPDATE translations SET accessed = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def _disk_put(self, key: str, entry: _Entry):
+        if self._db is None:
+            return
+        previous = self._db.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+        if previous is not None:
+            self._disk_bytes -= previous[0]
+        self._db.execute(
+            "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, entry.status_code, entry.content, entry.content_type, entry.created, entry.created,
+             len(entry.content)),
+        )
+        self._disk_bytes += len(entry.content)
+
+        # evict least recently used entries until under the size limit
+        if self.max_disk_bytes is not None:
+            self._flush_accessed()
+            while self._disk_bytes > self.max_disk_bytes:
+                oldest = self._db.execute(
+                    "SELECT key, size FROM translations ORDER BY accessed LIMIT 1"
+                ).fetchone()
+                if oldest is None:
+                    break
+                self._db.execute("DELETE FROM translations WHERE key = ?", (oldest[0],))
+                self._disk_bytes -= oldest[1]
+                self.stats.evictions += 1
+        self._db.commit()
+
+
+class CachedTranslationService:
+    """
+    Wraps a `TranslationService` so that repeated translations are answered
+    from a `TranslationCache` instead of the API.
+    """
+
+    def __init__(self, service: TranslationService, cache: TranslationCache):
+        self.service = service
+        self.cache = cache
+        self.http_client = service.http_client
+        self.endpoint = service.endpoint
+
+    @check_authentication
+    def translate(self, text: str, language_pair: str = "en-tw") -> httpx.Response | dict[str, str]:
+        """Translate text, using the cache when possible. See `TranslationService.translate`."""
+        key = self.cache.key(text, language_pair, self.endpoint) if text and language_pair else None
+        if key is not None and (cached := self.cache.get(key)) is not None:
+            return cached
+
+        response = self.service.translate(text, language_pair)
+        if key is not None and isinstance(response, httpx.Response) and response.is_success:
+            self.cache.set(key, response)
+        return response
+
+    @check_authentication
+    async def atranslate(self, text: str, language_pair: str = "en-tw") -> httpx.Response | dict[str, str]:
+        """Async version of `translate`. Cache lookups run in a worker thread, off the event loop."""
+        key = self.cache.key(text, language_pair, self.endpoint) if text and language_pair else None
+        if key is not None and (cached := await asyncio.to_thread(self.cache.get, key)) is not None:
+            return cached
+
+        response = await self.service.atranslate(text, language_pair)
+        if key is not None and isinstance(response, httpx.Response) and response.is_success:
+            await asyncio.to_thread(self.cache.set, key, response)
+        return response
@@ -1,7 +1,15 @@
 from typing import Dict, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from src.khaya.constants import TIMEOUT, RETRY_ATTEMPTS
+from src.khaya.constants import (
+    TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    RETRY_MAX_BACKOFF,
+    MAX_CONNECTIONS,
+    MAX_KEEPALIVE_CONNECTIONS,
+    KEEPALIVE_EXPIRY,
+)
 
 
 class Settings(BaseSettings):
@@ -9,6 +17,18 @@ class Settings(BaseSettings):
     base_url: str = "https://translation-api.ghananlp.org"
     timeout: int = TIMEOUT
     retry_attempts: int = RETRY_ATTEMPTS
+    # seconds before the first retry, doubled for every further attempt
+    retry_backoff: float = RETRY_BACKOFF
+    retry_max_backoff: float = RETRY_MAX_BACKOFF
+    # connection pool limits; None means unlimited
+    max_connections: Optional[int] = MAX_CONNECTIONS
+    max_keepalive_connections: Optional[int] = MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry: Optional[float] = KEEPALIVE_EXPIRY
+    # per-phase timeouts in seconds; None falls back to `timeout`
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    write_timeout: Optional[float] = None
+    pool_timeout: Optional[float] = None
 
     model_config = SettingsConfigDict(
         env_file=None, extra="ignore", populate_by_name=True
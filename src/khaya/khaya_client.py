@@ -2,10 +2,11 @@ from typing import Optional
 
 from requests.models import Response
 
-from src.khaya.services.base_api import BaseApi
-from src.khaya.services.asr import AsrService
+from src.khaya.cache import CachedTranslationService, TranslationCache
+from src.khaya.services.base_api import BaseApi, ConnectionPool
+from src.khaya.services.asr import AsrService, AudioInput
 from src.khaya.services.translation import TranslationService
-from src.khaya.services.tts import TtsService
+from src.khaya.services.tts import AudioDestination, SynthesisResult, TtsService
 from src.khaya.config import Settings
 
 # custom type hint for Response or dict[str, str]
@@ -19,7 +20,11 @@ class KhayaClient:
 
     Args:
         api_key: The API key to use for authenticating requests to the Khaya API.
-        base_url: The base URL of the Khaya API. Default is "https://translation-api.ghananlp.org".
+        config: Settings to use instead of the defaults built from `api_key`.
+        cache: Optional `TranslationCache` that repeated translations are served from.
+        pool: Optional `ConnectionPool` shared with other clients. By default each client
+            has its own pool, closed by `close()` or by leaving a `with` block. Once `atranslate`
+            was used, close it with `aclose()` or by leaving an `async with` block instead.
 
     Returns:
         An instance of the KhayaInterface class.
@@ -52,6 +57,10 @@ class KhayaClient:
     # Save the synthesized speech to a file
     with open("output.mp3", "wb") as f:
         f.write(tts_response.content)
+
+    # Or stream it straight to disk without holding it in memory
+    result = khaya.synthesize_to("Hello, how are you?", "en", "output.mp3")
+    print(result.bytes_written, result.duration)
     ```
 
     """
@@ -60,13 +69,37 @@ class KhayaClient:
         self,
         api_key: str,
         config: Optional[Settings] = None,
+        cache: Optional[TranslationCache] = None,
+        pool: Optional[ConnectionPool] = None,
     ):
         self.config = config if config else Settings(api_key=api_key)
-        self.http_client = BaseApi(self.config)
-        self.translation = TranslationService(self.http_client)
+        self.http_client = BaseApi(self.config, pool)
+        self.translation: TranslationService | CachedTranslationService = TranslationService(self.http_client)
+        if cache is not None:
+            self.translation = CachedTranslationService(self.translation, cache)
         self.asr = AsrService(self.http_client)
         self.tts = TtsService(self.http_client)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def close(self):
+        """Close the sync connections, unless the pool is shared. Those of `atranslate` need `aclose`."""
+        self.http_client.close()
+
+    async def aclose(self):
+        """Close the sync and async connections, unless the pool is shared."""
+        await self.http_client.aclose()
+
     def translate(self, text: str, language_pair: str = "en-tw") -> ResponseOrDict:
         """
         Translate text from one language to another.
@@ -81,12 +114,28 @@ class KhayaClient:
 
         return self.translation.translate(text, language_pair)
 
-    def transcribe(self, audio_file_path: str, language: str = "tw") -> ResponseOrDict:
+    async def atranslate(
+        self, text: str, language_pair: str = "en-tw"
+    ) -> ResponseOrDict:
+        """
+        Translate text from one language to another without blocking the event loop.
+
+        Args:
+            text: The text to translate.
+            language_pair: The language pair to translate the text to. Default is "en-tw".
+
+        Returns:
+            A Response object containing the translated text.
+        """
+        return await self.translation.atranslate(text, language_pair)
+
+    def transcribe(self, audio_file_path: AudioInput, language: str = "tw") -> ResponseOrDict:
         """
         Get the transcription of an audio file from a given language.
 
         Args:
-            audio_file_path: The path to the audio file to transcribe.
+            audio_file_path: The path to the audio file to transcribe, or the audio as bytes, a binary
+                file object or an iterable of byte chunks. The audio is streamed, not read into memory.
             language: The language of the audio file. Default is "tw".
 
         Returns:
@@ -106,3 +155,132 @@ class KhayaClient:
             A Response object containing the synthesized speech.
         """
         return self.tts.synthesize(text, lang)
+
+    def synthesize_to(self, text: str, lang: str, destination: AudioDestination) -> SynthesisResult | dict[str, str]:
+        """
+        Synthesize speech from text, streaming the audio to a file as it arrives.
+
+        Args:
+            text: The text to synthesize.
+            lang: The language of the text.
+            destination: The path to write the audio to, or a binary file object.
+
+        Returns:
+            A SynthesisResult with the byte count, content type and duration of the audio.
+        """
+        return self.tts.synthesize_to(text, lang, destination)
+
+
+class AsyncKhayaClient:
+    """
+    Async counterpart of `KhayaClient` for use inside an event loop, e.g. in an
+    async web server. Every call goes through one shared `httpx.AsyncClient`, so a
+    single worker can keep many requests in flight without a thread per request.
+    Errors are mapped exactly like in `KhayaClient`.
+
+    Args:
+        api_key: The API key to use for authenticating requests to the Khaya API.
+        config: Settings to use instead of the defaults built from `api_key`.
+        cache: Optional `TranslationCache` that repeated translations are served from.
+        pool: Optional `ConnectionPool` shared with other clients. By default each client
+            has its own pool, closed by `aclose()` or by leaving an `async with` block.
+
+    Example:
+
+    ```python
+    import asyncio
+    import os
+
+    from khaya.khaya_client import AsyncKhayaClient
+
+    async def main():
+        async with AsyncKhayaClient(os.environ.get("KHAYA_API_KEY")) as khaya:
+            responses = await asyncio.gather(
+                *(khaya.translate(text, "en-tw") for text in ["Hello", "Good morning"])
+            )
+            print([response.json() for response in responses])
+
+    asyncio.run(main())
+    ```
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        config: Optional[Settings] = None,
+        cache: Optional[TranslationCache] = None,
+        pool: Optional[ConnectionPool] = None,
+    ):
+        self.config = config if config else Settings(api_key=api_key)
+        self.http_client = BaseApi(self.config, pool)
+        self.translation: TranslationService | CachedTranslationService = TranslationService(self.http_client)
+        if cache is not None:
+            self.translation = CachedTranslationService(self.translation, cache)
+        self.asr = AsrService(self.http_client)
+        self.tts = TtsService(self.http_client)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the connection pool, unless it is shared; the client cannot be used afterwards."""
+        await self.http_client.aclose()
+
+    async def translate(self, text: str, language_pair: str = "en-tw") -> ResponseOrDict:
+        """
+        Translate text from one language to another.
+
+        Args:
+            text: The text to translate.
+            language_pair: The language pair to translate the text to. Default is "en-tw".
+
+        Returns:
+            A Response object containing the translated text.
+        """
+        return await self.translation.atranslate(text, language_pair)
+
+    async def transcribe(self, audio_file_path: AudioInput, language: str = "tw") -> ResponseOrDict:
+        """
+        Get the transcription of an audio file from a given language.
+
+        Args:
+            audio_file_path: The path to the audio file to transcribe, or the audio as bytes, a binary
+                file object or an iterable of byte chunks. The audio is streamed, not read into memory.
+            language: The language of the audio file. Default is "tw".
+
+        Returns:
+            A Response object containing the transcription of the audio file.
+        """
+        return await self.asr.atranscribe(audio_file_path, language)
+
+    async def synthesize(self, text: str, lang: str) -> ResponseOrDict:
+        """
+        Synthesize speech from text.
+
+        Args:
+            text: The text to synthesize.
+            lang: The language of the text.
+
+        Returns:
+            A Response object containing the synthesized speech.
+        """
+        return await self.tts.asynthesize(text, lang)
+
+    async def synthesize_to(
+        self, text: str, lang: str, destination: AudioDestination
+    ) -> SynthesisResult | dict[str, str]:
+        """
+        Synthesize speech from text, streaming the audio to a file as it arrives.
+
+        Args:
+            text: The text to synthesize.
+            lang: The language of the text.
+            destination: The path to write the audio to, or a binary file object.
+
+        Returns:
+            A SynthesisResult with the byte count, content type and duration of the audio.
+        """
+        return await self.tts.asynthesize_to(text, lang, destination)
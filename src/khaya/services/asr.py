@@ -1,9 +1,20 @@
+import asyncio
+import os
+from typing import Any, AsyncIterable, AsyncIterator, BinaryIO, Iterable, Union, cast
+
+import httpx
 from requests.models import Response
 
 from src.khaya.services.base_api import BaseApi
 from src.khaya.exceptions import ASRTranscriptionError
 from src.khaya.utils import check_authentication
 
+# bytes read from an audio file per upload chunk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# a path, raw bytes, a binary file object or an iterable of byte chunks
+AudioInput = Union[str, os.PathLike, bytes, BinaryIO, Iterable[bytes], AsyncIterable[bytes]]
+
 
 class AsrService:
     def __init__(self, http_client: BaseApi):
@@ -12,13 +23,18 @@ class AsrService:
 
     @check_authentication
     def transcribe(
-        self, audio_file_path: str, language="tw"
+        self, audio_file_path: AudioInput, language="tw"
     ) -> Response | dict[str, str]:
         """
         Convert speech to text from audio binary data in an African language using the GhanaNLP STT API.
 
+        The audio is streamed to the API: files are read in chunks as they are
+        sent and byte iterators are uploaded with chunked transfer encoding,
+        so memory use does not grow with the length of the recording.
+
         Args:
-            audio_file_path (str): The path to the audio file.
+            audio_file_path: The path to the audio file, or its bytes, a binary file object or an iterable
+                of byte chunks.
             language (str): The language of the audio file.
 
         Returns:
@@ -26,12 +42,73 @@ class AsrService:
         """
         try:
             url = f"{self.endpoint}?language={language}"
-            with open(audio_file_path, "rb") as db:
-                data = db.read()
+            if isinstance(audio_file_path, (str, os.PathLike)):
+                with open(audio_file_path, "rb") as file:
+                    return self.http_client.request("POST", url, content=file)
+            return self.http_client.request("POST", url, content=audio_file_path)
+        except Exception as e:
+            raise ASRTranscriptionError(str(e), 500)
+
+    @check_authentication
+    async def atranscribe(
+        self, audio_file_path: AudioInput, language="tw"
+    ) -> httpx.Response | dict[str, Any]:
+        """
+        Transcribe audio like `transcribe`, using the shared async HTTP client.
 
-            # self.http_client.headers["Content-Type"] = "audio/wav"
+        Files are read off the event loop chunk by chunk; async iterables of
+        bytes are uploaded as they are.
 
-            response = self.http_client.request("POST", url, data=data)
-            return response
+        Args:
+            audio_file_path: The path to the audio file, or its bytes, a binary file object or an (async)
+                iterable of byte chunks.
+            language (str): The language of the audio file.
+
+        Returns:
+            dict: The transcribed text.
+        """
+        try:
+            url = f"{self.endpoint}?language={language}"
+            audio = audio_file_path
+            if isinstance(audio, (str, os.PathLike)):
+                file = await asyncio.to_thread(open, audio, "rb")
+                try:
+                    return await self.http_client.arequest("POST", url, content=_AsyncFileReader(file))
+                finally:
+                    file.close()
+            if hasattr(audio, "read"):
+                audio = _AsyncFileReader(cast(BinaryIO, audio))
+            elif not isinstance(audio, (bytes, AsyncIterable)):
+                audio = _aiterate(audio)
+            return await self.http_client.arequest("POST", url, content=audio)
         except Exception as e:
             raise ASRTranscriptionError(str(e), 500)
+
+
+class _AsyncFileReader:
+    """Async byte stream over a blocking file object, reading each chunk in a worker thread.
+
+    It is seekable when the file is, so that `BaseApi` can rewind it to retry
+    a request.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+
+    def seekable(self) -> bool:
+        return hasattr(self.file, "seekable") and self.file.seekable()
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def seek(self, position: int):
+        self.file.seek(position)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while chunk := await asyncio.to_thread(self.file.read, UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+
+async def _aiterate(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
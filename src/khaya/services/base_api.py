@@ -1,4 +1,9 @@
+import asyncio
+import random
+import time
 from abc import ABC
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, List, Optional, Protocol, runtime_checkable
 
 import httpx
 import requests
@@ -6,12 +11,112 @@ import requests
 from src.khaya.config import Settings
 from src.khaya.logger import logger
 
+# responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# bytes per read when streaming a response body
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class Sink(Protocol):
+    """What `BaseApi.download` writes to, e.g. a binary file. Only a seekable sink is rewound for a retry."""
+
+    def write(self, data: bytes, /) -> Any:
+        ...
+
+
+@runtime_checkable
+class _RewindableSink(Sink, Protocol):
+    def seekable(self) -> bool:
+        ...
+
+    def tell(self) -> int:
+        ...
+
+    def seek(self, position: int, /) -> Any:
+        ...
+
+    def truncate(self) -> Any:
+        ...
+
+
+class ConnectionPool:
+    """
+    The sync and async httpx clients behind `BaseApi`, sized and timed by the
+    pool and timeout fields of `Settings`.
+
+    A pool can be shared by many clients, including clients with different API
+    keys, since the key is sent with every request rather than stored in the
+    pool. Clients never close a pool passed to them; close it yourself when the
+    last of them is done.
+
+    Example:
+
+    ```python
+    from khaya import KhayaClient
+    from khaya.config import Settings
+    from khaya.services.base_api import ConnectionPool
+
+    with ConnectionPool(Settings(max_connections=200)) as pool:
+        clients = {tenant: KhayaClient(key, pool=pool) for tenant, key in api_keys.items()}
+        clients["acme"].translate("Hello", "en-tw")
+    ```
+    """
+
+    def __init__(self, config: Optional[Settings] = None):
+        config = config if config else Settings()
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            config.timeout,
+            connect=_or_default(config.connect_timeout, config.timeout),
+            read=_or_default(config.read_timeout, config.timeout),
+            write=_or_default(config.write_timeout, config.timeout),
+            pool=_or_default(config.pool_timeout, config.timeout),
+        )
+        self.sync_client = httpx.Client(limits=limits, timeout=timeout)
+        self.async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def close(self):
+        """Close the sync client. The async client can only be closed with `aclose`."""
+        self.sync_client.close()
+
+    async def aclose(self):
+        """Close both clients."""
+        self.sync_client.close()
+        await self.async_client.aclose()
+
 
 class BaseApi(ABC):
-    def __init__(self, config: Settings):
+    def __init__(self, config: Settings, pool: Optional[ConnectionPool] = None):
         self.config = config
-        self.sync_client = httpx.Client(timeout=self.config.timeout)
-        self.async_client = httpx.AsyncClient(timeout=self.config.timeout)
+        # a pool passed in is shared with other clients and closed by its owner
+        self._owns_pool = pool is None
+        self.pool = pool if pool else ConnectionPool(config)
+        self.sync_client = self.pool.sync_client
+        self.async_client = self.pool.async_client
+        # called with the status code (None for connection errors) of every failed attempt that is retried
+        self.retry_listeners: List[Callable[[Optional[int]], None]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _prepare_headers(self):
         return {
@@ -22,30 +127,276 @@ class BaseApi(ABC):
 
     def request(
         self, method: str, url: str, **kwargs
-    ) -> requests.Response | dict[str, str]:
+    ) -> requests.Response | dict[str, Any]:
         """
         Make an HTTP request.
 
+        Rate limited (429) and transient server errors (5xx) as well as
+        connection errors and timeouts are retried up to
+        `config.retry_attempts` times with jittered exponential backoff,
+        honouring the Retry-After header. A streamed body is only retried
+        if it can be rewound, i.e. it is a seekable file. Every retried
+        attempt is reported to the `retry_listeners`.
+
+        Args:
+            method (str): HTTP method ('GET', 'POST', etc.).
+            url (str): The URL to make the request to.
+            **kwargs: Additional arguments to pass to the request.
+
+        Returns:
+            requests.Response: The HTTP response, or a dict with "type" and
+            "message" on failure. Error responses from the API also carry
+            their "status_code".
+        """
+        kwargs.setdefault("headers", self._prepare_headers())
+        return self._send_with_retries(method, url, kwargs, lambda: self.sync_client.request(method, url, **kwargs))
+
+    async def arequest(
+        self, method: str, url: str, **kwargs
+    ) -> httpx.Response | dict[str, Any]:
+        """
+        Make an HTTP request with the shared async client, retrying like `request`.
+
         Args:
             method (str): HTTP method ('GET', 'POST', etc.).
             url (str): The URL to make the request to.
             **kwargs: Additional arguments to pass to the request.
 
         Returns:
-            requests.Response: The HTTP response.
-        """
-        headers = self._prepare_headers()
-        kwargs.setdefault("headers", headers)
-        try:
-            logger.debug(f"Sync request to {method} {url} with {kwargs}")
-            response = self.sync_client.request(method, url, **kwargs)
-            response.raise_for_status()
+            httpx.Response: The HTTP response, or an error dict like `request`.
+        """
+        kwargs.setdefault("headers", self._prepare_headers())
+        return await self._asend_with_retries(method, url, kwargs,
+                                              lambda: self.async_client.request(method, url, **kwargs))
+
+    def download(
+        self, method: str, url: str, sink: Sink, **kwargs
+    ) -> httpx.Response | dict[str, Any]:
+        """
+        Make an HTTP request and stream the response body into `sink` chunk by chunk.
+
+        Failures are retried like in `request`. A retry rewinds and truncates
+        `sink` to where the download started, so a failure once some of the
+        body was written is only retried if `sink` is seekable; one before
+        any of it was written, e.g. a 503, is always retried.
+
+        Args:
+            method (str): HTTP method ('GET', 'POST', etc.).
+            url (str): The URL to make the request to.
+            sink: Binary file object the response body is written to.
+            **kwargs: Additional arguments to pass to the request.
+
+        Returns:
+            httpx.Response: The HTTP response, its body already consumed into
+            `sink`, or an error dict like `request`.
+        """
+        kwargs.setdefault("headers", self._prepare_headers())
+        writer = _SinkWriter(sink)
+
+        def send() -> httpx.Response:
+            with self.sync_client.stream(method, url, **kwargs) as response:
+                response.raise_for_status()
+                for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    writer.write(chunk)
+            return response
+
+        return self._send_with_retries(method, url, kwargs, send, writer.rewind)
+
+    async def adownload(
+        self, method: str, url: str, sink: Sink, **kwargs
+    ) -> httpx.Response | dict[str, Any]:
+        """
+        Async version of `download`. Writes to `sink` run in a worker thread.
+
+        Args:
+            method (str): HTTP method ('GET', 'POST', etc.).
+            url (str): The URL to make the request to.
+            sink: Binary file object the response body is written to.
+            **kwargs: Additional arguments to pass to the request.
+
+        Returns:
+            httpx.Response: The HTTP response, or an error dict like `request`.
+        """
+        kwargs.setdefault("headers", self._prepare_headers())
+        writer = _SinkWriter(sink)
+
+        async def send() -> httpx.Response:
+            async with self.async_client.stream(method, url, **kwargs) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(writer.write, chunk)
             return response
-        except httpx.HTTPError as http_e:
-            logger.error(f"HTTP error occurred: {http_e}")
-            return {"type": "HTTP, request reached the API", "message": f"{http_e}"}
-        except Exception as e:
+
+        return await self._asend_with_retries(method, url, kwargs, send, writer.rewind)
+
+    def close(self):
+        """Close the sync HTTP client, unless its pool is shared."""
+        if self._owns_pool:
+            self.sync_client.close()
+
+    async def aclose(self):
+        """Close both HTTP clients, unless their pool is shared."""
+        if self._owns_pool:
+            self.sync_client.close()
+            await self.async_client.aclose()
+
+    def _send_with_retries(
+        self, method: str, url: str, kwargs: dict, send: Callable[[], httpx.Response],
+        *rewinders: Callable[[], bool],
+    ) -> httpx.Response | dict[str, Any]:
+        """Call `send` until it succeeds, rewinding the request body and `rewinders` before each retry.
+
+        A rewinder returns False when it cannot undo the failed attempt, which
+        then is not retried.
+        """
+        attempt = 0
+        rewinders = (_body_rewinder(kwargs), *rewinders)
+        while True:
+            try:
+                logger.debug(f"Sync request to {method} {url} with {_describe(kwargs)}")
+                response = send()
+                response.raise_for_status()
+                return response
+            except httpx.HTTPError as http_e:
+                delay = self._retry_delay(http_e, attempt)
+                if delay is None or not all(rewind() for rewind in rewinders):
+                    return self._error_response(http_e)
+                logger.warning(f"Retrying {method} {url} in {delay:.2f}s after: {http_e}")
+                self._notify_retry(http_e)
+                time.sleep(delay)
+                attempt += 1
+            except Exception as e:
+                return self._error_response(e)
+
+    async def _asend_with_retries(
+        self, method: str, url: str, kwargs: dict, send: Callable[[], Awaitable[httpx.Response]],
+        *rewinders: Callable[[], bool],
+    ) -> httpx.Response | dict[str, Any]:
+        """Async version of `_send_with_retries`."""
+        attempt = 0
+        rewinders = (_body_rewinder(kwargs), *rewinders)
+        while True:
+            try:
+                logger.debug(f"Async request to {method} {url} with {_describe(kwargs)}")
+                response = await send()
+                response.raise_for_status()
+                return response
+            except httpx.HTTPError as http_e:
+                delay = self._retry_delay(http_e, attempt)
+                if delay is None or not all(rewind() for rewind in rewinders):
+                    return self._error_response(http_e)
+                logger.warning(f"Retrying {method} {url} in {delay:.2f}s after: {http_e}")
+                self._notify_retry(http_e)
+                await asyncio.sleep(delay)
+                attempt += 1
+            except Exception as e:
+                return self._error_response(e)
+
+    def _retry_delay(self, error: httpx.HTTPError, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after `error`, or None if it should not be retried."""
+        if attempt >= self.config.retry_attempts:
+            return None
+        if isinstance(error, httpx.HTTPStatusError):
+            if error.response.status_code not in RETRY_STATUS_CODES:
+                return None
+            retry_after = _parse_retry_after(error.response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.config.retry_max_backoff)
+        elif not isinstance(error, httpx.TransportError):
+            return None
+        # full jitter spreads out the retries of clients that failed together
+        return random.uniform(0, min(self.config.retry_backoff * 2**attempt, self.config.retry_max_backoff))
+
+    def _notify_retry(self, error: httpx.HTTPError):
+        status_code = error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None
+        for listener in self.retry_listeners:
+            listener(status_code)
+
+    @staticmethod
+    def _error_response(error: Exception) -> dict[str, Any]:
+        if isinstance(error, httpx.HTTPStatusError):
+            logger.error(f"HTTP error occurred: {error}")
             return {
-                "type": "Failed to process, an error occurred",
-                "message": f"{e}",
+                "type": "HTTP, request reached the API",
+                "message": f"{error}",
+                "status_code": error.response.status_code,
             }
+        if isinstance(error, httpx.HTTPError):
+            logger.error(f"HTTP error occurred: {error}")
+            return {"type": "HTTP, request reached the API", "message": f"{error}"}
+        return {
+            "type": "Failed to process, an error occurred",
+            "message": f"{error}",
+        }
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _or_default(value: Optional[float], default: float) -> float:
+    return default if value is None else value
+
+
+def _body_rewinder(kwargs: dict) -> Callable[[], bool]:
+    """Function that resets the request body for a retry, returning False if the body cannot be sent again."""
+    body = kwargs.get("content", kwargs.get("data"))
+    if body is None or isinstance(body, (bytes, str, dict)):
+        return lambda: True
+    if hasattr(body, "seekable") and body.seekable():
+        position = body.tell()
+
+        def rewind() -> bool:
+            body.seek(position)
+            return True
+
+        return rewind
+    return lambda: False
+
+
+class _SinkWriter:
+    """Writes a download into a sink and undoes the writes of a failed attempt, where possible."""
+
+    def __init__(self, sink: Sink):
+        self.sink = sink
+        self.written = 0
+        self.start = sink.tell() if isinstance(sink, _RewindableSink) and sink.seekable() else None
+
+    def write(self, data: bytes):
+        self.sink.write(data)
+        self.written += len(data)
+
+    def rewind(self) -> bool:
+        """Discard what the failed attempt wrote; False if it wrote to a sink that cannot be rewound."""
+        if not self.written:
+            return True
+        if self.start is None:
+            return False
+        assert isinstance(self.sink, _RewindableSink)
+        self.sink.seek(self.start)
+        self.sink.truncate()
+        self.written = 0
+        return True
+
+
+def _describe(kwargs: dict) -> dict:
+    """Request arguments for logging, without headers (they hold the API key) or raw bodies."""
+    described = {}
+    for key, value in kwargs.items():
+        if key == "headers":
+            continue
+        if key in ("content", "data") and not isinstance(value, dict):
+            size = f", {len(value)} bytes" if isinstance(value, (bytes, str)) else ""
+            value = f"<{type(value).__name__}{size}>"
+        described[key] = value
+    return described
@@ -1,3 +1,6 @@
+from typing import Any
+
+import httpx
 from requests.models import Response
 
 from src.khaya.services.base_api import BaseApi
@@ -33,3 +36,26 @@ class TranslationService:
             return response
         except Exception as e:
             raise TranslationError(str(e), 500)
+
+    @check_authentication
+    async def atranslate(
+        self, text: str, language_pair: str = "en-tw"
+    ) -> httpx.Response | dict[str, Any]:
+        """
+        Translate text like `translate`, using the shared async HTTP client.
+
+        Args:
+            text (str): The text to translate.
+            language_pair (str): The language pair to translate the text from and to.
+
+        Returns:
+            httpx.Response: The response from the translation API.
+        """
+        if not text or not language_pair:
+            raise TranslationError("Text and language pair are required", 400)
+        try:
+            payload = {"in": text, "lang": language_pair}
+            response = await self.http_client.arequest("POST", self.endpoint, json=payload)
+            return response
+        except Exception as e:
+            raise TranslationError(str(e), 500)
@@ -1,11 +1,43 @@
+import asyncio
 import json
+import os
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Optional, Union
 
+import httpx
 from requests.models import Response
 
 from src.khaya.services.base_api import BaseApi
 from src.khaya.exceptions import TTSGenerationError
 from src.khaya.utils import check_authentication
 
+# a path to write the audio to, or a binary file object
+AudioDestination = Union[str, os.PathLike, BinaryIO]
+
+# bytes kept from the start of the audio to read its duration from
+_HEADER_SIZE = 4096
+
+# MPEG audio layer III bitrates in kbit/s by bitrate index, for MPEG-1 and MPEG-2/2.5
+_MP3_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+@dataclass
+class SynthesisResult:
+    """What `TtsService.synthesize_to` wrote."""
+
+    bytes_written: int
+    content_type: Optional[str]
+    # seconds of audio, read from the WAV header or estimated from the MP3 bitrate; None if unknown
+    duration: Optional[float]
+    # seconds from sending the request until the last byte was written
+    elapsed: float
+
 
 class TtsService:
     def __init__(self, http_client: BaseApi):
@@ -34,3 +66,219 @@ class TtsService:
             return response
         except Exception as e:
             raise TTSGenerationError(str(e), 500)
+
+    @check_authentication
+    async def asynthesize(self, text: str, lang: str) -> httpx.Response | dict[str, Any]:
+        """
+        Convert text to speech like `synthesize`, using the shared async HTTP client.
+
+        Args:
+            text (str): The text to convert to speech.
+            lang (str): The language of the text.
+
+        Returns:
+            httpx.Response: The response holding the synthesized audio.
+        """
+        if not text or not lang:
+            raise TTSGenerationError("Text and language are required", 400)
+
+        try:
+            payload = json.dumps({"text": text, "language": lang})
+
+            response = await self.http_client.arequest("POST", self.endpoint, data=payload)
+            return response
+        except Exception as e:
+            raise TTSGenerationError(str(e), 500)
+
+    @check_authentication
+    def synthesize_to(
+        self, text: str, lang: str, destination: AudioDestination
+    ) -> SynthesisResult | dict[str, str]:
+        """
+        Synthesize speech like `synthesize`, streaming the audio into `destination` as it arrives.
+
+        The audio is never held in memory as a whole. Audio for a path goes
+        to a temporary file next to it, which replaces the file at that path
+        only once the download succeeded; a failed download leaves it as is.
+
+        Args:
+            text (str): The text to convert to speech.
+            lang (str): The language of the text.
+            destination: The path to write the audio to, or a binary file object.
+
+        Returns:
+            SynthesisResult: The size, content type and duration of the audio,
+            or an error dict like `synthesize`.
+        """
+        if not text or not lang:
+            raise TTSGenerationError("Text and language are required", 400)
+
+        try:
+            payload = json.dumps({"text": text, "language": lang})
+            start = time.monotonic()
+            if not isinstance(destination, (str, os.PathLike)):
+                sink = _RecordingSink(destination)
+                response = self.http_client.download("POST", self.endpoint, sink, data=payload)
+                return _synthesis_result(response, sink, start)
+
+            file, partial = _partial_file(destination)
+            try:
+                with file:
+                    sink = _RecordingSink(file)
+                    response = self.http_client.download("POST", self.endpoint, sink, data=payload)
+                if not isinstance(response, dict):
+                    os.replace(partial, destination)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+            return _synthesis_result(response, sink, start)
+        except Exception as e:
+            raise TTSGenerationError(str(e), 500)
+
+    @check_authentication
+    async def asynthesize_to(
+        self, text: str, lang: str, destination: AudioDestination
+    ) -> SynthesisResult | dict[str, str]:
+        """
+        Stream synthesized speech into `destination` like `synthesize_to`, using the shared async HTTP client.
+
+        Args:
+            text (str): The text to convert to speech.
+            lang (str): The language of the text.
+            destination: The path to write the audio to, or a binary file object.
+
+        Returns:
+            SynthesisResult: The size, content type and duration of the audio,
+            or an error dict like `synthesize`.
+        """
+        if not text or not lang:
+            raise TTSGenerationError("Text and language are required", 400)
+
+        try:
+            payload = json.dumps({"text": text, "language": lang})
+            start = time.monotonic()
+            if not isinstance(destination, (str, os.PathLike)):
+                sink = _RecordingSink(destination)
+                response = await self.http_client.adownload("POST", self.endpoint, sink, data=payload)
+                return _synthesis_result(response, sink, start)
+
+            file, partial = await asyncio.to_thread(_partial_file, destination)
+            try:
+                with file:
+                    sink = _RecordingSink(file)
+                    response = await self.http_client.adownload("POST", self.endpoint, sink, data=payload)
+                if not isinstance(response, dict):
+                    os.replace(partial, destination)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+            return _synthesis_result(response, sink, start)
+        except Exception as e:
+            raise TTSGenerationError(str(e), 500)
+
+
+class _RecordingSink:
+    """Binary sink wrapper counting the bytes written and keeping the first ones to read the audio header from.
+
+    Rewinding it to retry a download (seek, then truncate) starts the count over.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.size = 0
+        self.header = b""
+
+    def write(self, data: bytes) -> int:
+        self.file.write(data)
+        if len(self.header) < _HEADER_SIZE:
+            self.header += data[:_HEADER_SIZE - len(self.header)]
+        self.size += len(data)
+        return len(data)
+
+    def seekable(self) -> bool:
+        return hasattr(self.file, "seekable") and self.file.seekable()
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def seek(self, position: int):
+        self.file.seek(position)
+
+    def truncate(self):
+        self.file.truncate()
+        self.size = 0
+        self.header = b""
+
+
+def _partial_file(destination: Union[str, os.PathLike]) -> tuple[BinaryIO, str]:
+    """Open a temporary file in the directory of `destination` to download into, and return it with its path."""
+    directory, name = os.path.split(os.path.abspath(destination))
+    fd, path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".part")
+    return os.fdopen(fd, "wb"), path
+
+
+def _synthesis_result(response, sink: _RecordingSink, start: float) -> SynthesisResult | dict[str, str]:
+    if isinstance(response, dict):
+        return response
+    return SynthesisResult(
+        bytes_written=sink.size,
+        content_type=response.headers.get("Content-Type"),
+        duration=audio_duration(sink.header, sink.size),
+        elapsed=time.monotonic() - start,
+    )
+
+
+def audio_duration(header: bytes, size: int) -> Optional[float]:
+    """
+    Duration in seconds of a WAV or MP3 file, from its first bytes and its total size.
+
+    WAV durations are exact. MP3 durations assume a constant bitrate, the one
+    of the first frame. Other formats give None.
+
+    Args:
+        header (bytes): The first bytes of the file, a few KB are enough.
+        size (int): The size of the whole file in bytes.
+
+    Returns:
+        float: The duration in seconds, or None if it cannot be told.
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return _wav_duration(header, size)
+    return _mp3_duration(header, size)
+
+
+def _wav_duration(header: bytes, size: int) -> Optional[float]:
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(header):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", header, offset)
+        offset += 8
+        if chunk_id == b"fmt " and offset + 12 <= len(header):
+            byte_rate = struct.unpack_from("<I", header, offset + 8)[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # streamed WAVs often leave the data size at 0 or 0xFFFFFFFF
+            available = size - offset
+            data_size = min(chunk_size, available) if chunk_size else available
+            return data_size / byte_rate
+        offset += chunk_size + chunk_size % 2
+    return None
+
+
+def _mp3_duration(header: bytes, size: int) -> Optional[float]:
+    offset = 0
+    if header[:3] == b"ID3" and len(header) >= 10:
+        tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        offset = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+    while offset + 4 <= len(header):
+        if header[offset] == 0xFF and header[offset + 1] & 0xE0 == 0xE0:
+            version = (header[offset + 1] >> 3) & 0x03
+            layer = (header[offset + 1] >> 1) & 0x03
+            bitrate_index = header[offset + 2] >> 4
+            # layer III only, and not the reserved version or free/bad bitrates
+            if layer == 1 and version != 1 and 0 < bitrate_index < 15:
+                bitrate = _MP3_BITRATES[3 if version == 3 else 2][bitrate_index] * 1000
+                return (size - offset) * 8 / bitrate
+        offset += 1
+    return None
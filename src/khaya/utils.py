@@ -1,8 +1,19 @@
+import inspect
 from functools import wraps
 from src.khaya.exceptions import AuthenticationError
 
 
 def check_authentication(func):
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            if not self.http_client.config.api_key:
+                raise AuthenticationError("API key is required", 401)
+            return await func(self, *args, **kwargs)
+
+        return async_wrapper
+
     @wraps(func)
     def wrapper(self, *args, **kwargs):
         if not self.http_client.config.api_key:
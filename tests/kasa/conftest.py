@@ -0,0 +1,58 @@
+import json
+import os
+import random
+import threading
+import time
+
+import pytest
+
+
+class Response:
+    def __init__(self, transcript):
+        self.text = json.dumps(transcript)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeTranscriber:
+    """Transcribes a file to its name, finishing in random order and tracking concurrency."""
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_file_path, language):
+        with self._lock:
+            self.calls.append(audio_file_path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(random.random() / 200)
+        with self._lock:
+            self.in_flight -= 1
+        name = os.path.basename(audio_file_path)
+        if name.startswith("broken"):
+            return {"type": "HTTP", "message": "unsupported audio", "status_code": 400}
+        return Response(f"{language}:{name}")
+
+
+@pytest.fixture
+def fake_transcriber():
+    return FakeTranscriber()
+
+
+@pytest.fixture
+def write_audio():
+    """Function writing small fake audio files, ``write_audio(directory, *names)``, returning their paths."""
+
+    def write(directory, *names):
+        paths = []
+        for name in names:
+            path = directory / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"RIFF" + bytes(100))
+            paths.append(str(path))
+        return paths
+
+    return write
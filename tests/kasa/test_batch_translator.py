@@ -1,9 +1,16 @@
+import asyncio
+import json
 import pytest
 import os
+import threading
 from unittest.mock import Mock, MagicMock
 import re
 
+import httpx
+
+from kasa.concurrency import AdaptiveConcurrencyLimiter
 from kasa.text_chunker import BatchTranslator, TextChunk
+from src.khaya import KhayaClient
 
 
 class SimpleTranslator:
@@ -26,6 +33,27 @@ class ErrorTranslator:
         raise Exception("Test translation error")
 
 
+class AsyncSimpleTranslator:
+    """Async translator that records how many requests are in flight."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def atranslate(self, text, target_language=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # finish later chunks first to check that results are reordered
+        await asyncio.sleep(0.01 if "First" in text else 0)
+        self.in_flight -= 1
+
+        class Response:
+            def __init__(self, text):
+                self.text = f"Translated: {text}"
+
+        return Response(text)
+
+
 @pytest.fixture
 def batch_translator():
     """Create a BatchTranslator with a simple translator."""
@@ -57,6 +85,37 @@ class TestBatchTranslator:
         empty_chunks = batch_translator._create_chunks("")
         assert len(empty_chunks) == 0
 
+    def test_chunks_keep_sentences_whole(self):
+        batch_translator = BatchTranslator(SimpleTranslator(), max_chunk_size=40)
+        text = "Dr. Smith met Mr. J. Doe at St. Mary's. They talked! Did they agree? \"Yes.\" She left."
+
+        chunks = [chunk.content for chunk in batch_translator._create_chunks(text)]
+
+        assert chunks == ["Dr. Smith met Mr. J. Doe at St. Mary's.", 'They talked! Did they agree? "Yes."', "She left."]
+        assert [chunk.index for chunk in batch_translator._create_chunks(text)] == [0, 1, 2]
+
+    def test_acronym_can_end_a_sentence(self):
+        batch_translator = BatchTranslator(SimpleTranslator(), max_chunk_size=30)
+
+        chunks = [chunk.content for chunk in batch_translator._create_chunks("He lives in the U.S. He likes it here.")]
+
+        assert chunks == ["He lives in the U.S.", "He likes it here."]
+
+    def test_long_sentences_and_words_are_split(self):
+        batch_translator = BatchTranslator(SimpleTranslator(), max_chunk_size=10)
+
+        chunks = [chunk.content for chunk in batch_translator._create_chunks("one two three " + "x" * 25)]
+
+        assert chunks == ["one two", "three", "xxxxxxxxxx", "xxxxxxxxxx", "xxxxx"]
+
+    def test_token_budget(self):
+        batch_translator = BatchTranslator(SimpleTranslator(), max_chunk_tokens=4)
+
+        chunks = [chunk.content for chunk in batch_translator._create_chunks("A b. C d e. F g h i j k.\nL.")]
+
+        # chunks end at sentence ends, a sentence over the budget is split between words
+        assert chunks == ["A b.", "C d e.", "F g h i", "j k.\nL."]
+
     def test_translate_chunk(self, batch_translator):
         """Test translation of a single chunk."""
         chunk = TextChunk(content="Test content", index=0)
@@ -154,6 +213,318 @@ class TestBatchTranslator:
         assert re.search(r"failed for \d+ of \d+ chunks", str(excinfo.value))
 
 
+class TestIterChunkTranslate:
+    """Tests for streaming chunk translation in document order."""
+
+    def test_matches_chunk_translate(self, batch_translator):
+        text = "First sentence. Second sentence. Third sentence. Fourth sentence. Fifth sentence. Sixth one."
+
+        streamed = list(batch_translator.iter_chunk_translate(text))
+
+        assert len(streamed) > 1
+        assert " ".join(streamed) == batch_translator.chunk_translate(text)
+
+    def test_yields_before_later_chunks_finish(self):
+        release = threading.Event()
+
+        class BlockingTranslator:
+            def translate(self, text, target_language=None):
+                # every chunk but the first waits until the first has been yielded
+                if not text.startswith("First"):
+                    assert release.wait(timeout=5)
+                return SimpleTranslator().translate(text)
+
+        batch_translator = BatchTranslator(BlockingTranslator(), max_chunk_size=20, max_workers=2)
+        stream = batch_translator.iter_chunk_translate("First sentence. Second sentence. Third sentence.")
+
+        assert next(stream) == "Translated: First sentence."
+        release.set()
+        assert list(stream) == ["Translated: Second sentence.", "Translated: Third sentence."]
+
+    def test_error_stops_the_stream(self):
+        mock_translator = Mock()
+
+        def translate_side_effect(text, *args, **kwargs):
+            if "fail" in text.lower():
+                raise Exception("Test translation error")
+            response = MagicMock()
+            response.text = f"Translated: {text}"
+            return response
+
+        mock_translator.translate = Mock(side_effect=translate_side_effect)
+        batch_translator = BatchTranslator(mock_translator, max_chunk_size=25)
+        stream = batch_translator.iter_chunk_translate("This should succeed. This should fail. Never reached.")
+
+        assert next(stream) == "Translated: This should succeed."
+        with pytest.raises(ValueError, match="Translation failed for chunk 1"):
+            next(stream)
+
+    def test_empty_text(self, batch_translator):
+        assert list(batch_translator.iter_chunk_translate("")) == []
+
+
+class TestTranslateMany:
+    """Tests for multi-document translation with chunk dedup."""
+
+    def test_translate_many(self):
+        translator = Mock(wraps=SimpleTranslator())
+        documents = [
+            "Welcome to our shop. Red cotton shirt.",
+            "Welcome to our shop. Blue cotton shirt.",
+            "",
+            "Welcome to our shop. Red cotton shirt.",
+        ]
+
+        with BatchTranslator(translator, max_chunk_size=25) as batch_translator:
+            result = batch_translator.translate_many(documents)
+            expected = [batch_translator.chunk_translate(document) for document in documents]
+
+        assert result.translations == expected
+        assert result.total_chunks == 6
+        assert result.unique_chunks == 3
+        assert result.api_calls_saved == 3
+
+    def test_translate_many_error(self):
+        with BatchTranslator(ErrorTranslator()) as batch_translator:
+            with pytest.raises(ValueError, match="Translation failed"):
+                batch_translator.translate_many(["This will fail."])
+
+    def test_pool_is_reused_until_closed(self, batch_translator):
+        batch_translator.chunk_translate("Hello world")
+        executor = batch_translator._executor
+        batch_translator.translate_many(["Hello again"])
+
+        assert batch_translator._executor is executor
+
+        batch_translator.close()
+        assert batch_translator._executor is None
+        assert batch_translator.chunk_translate("Hello world") == "Translated: Hello world"
+
+
+class FlakyTranslator:
+    """Translator that fails the first request for every text containing "flaky"."""
+
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, text, target_language=None):
+        self.calls.append(text)
+        if "flaky" in text and self.calls.count(text) == 1:
+            return {"type": "HTTP, request reached the API", "message": "503 Service Unavailable"}
+        return SimpleTranslator().translate(text, target_language)
+
+
+class TestPartialTranslation:
+    """Tests for partial results and re-translating failed chunks."""
+
+    def test_partial_result_keeps_successful_chunks(self):
+        batch_translator = BatchTranslator(FlakyTranslator(), max_chunk_size=12)
+
+        result = batch_translator.chunk_translate_partial("One fine. Two flaky. Three fine.")
+
+        assert not result.complete
+        assert result.failed_indices == [1]
+        assert result.chunks[1].error == "503 Service Unavailable"
+        assert result.chunks[1].source == "Two flaky."
+        assert result.text == "Translated: One fine. Translated: Three fine."
+
+    def test_retry_failed_sends_only_failed_chunks(self):
+        translator = FlakyTranslator()
+        batch_translator = BatchTranslator(translator, max_chunk_size=12)
+        text = "One fine. Two flaky. Three fine."
+        result = batch_translator.chunk_translate_partial(text)
+
+        retried = batch_translator.retry_failed(result)
+
+        assert retried.complete
+        assert retried.text == BatchTranslator(SimpleTranslator(), max_chunk_size=12).chunk_translate(text)
+        assert translator.calls.count("One fine.") == 1
+        assert translator.calls.count("Two flaky.") == 2
+        assert not result.complete
+
+    def test_empty_text(self, batch_translator):
+        result = batch_translator.chunk_translate_partial("")
+
+        assert result.complete
+        assert result.text == ""
+
+
+class RateLimitedTranslator:
+    """Translator that answers every other request with a 429 error dict."""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def translate(self, text, target_language=None):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        if calls % 2 == 0:
+            return {"type": "HTTP, request reached the API", "message": "429 Too Many Requests", "status_code": 429}
+        return SimpleTranslator().translate(text, target_language)
+
+
+class ServerErrorTranslator:
+    """Translator that answers every request with a 500 error dict."""
+
+    def translate(self, text, target_language=None):
+        return {"type": "HTTP, request reached the API", "message": "500 server error", "status_code": 500}
+
+
+class TestAdaptiveConcurrency:
+    """Tests for BatchTranslator with an AdaptiveConcurrencyLimiter."""
+
+    def test_limit_grows_on_success(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=8)
+        text = " ".join(f"Sentence {i}." for i in range(100))
+
+        with BatchTranslator(SimpleTranslator(), max_chunk_size=15, concurrency_limiter=limiter) as batch_translator:
+            result = batch_translator.chunk_translate(text)
+            assert batch_translator._executor._max_workers == 8
+
+        assert result.startswith("Translated: Sentence 0.")
+        assert limiter.limit > 2
+        assert limiter.in_flight == 0
+
+    def test_rate_limiting_backs_off(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8)
+        batch_translator = BatchTranslator(RateLimitedTranslator(), max_chunk_size=15, concurrency_limiter=limiter)
+
+        with pytest.raises(ValueError, match="429"):
+            batch_translator.chunk_translate("First part. Second part.")
+
+        assert limiter.limit < 8
+        assert limiter.metrics()["rate_limited"] == 1
+
+    def test_failures_do_not_grow_the_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=16)
+        text = " ".join(f"Sentence {i}." for i in range(100))
+
+        with BatchTranslator(ServerErrorTranslator(), max_chunk_size=15, concurrency_limiter=limiter) as translator:
+            with pytest.raises(ValueError, match="server error"):
+                translator.chunk_translate(text)
+
+        assert limiter.limit == 2
+        assert limiter.metrics()["successes"] == 0
+        assert limiter.p95_latency() is None
+
+    def test_rate_limited_retries_of_the_client_back_off(self):
+        seen = set()
+        lock = threading.Lock()
+
+        def handler(request):
+            text = json.loads(request.content)["in"]
+            with lock:
+                first_attempt = text not in seen
+                seen.add(text)
+            if first_attempt:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, text=f"Translated: {text}")
+
+        client = KhayaClient("test_api_key")
+        client.http_client.sync_client = httpx.Client(transport=httpx.MockTransport(handler))
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8)
+        text = " ".join(f"Sentence {i}." for i in range(40))
+
+        with BatchTranslator(client, max_chunk_size=15, concurrency_limiter=limiter) as translator:
+            result = translator.chunk_translate(text)
+            assert client.http_client.retry_listeners == [limiter.record_retry]
+
+        assert result.startswith("Translated: Sentence 0.")
+        assert limiter.metrics()["rate_limited"] == len(seen)
+        assert limiter.limit < 8
+        # a closed translator stops reporting the client's retries to its limiter
+        assert client.http_client.retry_listeners == []
+
+
+class StragglerTranslator:
+    """Translator whose first request for "Slow" text hangs until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def translate(self, text, target_language=None):
+        self.calls.append(text)
+        if text == "Slow." and self.calls.count(text) == 1:
+            self.release.wait(5)
+        return SimpleTranslator().translate(text, target_language)
+
+
+class TestHedgedRequests:
+    """Tests for hedging slow chunk requests."""
+
+    def test_slow_chunk_is_hedged(self):
+        translator = StragglerTranslator()
+        with BatchTranslator(translator, max_chunk_size=5, hedge_requests=True) as batch_translator:
+            batch_translator.chunk_translate(" ".join(["Fast."] * 20))
+            result = batch_translator.chunk_translate("Slow.")
+            translator.release.set()
+
+        assert result == "Translated: Slow."
+        assert translator.calls.count("Slow.") == 2
+
+    def test_no_hedging_by_default(self):
+        translator = StragglerTranslator()
+        translator.release.set()
+        with BatchTranslator(translator, max_chunk_size=5) as batch_translator:
+            batch_translator.chunk_translate(" ".join(["Fast."] * 20) + " Slow.")
+
+        assert translator.calls.count("Slow.") == 1
+
+
+class TestAsyncBatchTranslator:
+    """Tests for the asyncio chunk translation path."""
+
+    def test_achunk_translate_matches_chunk_translate(self):
+        text = "First sentence. Second sentence. Third sentence. Fourth sentence. Fifth sentence."
+        async_translator = BatchTranslator(AsyncSimpleTranslator(), max_chunk_size=20)
+        sync_translator = BatchTranslator(SimpleTranslator(), max_chunk_size=20)
+
+        result = asyncio.run(async_translator.achunk_translate(text))
+
+        assert result == sync_translator.chunk_translate(text)
+
+    def test_concurrency_is_bounded(self):
+        translator = AsyncSimpleTranslator()
+        batch_translator = BatchTranslator(translator, max_chunk_size=10, max_concurrency=3)
+
+        asyncio.run(batch_translator.achunk_translate("First one. " * 20))
+
+        assert translator.max_in_flight == 3
+
+    def test_async_translate_method_fallback(self):
+        class CoroutineTranslator:
+            async def translate(self, text, target_language=None):
+                return SimpleTranslator().translate(text, target_language)
+
+        batch_translator = BatchTranslator(CoroutineTranslator())
+
+        assert asyncio.run(batch_translator.achunk_translate("Hello world")) == "Translated: Hello world"
+
+    def test_sync_only_translator(self):
+        batch_translator = BatchTranslator(SimpleTranslator())
+
+        with pytest.raises(TypeError):
+            asyncio.run(batch_translator.achunk_translate("Hello world"))
+
+    def test_empty_text(self):
+        assert asyncio.run(BatchTranslator(AsyncSimpleTranslator()).achunk_translate("")) == ""
+
+    def test_translation_error(self):
+        class AsyncErrorTranslator:
+            async def atranslate(self, text, target_language=None):
+                if "fail" in text:
+                    raise Exception("Test translation error")
+                return {"type": "HTTP", "message": "should not be reached"}
+
+        batch_translator = BatchTranslator(AsyncErrorTranslator(), max_chunk_size=10)
+
+        with pytest.raises(ValueError, match=r"failed for \d+ of \d+ chunks"):
+            asyncio.run(batch_translator.achunk_translate("This will fail. Also fails."))
+
+
 def test_batch_translator_with_real_api(khaya_interface):
     """Test BatchTranslator with a real API call."""
     # Create a batch translator with the API
@@ -0,0 +1,193 @@
+import gzip
+import io
+import json
+import os
+import random
+import time
+
+import pytest
+
+from kasa import cli
+from kasa.cli import Progress, translate_stream
+
+
+def slow_upper(text):
+    """Translate by upper-casing, finishing in random order."""
+    time.sleep(random.random() / 500)
+    if "fail" in text:
+        raise ValueError("Translation failed for chunk 0: boom")
+    return text.upper()
+
+
+def test_text_output_keeps_input_order():
+    lines = [f"line {i}\n" for i in range(200)]
+    output = io.StringIO()
+
+    progress = translate_stream(lines, output, slow_upper, max_in_flight=8)
+
+    assert output.getvalue().splitlines() == [f"LINE {i}" for i in range(200)]
+    assert (progress.records, progress.failures) == (200, 0)
+
+
+def test_reads_at_most_max_in_flight_ahead():
+    consumed = []
+
+    def lines():
+        for i in range(50):
+            consumed.append(i)
+            yield f"line {i}\n"
+
+    class Output(io.StringIO):
+        def write(self, text):
+            # records are written before the input is read much further
+            assert len(consumed) <= self.getvalue().count("\n") + 5
+            return super().write(text)
+
+    translate_stream(lines(), Output(), slow_upper, max_in_flight=4)
+
+
+def test_text_failures_leave_an_empty_line(capsys):
+    output = io.StringIO()
+
+    progress = translate_stream(["one\n", "fail\n", "\n", "three\n"], output, slow_upper)
+
+    assert output.getvalue() == "ONE\n\n\nTHREE\n"
+    assert progress.failures == 1
+    assert "record 2: Translation failed" in capsys.readouterr().err
+
+
+def test_jsonl_records():
+    lines = [
+        json.dumps({"id": 1, "text": "hello"}) + "\n",
+        json.dumps({"id": 2, "body": "no text field"}) + "\n",
+        "not json\n",
+        json.dumps({"id": 4, "text": "ɛte sɛn"}) + "\n",
+    ]
+    output = io.StringIO()
+
+    progress = translate_stream(lines, output, slow_upper, jsonl=True, output_field="tw")
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert records[0] == {"id": 1, "text": "hello", "tw": "HELLO"}
+    assert "no 'text'" in records[1]["error"]
+    assert records[2]["line"] == 3 and "error" in records[2]
+    assert records[3]["tw"] == "ƐTE SƐN"
+    assert progress.failures == 2
+
+
+def test_jsonl_lines_that_are_not_objects_fail():
+    lines = ["[1, 2]\n", '"text"\n', json.dumps({"text": "hello"}) + "\n"]
+    output = io.StringIO()
+
+    progress = translate_stream(lines, output, slow_upper, jsonl=True)
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert records[0] == {"line": 1, "error": "record is not a JSON object"}
+    assert records[1]["line"] == 2 and "error" in records[1]
+    assert records[2]["translation"] == "HELLO"
+    assert progress.failures == 2
+
+
+def test_text_translations_stay_on_one_line():
+    output = io.StringIO()
+
+    translate_stream(["one\n", "two\n"], output, lambda text: f"{text}\nsecond line")
+
+    assert output.getvalue() == "one second line\ntwo second line\n"
+
+
+def test_progress_report():
+    stream = io.StringIO()
+    progress = Progress(stream=stream, interval=0)
+    progress.update(10)
+    progress.update(5, failed=True)
+
+    progress.report(final=True)
+
+    assert stream.getvalue().startswith("done: 2 records, 1 failed")
+
+
+class UpperTranslator:
+    def translate(self, text, target_language=None):
+        class Response:
+            def __init__(self, text):
+                self.text = text.upper()
+
+        return Response(text)
+
+
+def test_translate_command(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "_make_client", lambda api_key: UpperTranslator())
+    source = tmp_path / "input.txt.gz"
+    with gzip.open(source, "wt", encoding="utf-8") as file:
+        file.write("Hello there. How are you?\nGood morning\n")
+    target = tmp_path / "output.txt"
+
+    code = cli.main(["translate", str(source), "-o", str(target), "--api-key", "key", "--max-chunk-size", "15"])
+
+    assert code == 0
+    assert target.read_text(encoding="utf-8") == "HELLO THERE. HOW ARE YOU?\nGOOD MORNING\n"
+
+
+def test_translate_command_requires_an_api_key(tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv("KHAYA_API_KEY", raising=False)
+
+    assert cli.main(["translate", str(tmp_path / "input.txt")]) == 2
+    assert "API key" in capsys.readouterr().err
+
+
+def test_unknown_command():
+    with pytest.raises(SystemExit):
+        cli.main(["summarize"])
+
+
+def test_transcribe_command_resumes(tmp_path, monkeypatch, fake_transcriber, write_audio):
+    monkeypatch.setattr(cli, "_make_client", lambda api_key: fake_transcriber)
+    paths = write_audio(tmp_path / "audio", "a.wav", "b.wav", "broken.wav", "c.wav")
+    target = tmp_path / "transcripts.jsonl"
+    # an interrupted run transcribed a.wav and was cut off while writing b.wav
+    target.write_text(json.dumps({"path": paths[0], "error": None}) + '\n{"path": "', encoding="utf-8")
+
+    code = cli.main(["transcribe", str(tmp_path / "audio"), "-o", str(target), "--api-key", "key"])
+
+    assert code == 1
+    # the workers pick files up in any order, the output keeps the input order
+    assert sorted(fake_transcriber.calls) == paths[1:]
+    # the torn line is dropped once the run is done
+    records = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    assert [record["path"] for record in records] == paths
+    assert records[1]["transcript"] == "tw:b.wav"
+    assert records[2]["error"] == "unsupported audio"
+
+
+def test_transcribe_command_resume_replaces_failed_records(tmp_path, monkeypatch, fake_transcriber, write_audio):
+    monkeypatch.setattr(cli, "_make_client", lambda api_key: fake_transcriber)
+    paths = write_audio(tmp_path / "audio", "a.wav", "b.wav", "c.wav")
+    target = tmp_path / "transcripts.jsonl"
+    target.write_text("".join(json.dumps(record) + "\n" for record in [
+        {"path": paths[0], "error": None}, {"path": paths[1], "error": "timed out"}, {"path": paths[2], "error": None},
+    ]), encoding="utf-8")
+
+    code = cli.main(["transcribe", str(tmp_path / "audio"), "-o", str(target), "--api-key", "key"])
+
+    assert code == 0
+    assert fake_transcriber.calls == [paths[1]]
+    records = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    assert [record["path"] for record in records] == paths
+    assert records[1]["transcript"] == "tw:b.wav"
+    assert records[1]["error"] is None
+    assert sorted(os.listdir(tmp_path)) == ["audio", "transcripts.jsonl"]
+
+
+def test_transcribe_command_restart(tmp_path, monkeypatch, fake_transcriber, write_audio):
+    monkeypatch.setattr(cli, "_make_client", lambda api_key: fake_transcriber)
+    paths = write_audio(tmp_path, "a.wav")
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("a.wav\n", encoding="utf-8")
+    target = tmp_path / "transcripts.jsonl"
+    target.write_text(json.dumps({"path": paths[0], "error": None}) + "\n", encoding="utf-8")
+
+    code = cli.main(["transcribe", str(manifest), "-o", str(target), "--api-key", "key", "--restart"])
+
+    assert code == 0
+    assert [json.loads(line)["transcript"] for line in target.read_text(encoding="utf-8").splitlines()] == ["tw:a.wav"]
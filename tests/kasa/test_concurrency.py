@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from kasa.concurrency import AdaptiveConcurrencyLimiter
+
+
+def complete(limiter, count, latency=0.1, rate_limited=False):
+    for _ in range(count):
+        limiter.acquire()
+        limiter.release(latency, rate_limited)
+
+
+def test_limit_grows_while_latency_is_flat():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=8)
+
+    complete(limiter, 100)
+
+    assert limiter.limit == 8
+    assert limiter.metrics()["backoffs"] == 0
+
+
+def test_rate_limiting_halves_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8)
+
+    complete(limiter, 1, rate_limited=True)
+
+    assert limiter.limit == 4
+    assert limiter.metrics()["rate_limited"] == 1
+
+
+def test_one_burst_of_429s_backs_off_once():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8)
+    for _ in range(4):
+        limiter.acquire()
+
+    for _ in range(4):
+        limiter.release(0.1, rate_limited=True)
+
+    assert limiter.limit == 4
+    assert limiter.metrics()["backoffs"] == 1
+
+
+def test_retried_429_backs_off_while_in_flight():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8)
+    limiter.acquire()
+
+    limiter.record_retry(503)
+    limiter.record_retry(429)
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 1
+    assert limiter.metrics()["rate_limited"] == 1
+
+
+def test_rising_p95_backs_off():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=4, window=20)
+    complete(limiter, 20, latency=0.1)
+
+    complete(limiter, 20, latency=1.0)
+
+    assert limiter.limit < 4
+    assert limiter.metrics()["best_p95_latency"] == pytest.approx(0.1)
+
+
+def test_limit_stays_within_bounds():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2, max_limit=4)
+
+    for _ in range(10):
+        complete(limiter, 1, rate_limited=True)
+
+    assert limiter.limit == 2
+
+
+def test_acquire_blocks_at_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.05)
+
+    limiter.release(0.1)
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(initial_limit=10, max_limit=5)
@@ -0,0 +1,102 @@
+import gzip
+import os
+
+import pytest
+
+from kasa.corpus_store import LineIndex, ParallelCorpus
+from kasa.Preprocessing import Preprocessing
+
+
+@pytest.fixture
+def parallel_files(tmp_path):
+    """Write a small aligned Twi/English corpus and return the two paths."""
+    twi_path = tmp_path / "corpus.tw"
+    english_path = tmp_path / "corpus.en"
+    twi_path.write_text("Ɛte sɛn?\nMe ho yɛ.\n\nMeda wo ase!", encoding="utf-8")
+    english_path.write_text("How are you?\nI am fine.\n\nThank you!\n", encoding="utf-8")
+    return str(twi_path), str(english_path)
+
+
+class TestParallelCorpus:
+    """Tests for the memory-mapped parallel corpus store."""
+
+    def test_pairs_match_reader(self, parallel_files):
+        twi_data, english_data = Preprocessing().read_parallel_dataset(*parallel_files)
+
+        with ParallelCorpus(*parallel_files) as corpus:
+            assert len(corpus) == 4
+            assert [corpus.pair(i) for i in range(len(corpus))] == list(zip(twi_data, english_data))
+
+    def test_indexing_and_slicing(self, parallel_files):
+        with ParallelCorpus(*parallel_files) as corpus:
+            assert corpus[-1] == ("Meda wo ase!", "Thank you!")
+            assert corpus[1:3] == [("Me ho yɛ.", "I am fine."), ("", "")]
+            assert corpus[::2] == [corpus.pair(0), corpus.pair(2)]
+            with pytest.raises(IndexError):
+                corpus.pair(4)
+
+    def test_sample_is_reproducible(self, parallel_files):
+        with ParallelCorpus(*parallel_files) as corpus:
+            sample = corpus.sample(3, seed=7)
+            assert sample == corpus.sample(3, seed=7)
+            assert len(set(sample)) == 3
+
+    def test_index_is_persisted_and_reused(self, parallel_files):
+        twi_path, _ = parallel_files
+        ParallelCorpus(*parallel_files).close()
+        index_mtime = os.stat(twi_path + ".idx").st_mtime_ns
+
+        ParallelCorpus(*parallel_files).close()
+
+        assert os.stat(twi_path + ".idx").st_mtime_ns == index_mtime
+
+    def test_index_is_rebuilt_when_file_changes(self, parallel_files):
+        twi_path, _ = parallel_files
+        LineIndex(twi_path).close()
+        with open(twi_path, "a", encoding="utf-8") as file:
+            file.write("\nAkwaaba")
+
+        index = LineIndex(twi_path)
+        assert len(index) == 5
+        assert index.line(4) == "Akwaaba"
+        index.close()
+
+    def test_index_dir(self, parallel_files, tmp_path):
+        index_dir = tmp_path / "indexes"
+        with ParallelCorpus(*parallel_files, index_dir=str(index_dir)) as corpus:
+            assert len(corpus) == 4
+        assert sorted(os.listdir(index_dir)) == ["corpus.en.idx", "corpus.tw.idx"]
+
+    def test_empty_file(self, tmp_path):
+        empty = tmp_path / "empty.tw"
+        empty.write_text("", encoding="utf-8")
+
+        index = LineIndex(str(empty))
+        assert len(index) == 0
+        index.close()
+
+    def test_lone_carriage_returns_end_lines(self, tmp_path):
+        twi_path = tmp_path / "cr.tw"
+        english_path = tmp_path / "cr.en"
+        twi_path.write_bytes("Ɛte sɛn?\rMe ho yɛ.\r\nMeda wo ase!\r".encode("utf-8"))
+        english_path.write_bytes(b"How are you?\nI am fine.\nThank you!\n")
+        twi_data, english_data = Preprocessing().read_parallel_dataset(str(twi_path), str(english_path))
+
+        with ParallelCorpus(str(twi_path), str(english_path)) as corpus:
+            assert corpus[:] == list(zip(twi_data, english_data))
+
+    def test_mismatched_line_counts(self, parallel_files, tmp_path):
+        twi_path, _ = parallel_files
+        short_english = tmp_path / "short.en"
+        short_english.write_text("How are you?\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="not aligned"):
+            ParallelCorpus(twi_path, str(short_english))
+
+    def test_compressed_input_is_rejected(self, parallel_files):
+        twi_path, english_path = parallel_files
+        with open(twi_path, "rb") as source, gzip.open(twi_path + ".gz", "wb") as target:
+            target.write(source.read())
+
+        with pytest.raises(ValueError, match="compressed"):
+            ParallelCorpus(twi_path + ".gz", english_path)
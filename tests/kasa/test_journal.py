@@ -0,0 +1,92 @@
+import pytest
+
+from kasa.journal import TranslationJournal, document_fingerprint
+from kasa.text_chunker import BatchTranslator
+
+
+class CountingTranslator:
+    """Translator that records its calls and can fail every call after the first ``fail_after``."""
+
+    def __init__(self, fail_after=None):
+        self.calls = []
+        self.fail_after = fail_after
+
+    def translate(self, text, target_language=None):
+        self.calls.append(text)
+        if self.fail_after is not None and len(self.calls) > self.fail_after:
+            raise RuntimeError("process died")
+
+        class Response:
+            def __init__(self, text):
+                self.text = f"Translated: {text}"
+
+        return Response(text)
+
+
+TEXT = "One. Two. Three. Four. Five."
+
+
+def test_records_and_reads_back(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with TranslationJournal(path) as journal:
+        journal.record("doc", 0, "Ɛte sɛn")
+        journal.record("other", 0, "ignored")
+
+    with TranslationJournal(path) as journal:
+        assert journal.completed("doc") == {0: "Ɛte sɛn"}
+        assert journal.completed("missing") == {}
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text('{"doc": "doc", "chunk": 0, "text": "a"}\n{"doc": "doc", "ch')
+
+    with TranslationJournal(str(path)) as journal:
+        journal.record("doc", 1, "b")
+        assert journal.completed("doc") == {0: "a", 1: "b"}
+
+
+def test_fingerprint_depends_on_settings():
+    assert document_fingerprint(TEXT, "en-tw", 1000) == document_fingerprint(TEXT, "en-tw", 1000)
+    assert document_fingerprint(TEXT, "en-tw", 1000) != document_fingerprint(TEXT, "en-tw", 500)
+    assert document_fingerprint(TEXT, "en-tw", 1000) != document_fingerprint(TEXT + " Six.", "en-tw", 1000)
+
+
+def test_resume_sends_only_missing_chunks(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with TranslationJournal(path) as journal:
+        crashing = CountingTranslator(fail_after=3)
+        with pytest.raises(ValueError):
+            BatchTranslator(crashing, max_chunk_size=6, max_workers=1, journal=journal).chunk_translate(TEXT)
+
+    with TranslationJournal(path) as journal:
+        translator = CountingTranslator()
+        result = BatchTranslator(translator, max_chunk_size=6, journal=journal).chunk_translate(TEXT)
+
+    assert result == BatchTranslator(CountingTranslator(), max_chunk_size=6).chunk_translate(TEXT)
+    assert sorted(translator.calls) == ["Five.", "Four."]
+
+
+def test_iter_chunk_translate_resumes(tmp_path):
+    with TranslationJournal(str(tmp_path / "journal.jsonl")) as journal:
+        first = BatchTranslator(CountingTranslator(), max_chunk_size=6, journal=journal)
+        stream = first.iter_chunk_translate(TEXT)
+        assert next(stream) == "Translated: One."
+        stream.close()
+
+        translator = CountingTranslator()
+        resumed = BatchTranslator(translator, max_chunk_size=6, max_workers=1, journal=journal)
+        assert " ".join(resumed.iter_chunk_translate(TEXT)) == first.chunk_translate(TEXT)
+        assert "One." not in translator.calls
+
+
+def test_retry_failed_is_journaled(tmp_path):
+    with TranslationJournal(str(tmp_path / "journal.jsonl")) as journal:
+        batch_translator = BatchTranslator(CountingTranslator(fail_after=4), max_chunk_size=6, max_workers=1,
+                                           journal=journal)
+        result = batch_translator.chunk_translate_partial(TEXT)
+        assert result.failed_indices == [4]
+
+        batch_translator.translator = CountingTranslator()
+        assert batch_translator.retry_failed(result).complete
+        assert len(journal.completed(result.fingerprint)) == 5
@@ -0,0 +1,579 @@
+import bz2
+import gzip
+import lzma
+import os
+import random
+import re
+import unicodedata
+
+import pytest
+
+import kasa.Preprocessing as preprocessing_module
+from kasa.Preprocessing import (
+    DuplicatePairFilter,
+    FilterReport,
+    MaxLengthFilter,
+    NonEmptyFilter,
+    PairFilter,
+    Preprocessing,
+    detect_compression,
+)
+
+
+@pytest.fixture
+def preprocessor():
+    return Preprocessing()
+
+
+@pytest.fixture
+def parallel_files(tmp_path):
+    """Write a small aligned Twi/English corpus and return the two paths."""
+    twi_path = tmp_path / "corpus.tw"
+    english_path = tmp_path / "corpus.en"
+    twi_path.write_text("Ɛte sɛn?\nMe ho yɛ.\nMeda wo ase!\n", encoding="utf-8")
+    english_path.write_text("How are you?\nI am fine.\nThank you!\n", encoding="utf-8")
+    return str(twi_path), str(english_path)
+
+
+class TestIterParallelDataset:
+    """Tests for the streaming parallel corpus reader."""
+
+    def test_matches_read_parallel_dataset(self, preprocessor, parallel_files):
+        twi_path, english_path = parallel_files
+        twi_data, english_data = preprocessor.read_parallel_dataset(twi_path, english_path)
+
+        pairs = list(preprocessor.iter_parallel_dataset(twi_path, english_path))
+
+        assert pairs == list(zip(twi_data, english_data))
+
+    def test_is_lazy(self, preprocessor, parallel_files):
+        pairs = preprocessor.iter_parallel_dataset(*parallel_files)
+
+        assert next(pairs) == ("Ɛte sɛn?", "How are you?")
+
+    def test_start_and_limit(self, preprocessor, parallel_files):
+        pairs = list(preprocessor.iter_parallel_dataset(*parallel_files, start=1, limit=1))
+
+        assert pairs == [("Me ho yɛ.", "I am fine.")]
+
+    def test_start_past_end(self, preprocessor, parallel_files):
+        assert list(preprocessor.iter_parallel_dataset(*parallel_files, start=10)) == []
+
+    def test_mismatched_line_counts(self, preprocessor, parallel_files, tmp_path):
+        twi_path, _ = parallel_files
+        short_english = tmp_path / "short.en"
+        short_english.write_text("How are you?\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="not aligned"):
+            list(preprocessor.iter_parallel_dataset(twi_path, str(short_english)))
+
+    def test_invalid_arguments(self, preprocessor, parallel_files):
+        with pytest.raises(ValueError):
+            list(preprocessor.iter_parallel_dataset(*parallel_files, start=-1))
+        with pytest.raises(ValueError):
+            list(preprocessor.iter_parallel_dataset(*parallel_files, limit=-1))
+
+
+def _reference_unicode_to_ascii(s):
+    return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
+
+
+def _reference_normalize(s, pattern):
+    """The original per-sentence normalizer the fast paths must reproduce."""
+    s = _reference_unicode_to_ascii(s)
+    s = re.sub(r"([!.?])", r" \1", s)
+    s = re.sub(pattern, r" ", s)
+    s = re.sub(r"\s+", r" ", s)
+    return s
+
+
+REFERENCE_PATTERNS = {"twi": r"[^a-zA-Z.ƆɔɛƐ!?’]+", "eng": r"[^a-zA-Z.!?]+"}
+
+SAMPLE_LINES = [
+    "Ɛte sɛn?",
+    "Me ho yɛ, meda wo ase!",
+    "Yesu kaa sɛ: “Mo nni mo ho adwene.” (Mat. 6:25)",
+    "How are you?  I am fine...",
+    "  leading and trailing whitespace\t",
+    "Café naïve résumé",
+    "́starts with a combining mark",
+    "tabs\tand\x0bodd\x1cwhitespace",
+    "",
+    "Ɔbɔadeɛ no ka sɛ Ɛ yɛ papa’",
+]
+
+
+def _random_lines(count, seed=0):
+    rng = random.Random(seed)
+    alphabet = "abcɛɔƐƆ ’.!?,;:\t́̃áéíóúñ0123456789　\xa0-"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+
+
+class TestNormalization:
+    """The precompiled and batched normalizers must match the original output exactly."""
+
+    def test_unicode_to_ascii(self, preprocessor):
+        for line in SAMPLE_LINES + _random_lines(200):
+            assert preprocessor.unicode_to_ascii(line) == _reference_unicode_to_ascii(line)
+
+    def test_normalizers_match_reference(self, preprocessor):
+        for line in SAMPLE_LINES + _random_lines(200):
+            assert preprocessor.normalize_twi(line) == _reference_normalize(line, REFERENCE_PATTERNS["twi"])
+            assert preprocessor.normalize_eng(line) == _reference_normalize(line, REFERENCE_PATTERNS["eng"])
+
+    @pytest.mark.parametrize("lang", ["twi", "eng"])
+    def test_normalize_batch_matches_reference(self, preprocessor, lang):
+        lines = SAMPLE_LINES + _random_lines(1000, seed=1)
+
+        expected = [_reference_normalize(line, REFERENCE_PATTERNS[lang]) for line in lines]
+
+        assert preprocessor.normalize_batch(lines, lang) == expected
+        assert preprocessor.normalize_batch(iter(lines), lang) == expected
+
+    def test_normalize_batch_with_embedded_newline(self, preprocessor):
+        lines = ["first line", "has\nnewline", "last!"]
+
+        expected = [_reference_normalize(line, REFERENCE_PATTERNS["twi"]) for line in lines]
+
+        assert preprocessor.normalize_batch(lines, "twi") == expected
+
+    def test_normalize_batch_empty(self, preprocessor):
+        assert preprocessor.normalize_batch([], "eng") == []
+
+    def test_normalize_batch_invalid_lang(self, preprocessor):
+        with pytest.raises(ValueError):
+            preprocessor.normalize_batch(["Hello"], "fr")
+
+
+class TestPreprocessCorpus:
+    """Tests for the multi-process, byte-range sharded preprocessing."""
+
+    @pytest.fixture
+    def large_parallel_files(self, tmp_path):
+        twi_lines = [f"Ɛte sɛn {i}? Me ho yɛ, meda wo ase!" for i in range(500)]
+        english_lines = [f"How are you {i}? I am fine, thank you!" for i in range(500)]
+        twi_path = tmp_path / "large.tw"
+        english_path = tmp_path / "large.en"
+        twi_path.write_text("\n".join(twi_lines) + "\n", encoding="utf-8")
+        english_path.write_text("\n".join(english_lines), encoding="utf-8")
+        return str(twi_path), str(english_path)
+
+    @staticmethod
+    def _read_shards(paths):
+        lines = []
+        for path in paths:
+            with open(path, encoding="utf-8") as file:
+                lines.extend(line.rstrip("\n") for line in file)
+        return lines
+
+    def test_shards_preserve_line_order(self, preprocessor, large_parallel_files, tmp_path):
+        twi_data, english_data = preprocessor.read_parallel_dataset(*large_parallel_files)
+
+        twi_shards, english_shards = preprocessor.preprocess_corpus(
+            *large_parallel_files, output_dir=str(tmp_path / "out"), num_workers=2, shards_per_worker=3
+        )
+
+        assert len(twi_shards) > 1
+        assert self._read_shards(twi_shards) == [" ".join(preprocessor.normalize_twi(s).split()) for s in twi_data]
+        assert self._read_shards(english_shards) == [
+            " ".join(preprocessor.normalize_eng(s).split()) for s in english_data
+        ]
+
+    def test_shards_are_aligned_across_languages(self, preprocessor, tmp_path):
+        rng = random.Random(0)
+        twi_path = tmp_path / "uneven.tw"
+        english_path = tmp_path / "uneven.en"
+        twi_path.write_text("".join("a" * rng.randrange(1, 80) + "\n" for _ in range(2000)), encoding="utf-8")
+        english_path.write_text("".join("b" * rng.randrange(1, 80) + "\n" for _ in range(2000)), encoding="utf-8")
+
+        twi_shards, english_shards = preprocessor.preprocess_corpus(
+            str(twi_path), str(english_path), output_dir=str(tmp_path / "out"), num_workers=2, shards_per_worker=4
+        )
+
+        assert len(twi_shards) == len(english_shards) == 8
+        for twi_shard, english_shard in zip(twi_shards, english_shards):
+            assert len(self._read_shards([twi_shard])) == len(self._read_shards([english_shard]))
+
+    def test_lone_carriage_returns_end_lines(self, preprocessor, tmp_path):
+        twi_path = tmp_path / "cr.tw"
+        english_path = tmp_path / "cr.en"
+        twi_path.write_bytes("Ɛte sɛn?\rMe ho yɛ.\r\nMeda wo ase!\nYoo\n".encode("utf-8"))
+        english_path.write_bytes(b"How are you?\nI am fine.\nThank you!\rOkay\r")
+
+        twi_shards, english_shards = preprocessor.preprocess_corpus(
+            str(twi_path), str(english_path), output_dir=str(tmp_path / "out"), num_workers=2, shards_per_worker=2
+        )
+
+        pairs = list(preprocessor.iter_parallel_dataset(str(twi_path), str(english_path)))
+        assert len(pairs) == 4
+        assert self._read_shards(twi_shards) == [" ".join(preprocessor.normalize_twi(t).split()) for t, _ in pairs]
+        assert self._read_shards(english_shards) == [
+            " ".join(preprocessor.normalize_eng(e).split()) for _, e in pairs
+        ]
+
+    def test_line_ends_are_counted_across_chunk_edges(self, tmp_path, monkeypatch):
+        rng = random.Random(1)
+        path = tmp_path / "mixed.en"
+        path.write_bytes(b"".join(b"x" * rng.randrange(1, 9) + rng.choice([b"\n", b"\r", b"\r\n"])
+                                  for _ in range(500)))
+        monkeypatch.setattr(preprocessing_module, "_READ_BUFFER_SIZE", 7)
+        with open(path, "rb") as file:
+            ends = list(preprocessing_module.iter_line_ends(file))
+
+        assert len(ends) == 500
+        assert preprocessing_module._count_range_line_ends(str(path), ends[9], ends[299]) == 290
+        assert preprocessing_module._find_line_end(str(path), 0, 1) == ends[0]
+        assert preprocessing_module._find_line_end(str(path), ends[9], 290) == ends[299]
+        assert preprocessing_module._find_line_end(str(path), ends[9], 491) == ends[499]
+
+    def test_without_tokenize(self, preprocessor, parallel_files, tmp_path):
+        twi_data, _ = preprocessor.read_parallel_dataset(*parallel_files)
+
+        twi_shards, _ = preprocessor.preprocess_corpus(
+            *parallel_files, output_dir=str(tmp_path / "out"), num_workers=2, tokenize=False
+        )
+
+        assert self._read_shards(twi_shards) == [preprocessor.normalize_twi(s) for s in twi_data]
+
+    def test_mismatched_line_counts(self, preprocessor, parallel_files, tmp_path):
+        twi_path, _ = parallel_files
+        short_english = tmp_path / "short.en"
+        short_english.write_text("How are you?\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="not aligned"):
+            preprocessor.preprocess_corpus(
+                twi_path, str(short_english), output_dir=str(tmp_path / "out"), num_workers=1
+            )
+
+
+class TestNormalizationCache:
+    """Tests for the optional LRU memoization of the normalizers."""
+
+    def test_disabled_by_default(self, preprocessor):
+        assert preprocessor.cache_info() == {}
+
+    def test_hits_and_misses(self):
+        preprocessor = Preprocessing(cache_size=2)
+
+        for line in ["Ɛte sɛn?", "Ɛte sɛn?", "Me ho yɛ.", "Ɛte sɛn?"]:
+            assert preprocessor.normalize_twi(line) == Preprocessing().normalize_twi(line)
+
+        info = preprocessor.cache_info()["twi"]
+        assert (info.hits, info.misses, info.currsize) == (2, 2, 2)
+        assert preprocessor.cache_info()["eng"].misses == 0
+
+    def test_lru_eviction(self):
+        preprocessor = Preprocessing(cache_size=1)
+
+        preprocessor.normalize_batch(["How are you?", "I am fine.", "How are you?"], lang="eng")
+
+        info = preprocessor.cache_info()["eng"]
+        assert (info.hits, info.misses, info.currsize) == (0, 3, 1)
+
+    def test_batch_matches_uncached(self, preprocessor):
+        lines = SAMPLE_LINES * 3
+
+        cached = Preprocessing(cache_size=100).normalize_batch(lines, lang="twi")
+
+        assert cached == preprocessor.normalize_batch(lines, lang="twi")
+
+    def test_cache_clear(self):
+        preprocessor = Preprocessing(cache_size=10)
+        preprocessor.normalize_eng("Hello!")
+
+        preprocessor.cache_clear()
+
+        assert preprocessor.cache_info()["eng"].currsize == 0
+
+
+class TestDeduplicateParallelDataset:
+    """Tests for the exact-dedup pass and its duplicate report."""
+
+    def test_report_and_output(self, preprocessor, tmp_path):
+        twi_path = tmp_path / "dup.tw"
+        english_path = tmp_path / "dup.en"
+        twi_path.write_text("Aane\nƐte sɛn?\nAane\nAane\n", encoding="utf-8")
+        english_path.write_text("Yes\nHow are you?\nYes\nYes indeed\n", encoding="utf-8")
+        output_twi = tmp_path / "unique.tw"
+        output_english = tmp_path / "unique.en"
+
+        report = preprocessor.deduplicate_parallel_dataset(
+            str(twi_path), str(english_path), str(output_twi), str(output_english)
+        )
+
+        assert report.total_pairs == 4
+        assert report.duplicate_pairs == 1
+        assert report.unique_pairs == 3
+        assert report.duplicate_rate == 0.25
+        assert report.duplicate_twi == 2
+        assert report.duplicate_english == 1
+        assert output_twi.read_text(encoding="utf-8") == "Aane\nƐte sɛn?\nAane\n"
+        assert output_english.read_text(encoding="utf-8") == "Yes\nHow are you?\nYes indeed\n"
+
+
+class TestPreprocessCached:
+    """Tests for the content-addressed on-disk preprocessing cache."""
+
+    @pytest.fixture
+    def range_calls(self, monkeypatch):
+        """Record the (lang, start) of every byte range that actually gets normalized."""
+        calls = []
+        original = preprocessing_module._preprocess_range
+
+        def recording_preprocess_range(filepath, start, end, lang, *args, **kwargs):
+            calls.append((lang, start))
+            return original(filepath, start, end, lang, *args, **kwargs)
+
+        monkeypatch.setattr(preprocessing_module, "_preprocess_range", recording_preprocess_range)
+        return calls
+
+    @staticmethod
+    def _expected(preprocessor, twi_path, english_path):
+        twi_data, english_data = preprocessor.read_parallel_dataset(twi_path, english_path)
+        return (
+            "".join(preprocessor.normalize_twi(s) + "\n" for s in twi_data),
+            "".join(preprocessor.normalize_eng(s) + "\n" for s in english_data),
+        )
+
+    @staticmethod
+    def _read(paths):
+        return tuple(open(path, encoding="utf-8").read() for path in paths)
+
+    def test_lone_carriage_returns_end_lines(self, preprocessor, tmp_path):
+        twi_path = tmp_path / "cr.tw"
+        english_path = tmp_path / "cr.en"
+        twi_path.write_bytes("Ɛte sɛn?\rMe ho yɛ.\r\nMeda wo ase!\n".encode("utf-8"))
+        english_path.write_bytes(b"How are you?\nI am fine.\nThank you!\n")
+
+        outputs = preprocessor.preprocess_cached(str(twi_path), str(english_path), cache_dir=str(tmp_path / "cache"))
+
+        assert self._read(outputs) == self._expected(preprocessor, str(twi_path), str(english_path))
+
+    def test_cold_then_cached(self, preprocessor, parallel_files, tmp_path, range_calls):
+        cache_dir = str(tmp_path / "cache")
+
+        outputs = preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir)
+        assert self._read(outputs) == self._expected(preprocessor, *parallel_files)
+        assert len(range_calls) == 2
+
+        assert preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir) == outputs
+        assert len(range_calls) == 2
+
+    def test_appended_lines_are_processed_incrementally(self, preprocessor, parallel_files, tmp_path, range_calls):
+        cache_dir = str(tmp_path / "cache")
+        twi_path, english_path = parallel_files
+        first_outputs = preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir)
+        old_sizes = [os.path.getsize(twi_path), os.path.getsize(english_path)]
+        with open(twi_path, "a", encoding="utf-8") as file:
+            file.write("Akwaaba!\n")
+        with open(english_path, "a", encoding="utf-8") as file:
+            file.write("Welcome!\n")
+        range_calls.clear()
+
+        outputs = preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir)
+
+        assert outputs != first_outputs
+        assert self._read(outputs) == self._expected(preprocessor, *parallel_files)
+        assert sorted(start for _, start in range_calls) == sorted(old_sizes)
+
+    def test_appending_replaces_the_old_entry(self, preprocessor, parallel_files, tmp_path):
+        cache_dir = tmp_path / "cache"
+        twi_path, english_path = parallel_files
+        for day in range(3):
+            with open(twi_path, "a", encoding="utf-8") as file:
+                file.write(f"Da {day}\n")
+            with open(english_path, "a", encoding="utf-8") as file:
+                file.write(f"Day {day}\n")
+
+            # a daily job, run in a new process every time
+            outputs = Preprocessing().preprocess_cached(*parallel_files, cache_dir=str(cache_dir))
+
+        assert self._read(outputs) == self._expected(preprocessor, *parallel_files)
+        assert os.listdir(cache_dir) == [os.path.basename(os.path.dirname(outputs[0]))]
+
+    def test_returned_entries_are_kept(self, preprocessor, parallel_files, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        twi_path, english_path = parallel_files
+        first_outputs = preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir)
+        with open(twi_path, "a", encoding="utf-8") as file:
+            file.write("Akwaaba!\n")
+        with open(english_path, "a", encoding="utf-8") as file:
+            file.write("Welcome!\n")
+
+        preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir)
+
+        assert all(os.path.exists(path) for path in first_outputs)
+
+    def test_subset_next_to_the_full_corpus_keeps_its_entry(self, preprocessor, parallel_files, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        subset = []
+        for path in parallel_files:
+            with open(path, encoding="utf-8") as file:
+                lines = file.readlines()
+            subset_path = tmp_path / f"subset.{os.path.basename(path)}"
+            subset_path.write_text("".join(lines[:2]), encoding="utf-8")
+            subset.append(str(subset_path))
+        subset_outputs = Preprocessing().preprocess_cached(*subset, cache_dir=cache_dir)
+
+        Preprocessing().preprocess_cached(*parallel_files, cache_dir=cache_dir)
+
+        assert all(os.path.exists(path) for path in subset_outputs)
+        assert len(os.listdir(cache_dir)) == 2
+
+    def test_rewritten_input_is_fully_reprocessed(self, preprocessor, parallel_files, tmp_path, range_calls):
+        cache_dir = str(tmp_path / "cache")
+        twi_path, english_path = parallel_files
+        preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir)
+        with open(twi_path, "w", encoding="utf-8") as file:
+            file.write("Aane\nDaabi\nƐte sɛn?\n")
+        range_calls.clear()
+
+        outputs = preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir)
+
+        assert self._read(outputs) == self._expected(preprocessor, *parallel_files)
+        assert [start for _, start in range_calls] == [0, 0]
+
+    def test_config_is_part_of_the_key(self, preprocessor, parallel_files, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+
+        plain = preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir)
+        tokenized = preprocessor.preprocess_cached(*parallel_files, cache_dir=cache_dir, tokenize=True)
+
+        assert plain != tokenized
+        assert self._read(tokenized)[0] == "".join(
+            " ".join(line.split()) + "\n" for line in self._read(plain)[0].splitlines()
+        )
+
+    def test_mismatched_line_counts(self, preprocessor, parallel_files, tmp_path):
+        twi_path, _ = parallel_files
+        short_english = tmp_path / "short.en"
+        short_english.write_text("How are you?\n", encoding="utf-8")
+        cache_dir = tmp_path / "cache"
+
+        with pytest.raises(ValueError, match="not aligned"):
+            preprocessor.preprocess_cached(twi_path, str(short_english), cache_dir=str(cache_dir))
+        assert os.listdir(cache_dir) == []
+
+
+COMPRESSORS = {"gzip": (gzip.open, ".gz"), "bz2": (bz2.open, ".bz2"), "xz": (lzma.open, ".xz")}
+
+
+class TestCompressedInput:
+    """Compressed corpora are decoded on the fly by every reader."""
+
+    @pytest.fixture(params=sorted(COMPRESSORS))
+    def compressed_files(self, request, parallel_files):
+        compress, suffix = COMPRESSORS[request.param]
+        paths = []
+        for path in parallel_files:
+            with open(path, "rb") as source, compress(path + suffix, "wb") as target:
+                target.write(source.read())
+            paths.append(path + suffix)
+        return request.param, tuple(paths)
+
+    def test_detect_compression(self, compressed_files, parallel_files):
+        compression, paths = compressed_files
+
+        assert detect_compression(paths[0]) == compression
+        assert detect_compression(parallel_files[0]) is None
+
+    def test_readers(self, preprocessor, compressed_files, parallel_files):
+        _, paths = compressed_files
+
+        assert preprocessor.read_parallel_dataset(*paths) == preprocessor.read_parallel_dataset(*parallel_files)
+        assert list(preprocessor.iter_parallel_dataset(*paths, start=1)) == list(
+            preprocessor.iter_parallel_dataset(*parallel_files, start=1)
+        )
+
+    def test_preprocess_corpus(self, preprocessor, compressed_files, parallel_files, tmp_path):
+        _, paths = compressed_files
+
+        compressed_shards = preprocessor.preprocess_corpus(*paths, output_dir=str(tmp_path / "a"), num_workers=2)
+        plain_shards = preprocessor.preprocess_corpus(*parallel_files, output_dir=str(tmp_path / "b"), num_workers=2)
+
+        for compressed, plain in zip(compressed_shards, plain_shards):
+            assert TestPreprocessCorpus._read_shards(compressed) == TestPreprocessCorpus._read_shards(plain)
+
+    def test_preprocess_cached(self, preprocessor, compressed_files, parallel_files, tmp_path):
+        _, paths = compressed_files
+
+        compressed_outputs = preprocessor.preprocess_cached(*paths, cache_dir=str(tmp_path / "cache"))
+        plain_outputs = preprocessor.preprocess_cached(*parallel_files, cache_dir=str(tmp_path / "cache"))
+
+        assert TestPreprocessCached._read(compressed_outputs) == TestPreprocessCached._read(plain_outputs)
+
+
+class TestFilterPairs:
+    """Tests for the streaming parallel-corpus filter stage."""
+
+    PAIRS = [
+        ("Ɛte sɛn?", "How are you?"),
+        ("", "Empty Twi side"),
+        ("Aane", "Yes it is certainly true and here is a much longer answer"),
+        ("Ɛte sɛn?", "How are you?"),
+        ("Me ho yɛ", "I am fine"),
+    ]
+
+    def test_default_filters(self, preprocessor):
+        report = FilterReport()
+
+        kept = list(preprocessor.filter_pairs(self.PAIRS, report=report))
+
+        assert kept == [self.PAIRS[0], self.PAIRS[4]]
+        assert report.total_pairs == 5
+        assert report.kept_pairs == 2
+        assert report.dropped == {"empty": 1, "too_long": 0, "length_ratio": 1, "duplicate": 1}
+
+    def test_custom_filters(self, preprocessor):
+        report = FilterReport()
+        filters = [MaxLengthFilter(max_tokens=3), NonEmptyFilter()]
+
+        kept = list(preprocessor.filter_pairs(self.PAIRS, filters, report))
+
+        assert kept == [self.PAIRS[0], self.PAIRS[3], self.PAIRS[4]]
+        assert report.dropped == {"too_long": 1, "empty": 1}
+
+    def test_is_lazy(self, preprocessor):
+        def pairs():
+            yield self.PAIRS[0]
+            raise AssertionError("read past the first pair")
+
+        assert next(preprocessor.filter_pairs(pairs())) == self.PAIRS[0]
+
+    def test_filters_must_implement_call(self):
+        class Incomplete(PairFilter):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_duplicate_filter_reset(self):
+        duplicate_filter = DuplicatePairFilter()
+        assert duplicate_filter("a", "b")
+        assert not duplicate_filter("a", "b")
+
+        duplicate_filter.reset()
+
+        assert duplicate_filter("a", "b")
+
+    def test_normalize_pairs(self, preprocessor):
+        normalized = list(preprocessor.normalize_pairs(preprocessor.filter_pairs(self.PAIRS)))
+
+        assert normalized == [
+            (preprocessor.normalize_twi(twi), preprocessor.normalize_eng(english))
+            for twi, english in [self.PAIRS[0], self.PAIRS[4]]
+        ]
+
+    def test_filter_parallel_dataset(self, preprocessor, tmp_path):
+        twi_path, english_path = tmp_path / "in.tw", tmp_path / "in.en"
+        twi_path.write_text("".join(twi + "\n" for twi, _ in self.PAIRS), encoding="utf-8")
+        english_path.write_text("".join(english + "\n" for _, english in self.PAIRS), encoding="utf-8")
+        output_twi, output_english = tmp_path / "out.tw", tmp_path / "out.en"
+
+        report = preprocessor.filter_parallel_dataset(
+            str(twi_path), str(english_path), str(output_twi), str(output_english)
+        )
+
+        assert report.kept_pairs == 2
+        assert output_twi.read_text(encoding="utf-8") == "Ɛte sɛn?\nMe ho yɛ\n"
+        assert output_english.read_text(encoding="utf-8") == "How are you?\nI am fine\n"
@@ -0,0 +1,77 @@
+import gzip
+import json
+import os
+
+from kasa.transcription import BatchTranscriber, compact_output, completed_paths, find_audio_files, read_manifest
+
+
+def test_results_keep_input_order_with_bounded_concurrency(tmp_path, fake_transcriber, write_audio):
+    paths = write_audio(tmp_path, *[f"{i:03}.wav" for i in range(60)])
+
+    with BatchTranscriber(fake_transcriber, language="tw", max_workers=4) as transcriber:
+        results = list(transcriber.iter_transcribe(paths))
+
+    assert [result.path for result in results] == paths
+    assert results[7].transcript == "tw:007.wav"
+    assert results[7].bytes == 104
+    assert all(result.ok and result.latency > 0 for result in results)
+    assert fake_transcriber.max_in_flight <= 4
+
+
+def test_errors_are_reported_per_file(tmp_path, fake_transcriber, write_audio):
+    paths = write_audio(tmp_path, "a.wav", "broken.wav") + [str(tmp_path / "missing.wav")]
+
+    with BatchTranscriber(fake_transcriber) as transcriber:
+        ok, broken, missing = transcriber.iter_transcribe(paths)
+
+    assert ok.ok
+    assert broken.error == "unsupported audio"
+    assert "missing.wav" in missing.error
+    assert json.loads(broken.to_json())["error"] == "unsupported audio"
+
+
+def test_skipped_files_are_not_sent(tmp_path, fake_transcriber, write_audio):
+    paths = write_audio(tmp_path, "a.wav", "b.wav", "c.wav")
+
+    with BatchTranscriber(fake_transcriber) as transcriber:
+        results = list(transcriber.iter_transcribe(paths, skip={paths[1]}))
+
+    assert [result.path for result in results] == [paths[0], paths[2]]
+    assert paths[1] not in fake_transcriber.calls
+
+
+def test_find_audio_files(tmp_path, write_audio):
+    write_audio(tmp_path, "b.wav", "a.MP3", "notes.txt", "day2/c.ogg", "day1/d.flac")
+
+    found = find_audio_files(str(tmp_path))
+
+    assert [os.path.relpath(path, tmp_path) for path in found] == [
+        "a.MP3", "b.wav", os.path.join("day1", "d.flac"), os.path.join("day2", "c.ogg")]
+
+
+def test_read_manifest(tmp_path):
+    manifest = tmp_path / "manifest.jsonl.gz"
+    with gzip.open(manifest, "wt", encoding="utf-8") as file:
+        file.write('{"path": "a.wav", "speaker": 1}\n\n{"path": "/data/b.wav"}\n')
+
+    assert list(read_manifest(str(manifest))) == [str(tmp_path / "a.wav"), "/data/b.wav"]
+
+
+def test_completed_paths_skips_failures_and_torn_lines(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"path": "a.wav", "error": null}\n{"path": "b.wav", "error": "boom"}\n{"path": "c.w',
+                      encoding="utf-8")
+
+    assert completed_paths(str(output)) == {"a.wav"}
+    assert completed_paths(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_compact_output_keeps_the_last_record_per_file_in_place(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"path": "a.wav", "error": "boom"}\n{"path": "b.w\n{"path": "b.wav", "error": null}\n'
+                      '{"path": "a.wav", "error": null}\n', encoding="utf-8")
+
+    assert compact_output(str(output)) == 2
+    assert output.read_text(encoding="utf-8") == '{"path": "a.wav", "error": null}\n{"path": "b.wav", "error": null}\n'
+    assert compact_output(str(output)) == 0
+    assert os.listdir(tmp_path) == ["out.jsonl"]
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from kasa.vocabulary import UNK_TOKEN, EncodedCorpus, Vocabulary
+
+SENTENCES = [
+    "me ho yɛ .",
+    "ɛte sɛn ?",
+    "me ho yɛ paa !",
+    "",
+]
+
+
+@pytest.fixture
+def vocab():
+    return Vocabulary.build(SENTENCES)
+
+
+class TestVocabulary:
+    """Tests for building and using the token vocabulary."""
+
+    def test_build_orders_by_frequency(self, vocab):
+        assert vocab.id_to_token(0) == UNK_TOKEN
+        assert [vocab.id_to_token(i) for i in range(1, 4)] == ["ho", "me", "yɛ"]
+        assert len(vocab) == 10
+
+    def test_min_count_and_max_size(self):
+        assert len(Vocabulary.build(SENTENCES, min_count=2)) == 4
+        assert len(Vocabulary.build(SENTENCES, max_size=2)) == 3
+
+    def test_encode_decode_round_trip(self, vocab):
+        ids = vocab.encode("me ho yɛ paa !")
+
+        assert vocab.decode(ids) == "me ho yɛ paa !"
+
+    def test_unknown_tokens(self, vocab):
+        assert vocab.encode("akwaaba me") == [0, vocab.token_to_id("me")]
+        assert "akwaaba" not in vocab
+
+    def test_save_and_load(self, vocab, tmp_path):
+        path = str(tmp_path / "vocab.txt")
+        vocab.save(path)
+
+        loaded = Vocabulary.load(path)
+
+        assert [loaded.id_to_token(i) for i in range(len(loaded))] == [vocab.id_to_token(i) for i in range(len(vocab))]
+
+
+class TestEncodedCorpus:
+    """Tests for the flat int32 corpus encoding."""
+
+    def test_encode(self, vocab):
+        corpus = EncodedCorpus.encode(SENTENCES, vocab)
+
+        assert corpus.tokens.dtype == np.int32
+        assert len(corpus) == len(SENTENCES)
+        assert [vocab.decode(sentence) for sentence in corpus] == SENTENCES
+        assert len(corpus[-1]) == 0
+
+    def test_sentences_are_views(self, vocab):
+        corpus = EncodedCorpus.encode(SENTENCES, vocab)
+
+        assert np.shares_memory(corpus[0], corpus.tokens)
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_save_and_load(self, vocab, tmp_path, mmap):
+        prefix = str(tmp_path / "corpus.tw")
+        EncodedCorpus.encode(SENTENCES, vocab).save(prefix)
+
+        loaded = EncodedCorpus.load(prefix, mmap=mmap)
+
+        assert isinstance(loaded.tokens, np.memmap) == mmap
+        assert [vocab.decode(sentence) for sentence in loaded] == SENTENCES
+
+    def test_index_out_of_range(self, vocab):
+        corpus = EncodedCorpus.encode(SENTENCES, vocab)
+
+        with pytest.raises(IndexError):
+            corpus[len(SENTENCES)]
+
+    def test_invalid_offsets(self):
+        with pytest.raises(ValueError):
+            EncodedCorpus(np.arange(3, dtype=np.int32), np.array([0, 2], dtype=np.int64))
@@ -0,0 +1,144 @@
+import asyncio
+import io
+import logging
+
+import httpx
+import pytest
+
+from src.khaya import AsyncKhayaClient, KhayaClient
+from src.khaya.exceptions import ASRTranscriptionError
+from src.khaya.services.asr import UPLOAD_CHUNK_SIZE
+
+AUDIO = bytes(range(256)) * 1024  # 256 KiB
+
+
+class RecordingFile(io.BytesIO):
+    """In-memory file that records the size of every read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+@pytest.fixture
+def uploads():
+    """(headers, body) of every request the mocked ASR API received."""
+    return []
+
+
+@pytest.fixture
+def responses():
+    """Status codes the mocked API answers with in turn; 200 once exhausted."""
+    return []
+
+
+@pytest.fixture
+def client(uploads, responses, monkeypatch):
+    monkeypatch.setattr("src.khaya.services.base_api.time.sleep", lambda delay: None)
+
+    def handler(request):
+        uploads.append((request.headers, request.read()))
+        return httpx.Response(responses.pop(0) if responses else 200, json="transcript")
+
+    client = KhayaClient("test_api_key")
+    client.http_client.sync_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client.http_client.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_file_path_is_streamed(client, uploads, tmp_path, monkeypatch):
+    path = tmp_path / "long.wav"
+    path.write_bytes(AUDIO)
+    opened = []
+    monkeypatch.setattr("src.khaya.services.asr.open", lambda *args: opened.append(RecordingFile(AUDIO)) or opened[-1],
+                        raising=False)
+
+    response = client.transcribe(str(path), "tw")
+
+    assert response.json() == "transcript"
+    assert uploads[0][1] == AUDIO
+    assert uploads[0][0]["Content-Length"] == str(len(AUDIO))
+    assert max(opened[0].reads) <= UPLOAD_CHUNK_SIZE
+
+
+@pytest.mark.parametrize("audio", [AUDIO, io.BytesIO(AUDIO)], ids=["bytes", "buffer"])
+def test_in_memory_audio(client, uploads, audio):
+    client.transcribe(audio, "tw")
+
+    assert uploads[0][1] == AUDIO
+
+
+def test_iterator_uses_chunked_transfer(client, uploads):
+    chunks = (AUDIO[i:i + 1000] for i in range(0, len(AUDIO), 1000))
+
+    client.transcribe(chunks, "tw")
+
+    assert uploads[0][0]["Transfer-Encoding"] == "chunked"
+    assert uploads[0][1] == AUDIO
+
+
+def test_missing_file_raises_before_any_request(client, uploads, tmp_path):
+    with pytest.raises(ASRTranscriptionError):
+        client.transcribe(str(tmp_path / "missing.wav"))
+
+    assert uploads == []
+
+
+def test_retry_rewinds_seekable_files(client, uploads, responses):
+    responses.append(503)
+
+    response = client.transcribe(io.BytesIO(AUDIO), "tw")
+
+    assert response.status_code == 200
+    assert [body for _, body in uploads] == [AUDIO, AUDIO]
+
+
+def test_iterators_are_not_retried(client, uploads, responses):
+    responses.append(503)
+
+    response = client.transcribe(iter([AUDIO]), "tw")
+
+    assert response["status_code"] == 503
+    assert len(uploads) == 1
+
+
+def test_body_and_api_key_are_not_logged(client, caplog):
+    with caplog.at_level(logging.DEBUG, logger="khaya"):
+        client.transcribe(AUDIO, "tw")
+
+    assert "Sync request to POST" in caplog.text
+    assert f"<bytes, {len(AUDIO)} bytes>" in caplog.text
+    assert "test_api_key" not in caplog.text
+    assert len(caplog.text) < 1000
+
+
+def test_async_streaming(uploads, responses, tmp_path):
+    path = tmp_path / "long.wav"
+    path.write_bytes(AUDIO)
+
+    def handler(request):
+        return httpx.Response(responses.pop(0) if responses else 200, json=len(request.read()))
+
+    async def chunks():
+        for i in range(0, len(AUDIO), 1000):
+            yield AUDIO[i:i + 1000]
+
+    async def run():
+        client = AsyncKhayaClient("test_api_key")
+        client.config.retry_backoff = 0
+        client.http_client.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with client:
+            responses.append(503)
+            from_path = await client.transcribe(str(path))
+            from_buffer = await client.transcribe(io.BytesIO(AUDIO))
+            from_iterator = await client.transcribe(chunks())
+            with pytest.raises(ASRTranscriptionError):
+                await client.transcribe(str(tmp_path / "missing.wav"))
+            return from_path, from_buffer, from_iterator
+
+    for response in asyncio.run(run()):
+        assert response.json() == len(AUDIO)
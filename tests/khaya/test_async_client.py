@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.khaya import AsyncKhayaClient
+from src.khaya.exceptions import ASRTranscriptionError, AuthenticationError, TranslationError, TTSGenerationError
+
+
+def handler(request):
+    if request.url.path.endswith("/translate"):
+        payload = json.loads(request.content)
+        if payload["in"] == "broken":
+            return httpx.Response(400, json={"message": "bad request"})
+        return httpx.Response(200, json=f"tw: {payload['in']}")
+    if request.url.path.endswith("/transcribe"):
+        return httpx.Response(200, json=f"{request.url.params['language']}: {len(request.content)} bytes")
+    if request.url.path.endswith("/tts"):
+        return httpx.Response(200, content=b"ID3" + json.loads(request.content)["text"].encode())
+    return httpx.Response(404)
+
+
+def make_client(api_key="test_api_key"):
+    client = AsyncKhayaClient(api_key)
+    client.http_client.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_translate_transcribe_synthesize(tmp_path):
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"RIFF" + bytes(96))
+
+    async def run():
+        async with make_client() as client:
+            return (
+                await client.translate("Hello", "en-tw"),
+                await client.transcribe(str(audio), "tw"),
+                await client.synthesize("Ɛte sɛn", "tw"),
+            )
+
+    translation, transcription, speech = asyncio.run(run())
+
+    assert translation.json() == "tw: Hello"
+    assert transcription.json() == "tw: 100 bytes"
+    assert speech.content == "ID3Ɛte sɛn".encode()
+
+
+def test_many_concurrent_requests():
+    async def run():
+        async with make_client() as client:
+            return await asyncio.gather(*(client.translate(f"text {i}") for i in range(500)))
+
+    responses = asyncio.run(run())
+
+    assert [r.json() for r in responses] == [f"tw: text {i}" for i in range(500)]
+
+
+def test_error_mapping(tmp_path):
+    async def run():
+        async with make_client() as client:
+            with pytest.raises(TranslationError):
+                await client.translate("", "en-tw")
+            with pytest.raises(TTSGenerationError):
+                await client.synthesize("", "tw")
+            with pytest.raises(ASRTranscriptionError):
+                await client.transcribe(str(tmp_path / "missing.wav"))
+            with pytest.raises(AuthenticationError):
+                await make_client(api_key=None).translate("Hello")
+            return await client.translate("broken")
+
+    error = asyncio.run(run())
+
+    assert error["status_code"] == 400
+
+
+def test_context_manager_closes_the_pool():
+    async def run():
+        async with make_client() as client:
+            pass
+        return client
+
+    client = asyncio.run(run())
+
+    assert client.http_client.async_client.is_closed
@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.khaya import ConnectionPool, KhayaClient
+from src.khaya.config import Settings
+from src.khaya.services.base_api import BaseApi, _parse_retry_after
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Delays the retry loop slept for, without actually sleeping."""
+    delays = []
+    monkeypatch.setattr("src.khaya.services.base_api.time.sleep", delays.append)
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("src.khaya.services.base_api.asyncio.sleep", fake_sleep)
+    return delays
+
+
+def make_api(responses, **settings):
+    """BaseApi whose requests are answered by `responses` in turn."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        response = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    api = BaseApi(Settings(api_key="test_api_key", **settings))
+    transport = httpx.MockTransport(handler)
+    api.sync_client = httpx.Client(transport=transport)
+    api.async_client = httpx.AsyncClient(transport=transport)
+    return api, calls
+
+
+def test_transient_errors_are_retried(sleeps):
+    api, calls = make_api([httpx.Response(503), httpx.ConnectError("refused"), httpx.Response(200, json="ok")])
+
+    response = api.request("POST", "https://example.com/translate")
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+
+
+def test_gives_up_after_retry_attempts(sleeps):
+    api, calls = make_api([httpx.Response(500)], retry_attempts=2)
+
+    response = api.request("POST", "https://example.com/translate")
+
+    assert response["status_code"] == 500
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried(sleeps):
+    api, calls = make_api([httpx.Response(401)])
+
+    response = api.request("POST", "https://example.com/translate")
+
+    assert response["status_code"] == 401
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_retry_after_is_honoured(sleeps):
+    api, calls = make_api(
+        [httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(429, headers={"Retry-After": "120"}),
+         httpx.Response(200)],
+        retry_max_backoff=10,
+    )
+
+    api.request("POST", "https://example.com/translate")
+
+    assert sleeps == [2.0, 10]
+
+
+def test_async_requests_are_retried(sleeps):
+    api, calls = make_api([httpx.Response(502), httpx.Response(200, json="ok")])
+
+    response = asyncio.run(api.arequest("POST", "https://example.com/translate"))
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert len(sleeps) == 1
+
+
+def test_parse_retry_after():
+    assert _parse_retry_after("3") == 3.0
+    assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert _parse_retry_after("soon") is None
+    assert _parse_retry_after(None) is None
+
+
+def test_pool_settings():
+    api = BaseApi(Settings(api_key="key", max_connections=7, keepalive_expiry=2.0, timeout=10, connect_timeout=3))
+    pool = api.sync_client._transport._pool
+
+    assert pool._max_connections == 7
+    assert pool._keepalive_expiry == 2.0
+    assert api.sync_client.timeout.connect == 3
+    assert api.sync_client.timeout.read == 10
+
+
+def test_shared_pool_sends_each_clients_key():
+    keys = []
+    transport = httpx.MockTransport(lambda request: keys.append(request.headers["Ocp-Apim-Subscription-Key"])
+                                    or httpx.Response(200, json="ok"))
+
+    with ConnectionPool() as pool:
+        pool.sync_client = httpx.Client(transport=transport)
+        with KhayaClient("key-a", pool=pool) as first, KhayaClient("key-b", pool=pool) as second:
+            first.translate("Hello")
+            second.translate("Hello")
+
+        assert first.http_client.sync_client is second.http_client.sync_client
+        # leaving the clients' with blocks leaves the shared pool open
+        assert not pool.sync_client.is_closed
+
+    assert keys == ["key-a", "key-b"]
+    assert pool.sync_client.is_closed
+
+
+def test_client_closes_its_own_pool():
+    with KhayaClient("key") as client:
+        pass
+
+    assert client.http_client.sync_client.is_closed
+
+
+def test_async_with_closes_the_async_connections_too():
+    async def run():
+        async with KhayaClient("key") as client:
+            client.http_client.async_client = httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda request: httpx.Response(200, json="ok")))
+            await client.atranslate("Hello")
+        return client
+
+    client = asyncio.run(run())
+
+    assert client.http_client.sync_client.is_closed
+    assert client.http_client.async_client.is_closed
@@ -0,0 +1,173 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.khaya import KhayaClient
+from src.khaya.cache import TranslationCache
+from src.khaya.exceptions import AuthenticationError
+
+
+@pytest.fixture
+def api_calls():
+    """Requests that reached the (mocked) translation API."""
+    return []
+
+
+@pytest.fixture
+def make_client(api_calls):
+    def handler(request):
+        api_calls.append(request)
+        if b"broken" in request.content:
+            return httpx.Response(500, json={"message": "server error"})
+        return httpx.Response(200, json=f"tw: {request.content.decode()}")
+
+    def factory(cache):
+        client = KhayaClient("test_api_key", cache=cache)
+        transport = httpx.MockTransport(handler)
+        client.http_client.sync_client = httpx.Client(transport=transport)
+        client.http_client.async_client = httpx.AsyncClient(transport=transport)
+        return client
+
+    return factory
+
+
+def test_memory_cache_hits(make_client, api_calls):
+    cache = TranslationCache()
+    client = make_client(cache)
+
+    first = client.translate("Hello, how are you?", "en-tw")
+    second = client.translate("  Hello,   how are you? ", "en-tw")
+
+    assert len(api_calls) == 1
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert (cache.stats.memory_hits, cache.stats.misses) == (1, 1)
+    assert cache.stats.hit_rate == 0.5
+
+
+def test_language_pair_and_model_version_are_part_of_the_key():
+    cache = TranslationCache()
+    other_model = TranslationCache(model_version="v2")
+
+    assert cache.key("Hello", "en-tw") != cache.key("Hello", "en-ee")
+    assert cache.key("Hello", "en-tw") != other_model.key("Hello", "en-tw")
+    assert cache.key("Hello", "en-tw") == cache.key(" Hello ", "en-tw")
+
+
+def test_errors_are_not_cached(make_client, api_calls):
+    cache = TranslationCache()
+    client = make_client(cache)
+    client.http_client.config.retry_attempts = 0
+
+    client.translate("broken", "en-tw")
+    result = client.translate("broken", "en-tw")
+
+    assert len(api_calls) == 2
+    assert "500" in result["message"]
+    assert result["status_code"] == 500
+
+
+def test_sqlite_tier_survives_a_new_cache(make_client, api_calls, tmp_path):
+    path = str(tmp_path / "translations.sqlite3")
+    first_cache = TranslationCache(path)
+    make_client(first_cache).translate("Hello", "en-tw")
+    first_cache.close()
+
+    second_cache = TranslationCache(path)
+    result = make_client(second_cache).translate("Hello", "en-tw")
+
+    assert len(api_calls) == 1
+    assert result.json() == 'tw: {"in":"Hello","lang":"en-tw"}'
+    assert second_cache.stats.disk_hits == 1
+
+
+def test_memory_lru_eviction_falls_back_to_disk(make_client, api_calls, tmp_path):
+    cache = TranslationCache(str(tmp_path / "translations.sqlite3"), max_memory_entries=1)
+    client = make_client(cache)
+
+    client.translate("One", "en-tw")
+    client.translate("Two", "en-tw")
+    client.translate("One", "en-tw")
+
+    assert len(api_calls) == 2
+    assert cache.stats.disk_hits == 1
+
+
+def test_ttl_expiry(make_client, api_calls, monkeypatch):
+    cache = TranslationCache(ttl=10)
+    client = make_client(cache)
+    now = 1000.0
+    monkeypatch.setattr("src.khaya.cache.time.time", lambda: now)
+
+    client.translate("Hello", "en-tw")
+    now += 11
+    client.translate("Hello", "en-tw")
+
+    assert len(api_calls) == 2
+
+
+def test_disk_size_eviction(tmp_path):
+    cache = TranslationCache(str(tmp_path / "translations.sqlite3"), max_memory_entries=1, max_disk_bytes=10)
+
+    cache.set("a", httpx.Response(200, content=b"123456"))
+    cache.set("b", httpx.Response(200, content=b"123456"))
+
+    assert cache.get("a") is None
+    assert cache.get("b").content == b"123456"
+    assert cache.stats.evictions >= 1
+
+
+def test_memory_hits_protect_entries_from_disk_eviction(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr("src.khaya.cache.time.time", lambda: next(clock))
+    cache = TranslationCache(str(tmp_path / "translations.sqlite3"), max_disk_bytes=12)
+    cache.set("a", httpx.Response(200, content=b"123456"))
+    cache.set("b", httpx.Response(200, content=b"123456"))
+
+    assert cache.get("a") is not None
+    cache.set("c", httpx.Response(200, content=b"123456"))
+    cache.close()
+
+    reopened = TranslationCache(str(tmp_path / "translations.sqlite3"))
+    assert reopened.get("a") is not None
+    assert reopened.get("b") is None
+
+
+def test_lookups_do_not_commit(tmp_path):
+    cache = TranslationCache(str(tmp_path / "translations.sqlite3"), max_memory_entries=1)
+    cache.set("a", httpx.Response(200, content=b"1"))
+    cache.set("b", httpx.Response(200, content=b"2"))
+    changes = cache._db.total_changes
+
+    for _ in range(10):
+        assert cache.get("a") is not None
+        assert cache.get("b") is not None
+
+    assert cache._db.total_changes == changes
+    assert cache.stats.disk_hits == 20
+
+
+def test_async_translate_is_cached(make_client, api_calls):
+    cache = TranslationCache()
+    client = make_client(cache)
+
+    async def translate_twice():
+        await client.atranslate("Hello", "en-tw")
+        return await client.atranslate("Hello", "en-tw")
+
+    result = asyncio.run(translate_twice())
+
+    assert result.status_code == 200
+    assert len(api_calls) == 1
+
+
+def test_cache_hits_still_require_an_api_key(make_client):
+    cache = TranslationCache()
+    make_client(cache).translate("Hello", "en-tw")
+    client = KhayaClient("", cache=cache)
+
+    with pytest.raises(AuthenticationError):
+        client.translate("Hello", "en-tw")
+    with pytest.raises(AuthenticationError):
+        asyncio.run(client.atranslate("Hello", "en-tw"))
@@ -2,7 +2,7 @@ from dotenv import load_dotenv
 
 
 from src.khaya.config import Settings, DevSettings
-from src.khaya.constants import TIMEOUT, RETRY_ATTEMPTS
+from src.khaya.constants import TIMEOUT, RETRY_ATTEMPTS, MAX_CONNECTIONS
 
 
 def test_default_config(monkeypatch):
@@ -21,6 +21,8 @@ def test_default_config(monkeypatch):
 
     assert config.timeout == TIMEOUT
     assert config.retry_attempts == RETRY_ATTEMPTS
+    assert config.max_connections == MAX_CONNECTIONS
+    assert config.connect_timeout is None
 
 
 def test_config_from_env_file(tmp_path, monkeypatch):
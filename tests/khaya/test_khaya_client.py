@@ -1,3 +1,6 @@
+import asyncio
+
+import httpx
 import pytest
 
 from src.khaya import KhayaClient
@@ -112,3 +115,24 @@ def test_asr_error_nonexistent_file(khaya_interface):
         result = khaya_interface.transcribe(audio_file_path, "tw")
 
         assert "error" in result["message"].lower()
+
+
+def test_atranslate_uses_async_client():
+    def handler(request):
+        assert request.headers["Ocp-Apim-Subscription-Key"] == "test_api_key"
+        return httpx.Response(200, json="Ɛte sɛn?")
+
+    khaya_interface = KhayaClient("test_api_key")
+    khaya_interface.http_client.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    result = asyncio.run(khaya_interface.atranslate("How are you?", "en-tw"))
+
+    assert result.status_code == 200
+    assert result.json() == "Ɛte sɛn?"
+
+
+def test_atranslate_empty_text():
+    khaya_interface = KhayaClient("test_api_key")
+
+    with pytest.raises(TranslationError):
+        asyncio.run(khaya_interface.atranslate("", "en-tw"))
@@ -0,0 +1,177 @@
+import asyncio
+import io
+import wave
+
+import httpx
+import pytest
+
+from src.khaya import AsyncKhayaClient, KhayaClient
+from src.khaya.services.base_api import DOWNLOAD_CHUNK_SIZE
+from src.khaya.services.tts import SynthesisResult, audio_duration
+
+
+def make_wav(seconds, rate=16000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(rate)
+        file.writeframes(b"\x01\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+AUDIO = make_wav(2.5)
+
+
+class FailingStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body that breaks off after more than one download chunk."""
+
+    def __iter__(self):
+        yield AUDIO[:DOWNLOAD_CHUNK_SIZE + 1000]
+        raise httpx.ReadError("connection reset")
+
+    async def __aiter__(self):
+        yield AUDIO[:DOWNLOAD_CHUNK_SIZE + 1000]
+        raise httpx.ReadError("connection reset")
+
+
+class UnseekableSink:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+
+@pytest.fixture
+def responses():
+    """Responses the mocked TTS API answers with in turn; the full audio once exhausted."""
+    return []
+
+
+@pytest.fixture
+def client(responses, monkeypatch):
+    monkeypatch.setattr("src.khaya.services.base_api.time.sleep", lambda delay: None)
+
+    def handler(request):
+        if responses:
+            return responses.pop(0)
+        return httpx.Response(200, content=AUDIO, headers={"Content-Type": "audio/wav"})
+
+    client = KhayaClient("test_api_key")
+    client.http_client.sync_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client.http_client.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_synthesize_to_path(client, tmp_path):
+    path = tmp_path / "hello.wav"
+
+    result = client.synthesize_to("Hello", "tw", str(path))
+
+    assert isinstance(result, SynthesisResult)
+    assert path.read_bytes() == AUDIO
+    assert result.bytes_written == len(AUDIO)
+    assert result.content_type == "audio/wav"
+    assert result.duration == pytest.approx(2.5)
+    assert result.elapsed >= 0
+
+
+def test_synthesize_to_file_object(client):
+    sink = io.BytesIO(b"existing ")
+    sink.seek(0, io.SEEK_END)
+
+    result = client.synthesize_to("Hello", "tw", sink)
+
+    assert sink.getvalue() == b"existing " + AUDIO
+    assert result.bytes_written == len(AUDIO)
+
+
+def test_interrupted_download_is_retried_from_the_start(client, responses):
+    responses.append(httpx.Response(200, stream=FailingStream()))
+    sink = io.BytesIO()
+
+    result = client.synthesize_to("Hello", "tw", sink)
+
+    assert sink.getvalue() == AUDIO
+    assert result.bytes_written == len(AUDIO)
+    assert result.duration == pytest.approx(2.5)
+
+
+def test_interrupted_download_to_unseekable_sink_is_not_retried(client, responses):
+    responses.append(httpx.Response(200, stream=FailingStream()))
+
+    result = client.synthesize_to("Hello", "tw", UnseekableSink())
+
+    assert "connection reset" in result["message"]
+    assert not responses
+
+
+def test_unseekable_sink_is_retried_before_anything_was_written(client, responses):
+    responses.append(httpx.Response(503))
+    sink = UnseekableSink()
+
+    result = client.synthesize_to("Hello", "tw", sink)
+
+    assert b"".join(sink.chunks) == AUDIO
+    assert result.bytes_written == len(AUDIO)
+
+
+def test_failed_download_leaves_no_file(client, responses, tmp_path):
+    responses.append(httpx.Response(400, json={"message": "bad language"}))
+    path = tmp_path / "hello.wav"
+
+    result = client.synthesize_to("Hello", "xx", str(path))
+
+    assert result["status_code"] == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_download_keeps_the_existing_file(client, responses, tmp_path):
+    responses.append(httpx.Response(400, json={"message": "bad language"}))
+    path = tmp_path / "hello.wav"
+    path.write_bytes(b"earlier audio")
+
+    result = client.synthesize_to("Hello", "xx", path)
+
+    assert result["status_code"] == 400
+    assert path.read_bytes() == b"earlier audio"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_interrupted_download_keeps_the_existing_file(client, tmp_path):
+    client.http_client.sync_client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, stream=FailingStream()))
+    )
+    path = tmp_path / "hello.wav"
+    path.write_bytes(b"earlier audio")
+
+    result = client.synthesize_to("Hello", "tw", path)
+
+    assert "connection reset" in result["message"]
+    assert path.read_bytes() == b"earlier audio"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_async_synthesize_to_path(client, tmp_path):
+    async_client = AsyncKhayaClient("test_api_key")
+    async_client.http_client.async_client = client.http_client.async_client
+    path = tmp_path / "hello.wav"
+
+    result = asyncio.run(async_client.synthesize_to("Hello", "tw", path))
+
+    assert path.read_bytes() == AUDIO
+    assert result.bytes_written == len(AUDIO)
+    assert result.duration == pytest.approx(2.5)
+
+
+def test_mp3_duration_from_bitrate():
+    # ID3v2 tag of 20 bytes, then MPEG-1 layer III frames at 128 kbit/s
+    tag = b"ID3\x03\x00\x00\x00\x00\x00\x14" + bytes(20)
+    frames = b"\xff\xfb\x90\x00" + bytes(15996)
+
+    assert audio_duration(tag + frames, len(tag) + 32000) == pytest.approx(2.0)
+
+
+def test_unknown_format_has_no_duration():
+    assert audio_duration(b"OggS" + bytes(100), 104) is None